@@ -16,7 +16,7 @@ try:
 except Exception as e:
     print(f"Erro ao configurar Django: {e}")
 
-from core.models import Guardian, Report, Vote
+from bot.repository import repository
 
 
 class AdminCommands(commands.Cog):
@@ -41,21 +41,23 @@ class AdminCommands(commands.Cog):
             return
         
         try:
+            stats = await repository.admin_stats()
+            
             # Estatísticas gerais
-            total_reports = Report.objects.count()
-            total_guardians = Guardian.objects.count()
-            online_guardians = Guardian.objects.filter(status='online').count()
+            total_reports = stats['reports']['total']
+            total_guardians = stats['guardians']['total']
+            online_guardians = stats['guardians']['online']
             
             # Estatísticas por status
-            pending_reports = Report.objects.filter(status='pending').count()
-            voting_reports = Report.objects.filter(status='voting').count()
-            completed_reports = Report.objects.filter(status='completed').count()
+            pending_reports = stats['reports']['pending']
+            voting_reports = stats['reports']['voting']
+            completed_reports = stats['reports']['completed']
             
             # Estatísticas de votação
-            total_votes = Vote.objects.count()
-            votes_improcedente = Vote.objects.filter(vote_type='improcedente').count()
-            votes_intimidou = Vote.objects.filter(vote_type='intimidou').count()
-            votes_grave = Vote.objects.filter(vote_type='grave').count()
+            total_votes = stats['votes']['total']
+            votes_improcedente = stats['votes']['improcedente']
+            votes_intimidou = stats['votes']['intimidou']
+            votes_grave = stats['votes']['grave']
             
             embed = discord.Embed(
                 title="📊 Estatísticas Administrativas",
@@ -90,14 +92,15 @@ class AdminCommands(commands.Cog):
             await ctx.send(f"❌ Erro ao obter estatísticas: {str(e)}")
     
     @commands.command(name='admin_guardians')
-    async def admin_guardians(self, ctx):
-        """Lista todos os Guardiões cadastrados"""
+    async def admin_guardians(self, ctx, cursor: str = None):
+        """Lista os Guardiões cadastrados, 10 por página"""
         if not self.is_admin(ctx.author):
             await ctx.send("❌ Você não tem permissão para usar este comando.")
             return
         
         try:
-            guardians = Guardian.objects.all().order_by('-points', '-level')
+            page = await repository.list_guardians(10, cursor)
+            guardians = page.object_list
             
             if not guardians:
                 await ctx.send("📝 Nenhum Guardião cadastrado.")
@@ -105,13 +108,12 @@ class AdminCommands(commands.Cog):
             
             embed = discord.Embed(
                 title="👮 Lista de Guardiões",
-                description=f"Total: {guardians.count()} Guardiões",
+                description=f"Total: ~{page.estimated_total} Guardiões" if page.estimated_total is not None else "Ranking por pontos",
                 color=0x39D353,
                 timestamp=datetime.now()
             )
             
-            # Mostrar apenas os primeiros 10 Guardiões
-            for i, guardian in enumerate(guardians[:10]):
+            for i, guardian in enumerate(guardians):
                 status_emoji = "🟢" if guardian.status == 'online' else "🔴"
                 embed.add_field(
                     name=f"{status_emoji} {guardian.discord_display_name}",
@@ -119,8 +121,8 @@ class AdminCommands(commands.Cog):
                     inline=False
                 )
             
-            if guardians.count() > 10:
-                embed.set_footer(text=f"Mostrando 10 de {guardians.count()} Guardiões")
+            if page.has_next:
+                embed.set_footer(text=f"Próxima página: !admin_guardians {page.next_cursor}")
             
             await ctx.send(embed=embed)
             
@@ -128,18 +130,20 @@ class AdminCommands(commands.Cog):
             await ctx.send(f"❌ Erro ao listar Guardiões: {str(e)}")
     
     @commands.command(name='admin_reports')
-    async def admin_reports(self, ctx, status: str = None):
-        """Lista denúncias por status"""
+    async def admin_reports(self, ctx, status: str = None, cursor: str = None):
+        """Lista denúncias por status ('all' para todas), 5 por página"""
         if not self.is_admin(ctx.author):
             await ctx.send("❌ Você não tem permissão para usar este comando.")
             return
         
         try:
+            if status == 'all':
+                status = None
+            page = await repository.list_reports(status, 5, cursor)
+            reports = page.object_list
             if status:
-                reports = Report.objects.filter(status=status).order_by('-created_at')
                 title = f"📋 Denúncias - {status.title()}"
             else:
-                reports = Report.objects.all().order_by('-created_at')
                 title = "📋 Todas as Denúncias"
             
             if not reports:
@@ -148,13 +152,12 @@ class AdminCommands(commands.Cog):
             
             embed = discord.Embed(
                 title=title,
-                description=f"Total: {reports.count()} denúncias",
+                description=f"Total: ~{page.estimated_total} denúncias" if page.estimated_total is not None else "Mais recentes primeiro",
                 color=0xff6b6b,
                 timestamp=datetime.now()
             )
             
-            # Mostrar apenas as primeiras 5 denúncias
-            for i, report in enumerate(reports[:5]):
+            for i, report in enumerate(reports):
                 status_emoji = {
                     'pending': '⏳',
                     'voting': '🗳️',
@@ -168,8 +171,8 @@ class AdminCommands(commands.Cog):
                     inline=True
                 )
             
-            if reports.count() > 5:
-                embed.set_footer(text=f"Mostrando 5 de {reports.count()} denúncias")
+            if page.has_next:
+                embed.set_footer(text=f"Próxima página: !admin_reports {status or 'all'} {page.next_cursor}")
             
             await ctx.send(embed=embed)
             
@@ -184,23 +187,8 @@ class AdminCommands(commands.Cog):
             return
         
         try:
-            from datetime import timedelta
-            from django.utils import timezone
-            
-            # Limpar denúncias antigas (mais de 30 dias)
-            cutoff_date = timezone.now() - timedelta(days=30)
-            old_reports = Report.objects.filter(created_at__lt=cutoff_date, status='completed')
-            old_count = old_reports.count()
-            
-            if old_count > 0:
-                old_reports.delete()
-            
-            # Limpar votos órfãos
-            orphan_votes = Vote.objects.filter(report__isnull=True)
-            orphan_count = orphan_votes.count()
-            
-            if orphan_count > 0:
-                orphan_votes.delete()
+            # Remover dados antigos em lotes (denúncias, sessões e fila)
+            results = await repository.run_retention()
             
             embed = discord.Embed(
                 title="🧹 Limpeza Concluída",
@@ -209,8 +197,12 @@ class AdminCommands(commands.Cog):
                 timestamp=datetime.now()
             )
             
-            embed.add_field(name="Denúncias antigas removidas", value=str(old_count), inline=True)
-            embed.add_field(name="Votos órfãos removidos", value=str(orphan_count), inline=True)
+            for name, result in results.items():
+                embed.add_field(
+                    name=f"Retenção: {name}",
+                    value=f"{result['deleted']} removidos\n{result['rows_per_second']} linhas/s",
+                    inline=True
+                )
             
             await ctx.send(embed=embed)
             
@@ -0,0 +1,152 @@
+"""
+Índice de moderadores por servidor
+
+Guarda, para cada servidor, os cargos com permissão de administrador ou de
+banimento e os membros que os possuem (mais o dono do servidor). O índice é
+montado uma vez por servidor, sob demanda, e depois mantido pelos eventos de
+membro e de cargo; assim, avisar os moderadores custa O(moderadores), não
+O(membros). O índice também é remontado após BOT_ADMIN_INDEX_TTL segundos.
+
+Com a política de cache relevant (bot/member_cache.py) o discord.py não
+envia on_member_update de membros fora do cache. Nesse caso os moderadores
+indexados são reconsultados pelo gateway antes de cada aviso (quem perdeu o
+cargo não recebe mais nada) e o TTL padrão cai para 15 minutos, prazo para
+que membros promovidos passem a ser avisados.
+"""
+import asyncio
+import os
+import time
+from bot.logging_config import log_error
+
+
+def is_moderator_role(role):
+    permissions = role.permissions
+    return permissions.administrator or permissions.ban_members
+
+
+async def send_direct_messages(recipients, concurrency=None, **kwargs):
+    """Envia a mesma DM a vários usuários em paralelo; retorna quantas foram entregues"""
+    semaphore = asyncio.Semaphore(concurrency or int(os.getenv('BOT_DM_CONCURRENCY', '5')))
+
+    async def send(recipient):
+        async with semaphore:
+            await recipient.send(**kwargs)
+
+    results = await asyncio.gather(*(send(recipient) for recipient in recipients), return_exceptions=True)
+    for recipient, result in zip(recipients, results):
+        if isinstance(result, Exception):
+            log_error(f"Erro ao enviar DM para {recipient}: {result}")
+    return sum(1 for result in results if not isinstance(result, Exception))
+
+
+class _GuildModerators:
+    def __init__(self, role_ids, members):
+        self.role_ids = role_ids
+        self.members = members  # user_id -> Member
+        self.built_at = time.monotonic()
+
+
+class AdminIndex:
+    """Moderadores de cada servidor, mantidos de forma incremental"""
+
+    def __init__(self, bot, ttl=None):
+        self.bot = bot
+        default_ttl = '900' if bot.members.policy == 'relevant' else '3600'
+        self.ttl = ttl or float(os.getenv('BOT_ADMIN_INDEX_TTL', default_ttl))
+        self._guilds = {}
+        self._locks = {}
+        self.stats = {'builds': 0, 'updates': 0, 'refreshes': 0}
+
+    def _moderator_role_ids(self, guild):
+        return {role.id for role in guild.roles if is_moderator_role(role)}
+
+    def _qualifies(self, member, role_ids):
+        if member.id == member.guild.owner_id:
+            return True
+        return any(role.id in role_ids for role in member.roles)
+
+    async def moderators(self, guild):
+        """Moderadores do servidor (monta o índice se necessário)"""
+        entry = self._guilds.get(guild.id)
+        if entry is None or time.monotonic() - entry.built_at > self.ttl:
+            entry = await self.build(guild)
+        elif self.bot.members.policy == 'relevant':
+            await self.refresh(guild, entry)
+        return list(entry.members.values())
+
+    async def refresh(self, guild, entry):
+        """Atualiza os moderadores indexados com o estado atual dos membros"""
+        if not entry.members:
+            return
+        current = {member.id: member for member in await self.bot.members.query(guild, entry.members)}
+        self.stats['refreshes'] += 1
+        entry.members = {
+            user_id: current[user_id] for user_id in entry.members
+            if user_id in current and self._qualifies(current[user_id], entry.role_ids)
+        }
+
+    async def build(self, guild):
+        """Monta o índice do servidor a partir da lista de membros"""
+        lock = self._locks.setdefault(guild.id, asyncio.Lock())
+        async with lock:
+            entry = self._guilds.get(guild.id)
+            if entry is not None and time.monotonic() - entry.built_at <= self.ttl:
+                return entry
+
+            role_ids = self._moderator_role_ids(guild)
+            members = await self.bot.members.guild_members(guild)
+            entry = _GuildModerators(
+                role_ids,
+                {member.id: member for member in members if not member.bot and self._qualifies(member, role_ids)},
+            )
+            self._guilds[guild.id] = entry
+            self.stats['builds'] += 1
+            return entry
+
+    def invalidate(self, guild_id):
+        self._guilds.pop(guild_id, None)
+
+    # ===== Eventos =====
+
+    def member_updated(self, member):
+        """Cargos do membro mudaram"""
+        entry = self._guilds.get(member.guild.id)
+        if entry is None or member.bot:
+            return
+        self.stats['updates'] += 1
+        if self._qualifies(member, entry.role_ids):
+            entry.members[member.id] = member
+        else:
+            entry.members.pop(member.id, None)
+
+    def member_removed(self, guild_id, user_id):
+        entry = self._guilds.get(guild_id)
+        if entry is not None:
+            entry.members.pop(user_id, None)
+
+    def role_changed(self, guild):
+        """Um cargo foi criado, alterado ou removido"""
+        entry = self._guilds.get(guild.id)
+        if entry is None:
+            return
+        role_ids = self._moderator_role_ids(guild)
+        if role_ids == entry.role_ids:
+            return
+        self.stats['updates'] += 1
+        if role_ids - entry.role_ids:
+            # Um cargo passou a moderar: os membros dele só são conhecidos remontando
+            self.invalidate(guild.id)
+            return
+        # Cargos perderam a permissão: basta filtrar os moderadores atuais
+        entry.role_ids = role_ids
+        entry.members = {
+            user_id: member for user_id, member in entry.members.items()
+            if self._qualifies(member, role_ids)
+        }
+
+    def snapshot(self):
+        return {
+            'guilds_indexed': len(self._guilds),
+            'moderators': sum(len(entry.members) for entry in self._guilds.values()),
+            **self.stats,
+        }
@@ -4,11 +4,16 @@ Servidor HTTP para o Bot Discord receber comandos da API Django
 import asyncio
 import json
 import os
-from aiohttp import web, ClientSession
+from aiohttp import web, ClientSession, ClientTimeout
 from datetime import datetime
 import discord
 from discord.ext import commands
 from bot.logging_config import log_system_event, log_error
+from guardiao.db_pool import pool_stats
+from bot.sharding import ShardRouter
+
+# Marca requisições já encaminhadas por outro processo do bot
+FORWARDED_HEADER = 'X-Guardiao-Forwarded'
 
 
 class BotAPIServer:
@@ -16,7 +21,10 @@ class BotAPIServer:
     
     def __init__(self, bot_instance):
         self.bot = bot_instance
+        self.router = ShardRouter(bot_instance)
+        self.session = None
         self.app = web.Application()
+        self.app.on_cleanup.append(self._close_session)
         self.setup_routes()
     
     def setup_routes(self):
@@ -26,6 +34,41 @@ class BotAPIServer:
         self.app.router.add_get('/health/', self.health_check_handler)
         self.app.router.add_get('/stats/', self.stats_handler)
     
+    async def _close_session(self, app):
+        if self.session is not None:
+            await self.session.close()
+
+    async def route_to_owner(self, request, data, guild_id):
+        """
+        Encaminha a requisição ao processo dono do servidor.
+
+        Retorna None quando o servidor pertence a este processo.
+        """
+        if guild_id is None or self.router.is_local(guild_id):
+            return None
+
+        owner_url = self.router.owner_url(guild_id)
+        shard_id = self.router.shard_for(guild_id)
+        if owner_url is None or request.headers.get(FORWARDED_HEADER):
+            return web.json_response(
+                {'error': f'Servidor pertence ao shard {shard_id}, que não é atendido por este processo'},
+                status=421
+            )
+
+        if self.session is None:
+            self.session = ClientSession(timeout=ClientTimeout(total=10))
+        try:
+            async with self.session.post(
+                f'{owner_url}{request.path}',
+                json=data,
+                headers={FORWARDED_HEADER: '1'}
+            ) as response:
+                body = await response.json(content_type=None)
+                return web.json_response(body, status=response.status)
+        except Exception as e:
+            log_error(f"Erro ao encaminhar {request.path} para o shard {shard_id} ({owner_url}): {e}")
+            return web.json_response({'error': 'Shard responsável indisponível'}, status=502)
+
     async def apply_punishment_handler(self, request):
         """Handler para aplicar punições"""
         try:
@@ -42,6 +85,10 @@ class BotAPIServer:
                     status=400
                 )
             
+            forwarded = await self.route_to_owner(request, data, guild_id)
+            if forwarded is not None:
+                return forwarded
+            
             # Aplicar punição usando o bot
             success = await self.bot.apply_punishment_from_api(
                 report_id, punishment, user_id, guild_id
@@ -77,6 +124,11 @@ class BotAPIServer:
                     status=400
                 )
             
+            guild_id = data.get('guild_id') or (data.get('report_data') or {}).get('guild_id')
+            forwarded = await self.route_to_owner(request, data, guild_id)
+            if forwarded is not None:
+                return forwarded
+            
             # Notificar Guardiões
             await self.bot.notify_guardians_from_api(report_id, guardian_ids)
             
@@ -108,7 +160,16 @@ class BotAPIServer:
                 'users_count': len(self.bot.users),
                 'uptime': str(datetime.now() - self.bot.start_time) if hasattr(self.bot, 'start_time') else 'N/A',
                 'commands_count': len(self.bot.tree.get_commands()),
+                'database': pool_stats(),
             }
+            if hasattr(self.bot, 'members'):
+                stats['memory'] = self.bot.members.snapshot()
+            if hasattr(self.bot, 'admin_index'):
+                stats['admin_index'] = self.bot.admin_index.snapshot()
+            if hasattr(self.bot, 'shard_stats'):
+                stats['sharding'] = self.bot.shard_stats.snapshot(self.bot)
+            if hasattr(self.bot, 'watchdog'):
+                stats['event_loop'] = self.bot.watchdog.snapshot()
             
             return web.json_response({'success': True, 'stats': stats})
             
@@ -165,7 +226,7 @@ async def add_api_methods_to_bot(bot):
             if not guild:
                 return False
             
-            user = guild.get_member(user_id)
+            user = await self.members.resolve(guild, user_id)
             if not user:
                 return False
             
@@ -22,7 +22,12 @@ try:
 except Exception as e:
     print(f"Erro ao configurar Django: {e}")
 
-from core.models import Guardian, Report, Message, ReportQueue
+from core.models import Guardian, Report
+from bot.repository import repository
+from bot.watchdog import LoopWatchdog
+from bot.sharding import sharding_enabled, shard_options, ShardStats
+from bot.admin_index import AdminIndex, send_direct_messages
+from bot.member_cache import MemberCache, member_cache_policy, client_options as member_cache_options
 
 
 class MessageCache:
@@ -78,7 +83,11 @@ class MessageCache:
         self.last_cleanup = now
 
 
-class GuardiaoBot(commands.Bot):
+# Com BOT_SHARDING=true o bot abre um shard por conexão do gateway
+BotBase = commands.AutoShardedBot if sharding_enabled() else commands.Bot
+
+
+class GuardiaoBot(BotBase):
     """Bot principal do Sistema Guardião"""
     
     def __init__(self):
@@ -90,16 +99,38 @@ class GuardiaoBot(commands.Bot):
         super().__init__(
             command_prefix='!',
             intents=intents,
-            help_command=None
+            help_command=None,
+            # Necessário para on_socket_event_type (contagem de eventos do gateway)
+            enable_debug_events=True,
+            **shard_options(),
+            **member_cache_options(member_cache_policy())
         )
         
         self.message_cache = MessageCache()
         self.site_url = os.getenv('SITE_URL', 'http://localhost:8080')
-    
+        self.watchdog = LoopWatchdog()
+        self.shard_stats = ShardStats()
+        self.members = MemberCache(self)
+        self.admin_index = AdminIndex(self)
+
+    async def setup_hook(self):
+        """Executado antes da conexão com o Discord"""
+        if os.getenv('BOT_LOOP_WATCHDOG', 'True').lower() == 'true':
+            self.watchdog.start()
+        self.members.set_guardian_ids(await repository.guardian_discord_ids())
+
+    async def close(self):
+        """Encerra o bot e o pool de threads do banco"""
+        self.watchdog.stop()
+        await super().close()
+        repository.shutdown()
+
     async def on_ready(self):
         """Evento executado quando o bot está pronto"""
         print(f"🤖 Bot conectado como {self.user}")
         print(f"📊 Conectado em {len(self.guilds)} servidores")
+        if self.shard_count:
+            print(f"🧩 Shards: {self.shard_count} (neste processo: {getattr(self, 'shard_ids', None) or 'todos'})")
         
         # Log do evento
         log_system_event("BOT_STARTED", f"Conectado como {self.user}, Servidores: {len(self.guilds)}")
@@ -159,41 +190,72 @@ class GuardiaoBot(commands.Bot):
         asyncio.create_task(notification_loop())
         print("⏰ Sistema de notificações agendadas iniciado (verificação a cada 5 minutos)")
     
+    async def on_interaction(self, interaction):
+        """Conta as interações por shard"""
+        if interaction.guild:
+            self.shard_stats.record_event(interaction.guild.shard_id)
+
+    async def on_socket_event_type(self, event_type):
+        self.shard_stats.gateway_events += 1
+
+    async def on_shard_connect(self, shard_id):
+        self.shard_stats.record_connection(shard_id, 'connects')
+
+    async def on_shard_disconnect(self, shard_id):
+        self.shard_stats.record_connection(shard_id, 'disconnects')
+
+    async def on_shard_resumed(self, shard_id):
+        self.shard_stats.record_connection(shard_id, 'resumes')
+
     async def on_message(self, message):
         """Evento executado quando uma mensagem é enviada"""
         # Adicionar mensagem ao cache
         self.message_cache.add_message(message)
+        if message.guild:
+            self.shard_stats.record_event(message.guild.shard_id)
         
         # Processar comandos
         await self.process_commands(message)
+
+    async def on_raw_member_remove(self, payload):
+        """Remove do cache o membro que saiu do servidor"""
+        self.members.forget(payload.guild_id, payload.user.id)
+        self.admin_index.member_removed(payload.guild_id, payload.user.id)
+
+    async def on_member_update(self, before, after):
+        if before.roles != after.roles:
+            self.admin_index.member_updated(after)
+
+    async def on_guild_role_create(self, role):
+        self.admin_index.role_changed(role.guild)
+
+    async def on_guild_role_update(self, before, after):
+        if before.permissions != after.permissions:
+            self.admin_index.role_changed(after.guild)
+
+    async def on_guild_role_delete(self, role):
+        self.admin_index.role_changed(role.guild)
+
+    async def on_guild_update(self, before, after):
+        if before.owner_id != after.owner_id:
+            self.admin_index.invalidate(after.id)
+
+    async def on_guild_remove(self, guild):
+        self.admin_index.invalidate(guild.id)
     
     async def create_guardian_profile(self, user: discord.User) -> Guardian:
         """Cria um perfil de Guardião para um usuário"""
-        from asgiref.sync import sync_to_async
-        
-        guardian, created = await sync_to_async(Guardian.objects.get_or_create)(
-            discord_id=user.id,
-            defaults={
-                'discord_username': user.name,
-                'discord_display_name': user.display_name or user.name,
-                'avatar_url': str(user.avatar.url) if user.avatar else None,
-            }
+        self.members.remember_guardian(user)
+        return await repository.get_or_update_guardian(
+            user.id,
+            user.name,
+            user.display_name or user.name,
+            str(user.avatar.url) if user.avatar else None,
         )
-        
-        if not created:
-            # Atualizar informações se já existir
-            guardian.discord_username = user.name
-            guardian.discord_display_name = user.display_name or user.name
-            guardian.avatar_url = str(user.avatar.url) if user.avatar else None
-            await sync_to_async(guardian.save)()
-        
-        return guardian
     
     async def send_notification_to_guardians(self, report: Report):
         """Envia notificação para todos os Guardiões em serviço"""
-        from asgiref.sync import sync_to_async
-        
-        online_guardians = await sync_to_async(list)(Guardian.objects.filter(status='online'))
+        online_guardians = await repository.online_guardians()
         
         for guardian in online_guardians:
             try:
@@ -224,56 +286,22 @@ class GuardiaoBot(commands.Bot):
 
     async def send_scheduled_notifications(self):
         """Envia notificações agendadas a cada 5 minutos para guardiões em serviço"""
-        from asgiref.sync import sync_to_async
-        from core.models import ReportQueue, VotingSession
-        
         try:
-            # Buscar denúncias pendentes que ainda não foram finalizadas
-            pending_reports = await sync_to_async(list)(
-                ReportQueue.objects.filter(status='pending').order_by('created_at')
-            )
+            # Denúncias pendentes na fila (com ou sem sessão de votação em andamento)
+            pending_count = await repository.pending_queue_count()
             
-            if not pending_reports:
+            if not pending_count:
                 print("📋 Nenhuma denúncia pendente encontrada")
                 return
             
-            # Verificar quais denúncias ainda estão realmente pendentes
-            truly_pending_reports = []
-            for queue_item in pending_reports:
-                # Verificar se existe uma sessão de votação ativa para esta denúncia
-                active_session = await sync_to_async(VotingSession.objects.filter(
-                    report=queue_item.report,
-                    status__in=['active', 'pending']
-                ).exists)()
-                
-                if not active_session:
-                    # Não há sessão ativa, denúncia ainda está pendente
-                    truly_pending_reports.append(queue_item)
-                else:
-                    # Há sessão ativa, verificar se ainda está em votação
-                    session = await sync_to_async(VotingSession.objects.filter(
-                        report=queue_item.report,
-                        status__in=['active', 'pending']
-                    ).first)()
-                    
-                    if session and session.status in ['active', 'pending']:
-                        # Sessão ainda ativa, denúncia ainda pendente
-                        truly_pending_reports.append(queue_item)
-            
-            if not truly_pending_reports:
-                print("📋 Nenhuma denúncia realmente pendente (todas têm sessões ativas)")
-                return
-            
             # Buscar guardiões em serviço
-            online_guardians = await sync_to_async(list)(Guardian.objects.filter(status='online'))
+            online_guardians = await repository.online_guardians()
             
             if not online_guardians:
                 print("📋 Nenhum guardião online encontrado")
                 return
             
-            # Contar denúncias realmente pendentes
-            pending_count = len(truly_pending_reports)
-            print(f"📋 Encontradas {pending_count} denúncias realmente pendentes")
+            print(f"📋 Encontradas {pending_count} denúncias pendentes")
             
             for guardian in online_guardians:
                 try:
@@ -317,7 +345,7 @@ class GuardiaoBot(commands.Bot):
                 print(f"❌ Servidor {report.guild_id} não encontrado")
                 return False
             
-            user = guild.get_member(report.reported_user_id)
+            user = await self.members.resolve(guild, report.reported_user_id)
             if not user:
                 print(f"❌ Usuário {report.reported_user_id} não encontrado no servidor")
                 return False
@@ -410,24 +438,20 @@ class GuardiaoBot(commands.Bot):
     
     async def _notify_admins(self, guild: discord.Guild, report: Report, punishment: str):
         """Notifica administradores sobre punições graves"""
-        admins = [member for member in guild.members if member.guild_permissions.administrator]
+        admins = await self.admin_index.moderators(guild)
         
-        for admin in admins:
-            try:
-                embed = discord.Embed(
-                    title="⚠️ Punição Grave Aplicada",
-                    description=f"Uma punição grave foi aplicada em seu servidor.",
-                    color=0xff4757,
-                    timestamp=datetime.now()
-                )
-                
-                embed.add_field(name="Usuário", value=f"<@{report.reported_user_id}>", inline=True)
-                embed.add_field(name="Punição", value=punishment, inline=True)
-                embed.add_field(name="Denúncia", value=f"#{report.id}", inline=True)
-                
-                await admin.send(embed=embed)
-            except Exception as e:
-                print(f"❌ Erro ao notificar admin {admin.display_name}: {e}")
+        embed = discord.Embed(
+            title="⚠️ Punição Grave Aplicada",
+            description=f"Uma punição grave foi aplicada em seu servidor.",
+            color=0xff4757,
+            timestamp=datetime.now()
+        )
+        
+        embed.add_field(name="Usuário", value=f"<@{report.reported_user_id}>", inline=True)
+        embed.add_field(name="Punição", value=punishment, inline=True)
+        embed.add_field(name="Denúncia", value=f"#{report.id}", inline=True)
+        
+        await send_direct_messages(admins, embed=embed)
 
 
 # Instância global do bot
@@ -444,6 +468,11 @@ async def report_command(
     try:
         # Deferir resposta imediatamente para evitar timeout
         await interaction.response.defer(ephemeral=True)
+        
+        # Denunciante e denunciado ficam no cache de membros recentes
+        bot.members.remember(usuario)
+        bot.members.remember(interaction.user)
+        
         # Verificar se o usuário não está se reportando
         if usuario.id == interaction.user.id:
             await interaction.followup.send("❌ Você não pode se reportar!", ephemeral=True)
@@ -470,23 +499,13 @@ async def report_command(
             recent_messages = bot.message_cache.get_recent_messages(interaction.channel.id, 100)
             print(f"🔄 Fallback: usando {len(recent_messages)} mensagens do cache")
         
-        # Criar denúncia no banco de dados
-        from asgiref.sync import sync_to_async
-        
-        report = await sync_to_async(Report.objects.create)(
+        # Criar denúncia no banco de dados e adicionar à fila
+        report = await repository.create_report(
             guild_id=interaction.guild.id,
             channel_id=interaction.channel.id,
             reported_user_id=usuario.id,
             reporter_user_id=interaction.user.id,
             reason=motivo,
-            status='pending'
-        )
-        
-        # Adicionar à fila de denúncias
-        await sync_to_async(ReportQueue.objects.create)(
-            report=report,
-            status='pending',
-            priority=1  # Prioridade padrão
         )
         
         # Log da criação da denúncia
@@ -496,6 +515,7 @@ async def report_command(
         print(f"🔍 Salvando {len(recent_messages)} mensagens para denúncia #{report.id}")
         user_mapping = {}
         user_counter = 1
+        message_entries = []
         
         for msg in recent_messages:
             if msg.author.id not in user_mapping:
@@ -547,17 +567,19 @@ async def report_command(
                     }
                     attachments_info.append(sticker_info)
             
-            await sync_to_async(Message.objects.create)(
-                report=report,
-                original_user_id=msg.author.id,
-                original_message_id=msg.id,
-                anonymized_username=user_mapping[msg.author.id],
-                content=msg.content,
-                has_attachments=has_attachments,
-                attachments_info=attachments_info if attachments_info else None,
-                timestamp=msg.created_at,
-                is_reported_user=(msg.author.id == usuario.id)
-            )
+            message_entries.append({
+                'original_user_id': msg.author.id,
+                'original_message_id': msg.id,
+                'anonymized_username': user_mapping[msg.author.id],
+                'content': msg.content,
+                'has_attachments': has_attachments,
+                'attachments_info': attachments_info if attachments_info else None,
+                'timestamp': msg.created_at,
+                'is_reported_user': (msg.author.id == usuario.id)
+            })
+        
+        # Conteúdo já salvo por denúncias anteriores do mesmo canal é reaproveitado
+        await repository.store_report_messages(report, interaction.channel.id, message_entries)
         
         # Notificar Guardiões em serviço (comentado - agora usa sistema agendado)
         # await bot.send_notification_to_guardians(report)
@@ -600,15 +622,13 @@ async def status_command(
         
         # Converter para formato do banco
         if status.lower() in ['online', 'em-servico']:
-            guardian.status = 'online'
+            new_status = 'online'
             status_display = "Em Serviço"
         else:
-            guardian.status = 'offline'
+            new_status = 'offline'
             status_display = "Fora de Serviço"
         
-        old_status = guardian.status
-        guardian.last_activity = datetime.now()
-        guardian.save()
+        old_status = await repository.set_guardian_status(guardian, new_status)
         
         # Log da mudança de status
         log_guardian_status_change(guardian.id, old_status, guardian.status)
@@ -638,12 +658,11 @@ async def info_command(interaction: discord.Interaction):
     
     try:
         # Estatísticas do sistema
-        from asgiref.sync import sync_to_async
-        
-        total_reports = await sync_to_async(Report.objects.count)()
-        total_guardians = await sync_to_async(Guardian.objects.count)()
-        online_guardians = await sync_to_async(Guardian.objects.filter(status='online').count)()
-        pending_reports = await sync_to_async(Report.objects.filter(status='pending').count)()
+        counts = await repository.system_counts()
+        total_reports = counts['total_reports']
+        total_guardians = counts['total_guardians']
+        online_guardians = counts['online_guardians']
+        pending_reports = counts['pending_reports']
         
         embed = discord.Embed(
             title="🛡️ Sistema Guardião",
@@ -0,0 +1,156 @@
+"""
+Política de cache de membros do bot
+
+BOT_MEMBER_CACHE define quantos membros o bot mantém em memória:
+
+- all: comportamento padrão do discord.py (todos os membros, chunking na
+  inicialização);
+- lazy: o discord.py guarda os membros que aparecem em eventos, e a lista
+  completa de um servidor só é carregada (chunk) quando for necessária;
+- relevant (padrão): o discord.py não guarda membros; o bot mantém apenas
+  Guardiões e um LRU (BOT_MEMBER_LRU_SIZE) de denunciantes e denunciados
+  recentes, buscando os demais sob demanda com fetch_member; a lista completa
+  de um servidor vem do chunking do gateway sem ser guardada.
+"""
+import os
+import resource
+from collections import OrderedDict
+import discord
+
+POLICIES = ('all', 'lazy', 'relevant')
+
+
+def member_cache_policy():
+    policy = os.getenv('BOT_MEMBER_CACHE', 'relevant').lower()
+    return policy if policy in POLICIES else 'relevant'
+
+
+def client_options(policy):
+    """Argumentos de cache de membros para o construtor do bot"""
+    if policy == 'all':
+        return {}
+    if policy == 'lazy':
+        return {'chunk_guilds_at_startup': False}
+    return {
+        'chunk_guilds_at_startup': False,
+        'member_cache_flags': discord.MemberCacheFlags.none(),
+    }
+
+
+def process_rss_bytes():
+    """Memória residente atual do processo (pico, se /proc não existir)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class MemberCache:
+    """Resolve membros respeitando a política de cache"""
+
+    def __init__(self, bot, policy=None, lru_size=None):
+        self.bot = bot
+        self.policy = policy or member_cache_policy()
+        self.lru_size = lru_size or int(os.getenv('BOT_MEMBER_LRU_SIZE', '1000'))
+        self.guardian_ids = set()
+        self.guardians = {}       # (guild_id, user_id) -> Member
+        self.recent = OrderedDict()  # (guild_id, user_id) -> Member
+        self.stats = {'hits': 0, 'misses': 0, 'fetches': 0, 'not_found': 0, 'chunks': 0}
+
+    def set_guardian_ids(self, discord_ids):
+        self.guardian_ids = set(discord_ids)
+
+    def remember(self, member):
+        """Guarda um membro (Guardiões ficam fixos; os demais entram no LRU)"""
+        if self.policy != 'relevant' or not isinstance(member, discord.Member):
+            return
+        key = (member.guild.id, member.id)
+        if member.id in self.guardian_ids:
+            self.guardians[key] = member
+            return
+        self.recent[key] = member
+        self.recent.move_to_end(key)
+        while len(self.recent) > self.lru_size:
+            self.recent.popitem(last=False)
+
+    def remember_guardian(self, member):
+        self.guardian_ids.add(member.id)
+        if isinstance(member, discord.Member):
+            self.recent.pop((member.guild.id, member.id), None)
+        self.remember(member)
+
+    def forget(self, guild_id, user_id):
+        self.guardians.pop((guild_id, user_id), None)
+        self.recent.pop((guild_id, user_id), None)
+
+    async def resolve(self, guild, user_id):
+        """Membro do servidor, buscando na API do Discord se não estiver em cache"""
+        member = guild.get_member(user_id)
+        if member is None:
+            key = (guild.id, user_id)
+            member = self.guardians.get(key) or self.recent.get(key)
+            if member is not None and key in self.recent:
+                self.recent.move_to_end(key)
+        if member is not None:
+            self.stats['hits'] += 1
+            return member
+
+        self.stats['misses'] += 1
+        try:
+            self.stats['fetches'] += 1
+            member = await guild.fetch_member(user_id)
+        except (discord.NotFound, discord.Forbidden):
+            self.stats['not_found'] += 1
+            return None
+        self.remember(member)
+        return member
+
+    async def query(self, guild, user_ids):
+        """Estado atual de membros específicos, pelo gateway e sem guardar no cache"""
+        members = []
+        user_ids = list(user_ids)
+        for start in range(0, len(user_ids), 100):
+            batch = user_ids[start:start + 100]
+            members.extend(await guild.query_members(user_ids=batch, limit=len(batch), cache=False))
+        return members
+
+    async def guild_members(self, guild):
+        """Todos os membros do servidor, carregados apenas quando necessário"""
+        if self.policy == 'relevant':
+            # Chunking pelo gateway (sem as páginas de 1000 da API REST), sem guardar no cache
+            self.stats['chunks'] += 1
+            return await guild.chunk(cache=False)
+        if not guild.chunked:
+            self.stats['chunks'] += 1
+            await guild.chunk()
+        return guild.members
+
+    def snapshot(self):
+        """Memória do processo e membros em cache por servidor"""
+        rss = process_rss_bytes()
+        guilds = self.bot.guilds
+        per_guild = {}
+        for guild in guilds:
+            per_guild[guild.id] = {
+                'name': guild.name,
+                'member_count': guild.member_count,
+                'cached_members': len(guild.members),
+            }
+        for guild_id, _ in list(self.guardians) + list(self.recent):
+            if guild_id in per_guild:
+                per_guild[guild_id]['cached_members'] += 1
+
+        largest = sorted(per_guild.items(), key=lambda item: item[1]['cached_members'], reverse=True)[:20]
+        return {
+            'policy': self.policy,
+            'rss_mb': round(rss / 1024 / 1024, 1),
+            # Média simples: a memória não é medida por servidor
+            'rss_avg_per_guild_kb': round(rss / 1024 / len(guilds), 1) if guilds else None,
+            'cached_members': sum(g['cached_members'] for g in per_guild.values()),
+            'guardians_cached': len(self.guardians),
+            'recent_cached': len(self.recent),
+            'lru_size': self.lru_size,
+            **self.stats,
+            'guilds': {str(guild_id): data for guild_id, data in largest},
+        }
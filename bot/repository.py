@@ -0,0 +1,204 @@
+"""
+Acesso ao banco de dados do bot Discord
+
+Todas as operações de ORM do bot passam por aqui e rodam em um pool de
+threads dedicado e limitado (BOT_DB_THREADS), nunca na thread do event loop.
+Cada thread do pool tem a própria conexão do Django, renovada com
+close_old_connections antes e depois de cada operação.
+"""
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from core.models import Guardian, Report, ReportQueue, Vote
+from core.duty import record_status_change
+from core.transcripts import store_report_messages
+from core.pagination import KeysetPaginator, REPORTS_ORDER, GUARDIANS_ORDER
+
+
+def _call(func, args, kwargs):
+    """Executa a função na thread do pool com conexões válidas"""
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+class BotRepository:
+    """Operações de banco do bot, expostas como corrotinas"""
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or int(os.getenv('BOT_DB_THREADS', '8'))
+        self._executor = None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='bot-db')
+        return self._executor
+
+    async def run(self, func, *args, **kwargs):
+        """Executa uma função síncrona de ORM no pool de threads do banco"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(_call, func, args, kwargs))
+
+    def shutdown(self):
+        """Encerra o pool de threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    # ===== Guardiões =====
+
+    async def get_or_update_guardian(self, user_id, username, display_name, avatar_url):
+        """Cria o perfil do Guardião ou atualiza os dados do Discord"""
+        def operation():
+            guardian, created = Guardian.objects.get_or_create(
+                discord_id=user_id,
+                defaults={
+                    'discord_username': username,
+                    'discord_display_name': display_name,
+                    'avatar_url': avatar_url,
+                }
+            )
+            if not created and (
+                guardian.discord_username != username
+                or guardian.discord_display_name != display_name
+                or guardian.avatar_url != avatar_url
+            ):
+                guardian.discord_username = username
+                guardian.discord_display_name = display_name
+                guardian.avatar_url = avatar_url
+                guardian.save(update_fields=['discord_username', 'discord_display_name', 'avatar_url', 'updated_at'])
+            return guardian
+
+        return await self.run(operation)
+
+    async def set_guardian_status(self, guardian, status):
+        """Altera o status do Guardião e registra o período em serviço"""
+        def operation():
+            old_status = guardian.status
+            guardian.status = status
+            guardian.last_activity = timezone.now()
+            guardian.save(update_fields=['status', 'last_activity', 'updated_at'])
+            record_status_change(guardian.id, status)
+            return old_status
+
+        return await self.run(operation)
+
+    async def guardian_discord_ids(self):
+        """IDs do Discord de todos os Guardiões"""
+        return await self.run(lambda: list(Guardian.objects.values_list('discord_id', flat=True)))
+
+    async def online_guardians(self):
+        """Guardiões em serviço"""
+        return await self.run(lambda: list(Guardian.objects.filter(status='online')))
+
+    async def list_guardians(self, limit=10, cursor=None):
+        """Página do ranking de Guardiões (KeysetPage)"""
+        def operation():
+            paginator = KeysetPaginator(Guardian.objects.all(), GUARDIANS_ORDER, limit)
+            return paginator.page(cursor, with_estimate=True)
+
+        return await self.run(operation)
+
+    # ===== Denúncias =====
+
+    async def create_report(self, guild_id, channel_id, reported_user_id, reporter_user_id, reason):
+        """Cria a denúncia e a coloca na fila"""
+        def operation():
+            with transaction.atomic():
+                report = Report.objects.create(
+                    guild_id=guild_id,
+                    channel_id=channel_id,
+                    reported_user_id=reported_user_id,
+                    reporter_user_id=reporter_user_id,
+                    reason=reason,
+                    status='pending'
+                )
+                ReportQueue.objects.create(
+                    report=report,
+                    status='pending',
+                    priority=1  # Prioridade padrão
+                )
+            return report
+
+        return await self.run(operation)
+
+    async def store_report_messages(self, report, channel_id, entries):
+        """Salva as mensagens anonimizadas da denúncia"""
+        return await self.run(store_report_messages, report, channel_id, entries)
+
+    async def pending_queue_count(self):
+        """Quantidade de denúncias pendentes na fila"""
+        return await self.run(lambda: ReportQueue.objects.filter(status='pending').count())
+
+    async def list_reports(self, status=None, limit=5, cursor=None):
+        """Página das denúncias mais recentes, opcionalmente por status (KeysetPage)"""
+        def operation():
+            reports = Report.objects.all()
+            if status:
+                reports = reports.filter(status=status)
+            return KeysetPaginator(reports, REPORTS_ORDER, limit).page(cursor, with_estimate=not status)
+
+        return await self.run(operation)
+
+    # ===== Estatísticas =====
+
+    async def system_counts(self):
+        """Contagens exibidas no /info"""
+        def operation():
+            reports = Report.objects.aggregate(
+                total=Count('id'),
+                pending=Count('id', filter=Q(status='pending')),
+            )
+            guardians = Guardian.objects.aggregate(
+                total=Count('id'),
+                online=Count('id', filter=Q(status='online')),
+            )
+            return {
+                'total_reports': reports['total'],
+                'pending_reports': reports['pending'],
+                'total_guardians': guardians['total'],
+                'online_guardians': guardians['online'],
+            }
+
+        return await self.run(operation)
+
+    async def admin_stats(self):
+        """Contagens do painel administrativo (uma consulta por tabela)"""
+        def operation():
+            reports = Report.objects.aggregate(
+                total=Count('id'),
+                pending=Count('id', filter=Q(status='pending')),
+                voting=Count('id', filter=Q(status='voting')),
+                completed=Count('id', filter=Q(status='completed')),
+            )
+            guardians = Guardian.objects.aggregate(
+                total=Count('id'),
+                online=Count('id', filter=Q(status='online')),
+            )
+            votes = Vote.objects.aggregate(
+                total=Count('id'),
+                improcedente=Count('id', filter=Q(vote_type='improcedente')),
+                intimidou=Count('id', filter=Q(vote_type='intimidou')),
+                grave=Count('id', filter=Q(vote_type='grave')),
+            )
+            return {'reports': reports, 'guardians': guardians, 'votes': votes}
+
+        return await self.run(operation)
+
+    # ===== Manutenção =====
+
+    async def run_retention(self):
+        """Aplica as políticas de retenção"""
+        from core.retention import retention_manager
+        return await self.run(retention_manager.run_all)
+
+
+# Instância global
+repository = BotRepository()
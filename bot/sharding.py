@@ -0,0 +1,137 @@
+"""
+Sharding do bot Discord
+
+BOT_SHARDING=true usa commands.AutoShardedBot. Sem BOT_SHARD_COUNT, o
+Discord recomenda a quantidade de shards e um único processo abre todos.
+Para dividir os shards entre processos, defina BOT_SHARD_COUNT (total) e
+BOT_SHARD_IDS (shards deste processo, ex.: "0-3" ou "0,2"). BOT_SHARD_URLS
+informa onde está o servidor API de cada shard (ex.:
+"0-3=http://bot-a:8081,4-7=http://bot-b:8081"), permitindo que qualquer
+processo encaminhe uma requisição ao processo dono do servidor.
+"""
+import os
+import time
+from collections import defaultdict, deque
+
+
+def sharding_enabled():
+    return os.getenv('BOT_SHARDING', 'False').lower() == 'true'
+
+
+def _parse_ids(value):
+    """'0-3,6' -> [0, 1, 2, 3, 6]"""
+    ids = []
+    for part in value.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-', 1)
+            ids.extend(range(int(start), int(end) + 1))
+        else:
+            ids.append(int(part))
+    return ids
+
+
+def shard_options():
+    """Argumentos de shard para o construtor do bot"""
+    if not sharding_enabled():
+        return {}
+    options = {}
+    if os.getenv('BOT_SHARD_COUNT'):
+        options['shard_count'] = int(os.getenv('BOT_SHARD_COUNT'))
+        if os.getenv('BOT_SHARD_IDS'):
+            options['shard_ids'] = _parse_ids(os.getenv('BOT_SHARD_IDS'))
+    return options
+
+
+def shard_for_guild(guild_id, shard_count):
+    """Shard responsável pelo servidor (fórmula do Discord)"""
+    return (int(guild_id) >> 22) % shard_count
+
+
+def parse_shard_urls(value):
+    """'0-3=http://a:8081,4-7=http://b:8081' -> {shard_id: url}"""
+    urls = {}
+    for entry in value.split(','):
+        if '=' not in entry:
+            continue
+        ids, url = entry.split('=', 1)
+        for shard_id in _parse_ids(ids):
+            urls[shard_id] = url.strip().rstrip('/')
+    return urls
+
+
+class ShardRouter:
+    """Decide se um servidor pertence a este processo ou a outro"""
+
+    def __init__(self, bot, shard_urls=None):
+        self.bot = bot
+        if shard_urls is None:
+            shard_urls = parse_shard_urls(os.getenv('BOT_SHARD_URLS', ''))
+        self.shard_urls = shard_urls
+
+    @property
+    def shard_count(self):
+        return self.bot.shard_count or 1
+
+    @property
+    def local_shards(self):
+        shard_ids = getattr(self.bot, 'shard_ids', None)
+        if shard_ids is None:
+            # AutoShardedBot sem shard_ids abre todos os shards
+            return set(range(self.shard_count))
+        return set(shard_ids)
+
+    def shard_for(self, guild_id):
+        return shard_for_guild(guild_id, self.shard_count)
+
+    def is_local(self, guild_id):
+        return self.shard_for(guild_id) in self.local_shards
+
+    def owner_url(self, guild_id):
+        """URL do servidor API do processo dono do servidor (None se desconhecida)"""
+        return self.shard_urls.get(self.shard_for(guild_id))
+
+
+class ShardStats:
+    """Latência e taxa de eventos por shard"""
+
+    def __init__(self, window=60):
+        self.window = window
+        self.events = defaultdict(deque)  # shard_id -> instantes dos eventos
+        self.connections = defaultdict(lambda: {'connects': 0, 'disconnects': 0, 'resumes': 0})
+        self.gateway_events = 0
+
+    def record_event(self, shard_id):
+        now = time.monotonic()
+        events = self.events[shard_id or 0]
+        events.append(now)
+        while events and now - events[0] > self.window:
+            events.popleft()
+
+    def record_connection(self, shard_id, kind):
+        self.connections[shard_id][kind] += 1
+
+    def snapshot(self, bot):
+        """Métricas por shard para o /stats/"""
+        now = time.monotonic()
+        latencies = getattr(bot, 'latencies', None) or [(0, bot.latency)]
+        guilds_per_shard = defaultdict(int)
+        for guild in bot.guilds:
+            guilds_per_shard[guild.shard_id or 0] += 1
+
+        shards = {}
+        for shard_id, latency in latencies:
+            events = [t for t in self.events.get(shard_id, ()) if now - t <= self.window]
+            shards[str(shard_id)] = {
+                'latency_ms': round(latency * 1000, 1) if latency == latency else None,  # NaN antes de conectar
+                'guilds': guilds_per_shard.get(shard_id, 0),
+                'events_per_minute': round(len(events) * 60 / self.window, 1),
+                **self.connections[shard_id],
+            }
+        return {
+            'shard_count': bot.shard_count or 1,
+            'gateway_events': self.gateway_events,
+            'shards': shards,
+        }
@@ -1,3 +1,57 @@
-from django.test import TestCase
+import asyncio
+import threading
+from django.core.exceptions import SynchronousOnlyOperation
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import TransactionTestCase
+from core.models import Guardian
+from bot.repository import BotRepository
 
-# Create your tests here.
+
+class RepositoryThreadTests(TransactionTestCase):
+    """Nenhuma consulta do bot pode rodar na thread do event loop"""
+
+    def setUp(self):
+        self.query_threads = []
+        self.repository = BotRepository(max_workers=2)
+        connection_created.connect(self._wrap_connection)
+        for connection in connections.all():
+            self._wrap_connection(connection=connection)
+
+    def tearDown(self):
+        connection_created.disconnect(self._wrap_connection)
+        self.repository.shutdown()
+
+    def _wrap_connection(self, sender=None, connection=None, **kwargs):
+        if self._record_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self._record_query)
+
+    def _record_query(self, execute, sql, params, many, context):
+        self.query_threads.append(threading.get_ident())
+        return execute(sql, params, many, context)
+
+    def test_queries_run_off_the_loop_thread(self):
+        async def scenario():
+            loop_thread = threading.get_ident()
+            guardian = await self.repository.get_or_update_guardian(1, 'user', 'User', None)
+            old_status = await self.repository.set_guardian_status(guardian, 'online')
+            counts = await self.repository.system_counts()
+            await self.repository.admin_stats()
+            await self.repository.list_guardians(10)
+            await self.repository.pending_queue_count()
+            return loop_thread, old_status, counts
+
+        loop_thread, old_status, counts = asyncio.run(scenario())
+
+        self.assertTrue(self.query_threads)
+        self.assertNotIn(loop_thread, self.query_threads)
+        self.assertEqual(old_status, 'offline')
+        self.assertEqual(counts['online_guardians'], 1)
+        self.assertEqual(Guardian.objects.get(discord_id=1).status, 'online')
+
+    def test_sync_orm_on_loop_is_rejected(self):
+        async def scenario():
+            Guardian.objects.count()
+
+        with self.assertRaises(SynchronousOnlyOperation):
+            asyncio.run(scenario())
@@ -0,0 +1,151 @@
+"""
+Monitor de atraso do event loop do bot
+
+Uma task mede continuamente o atraso do loop (quanto um sleep curto demora
+além do esperado). Uma thread de vigia detecta travamentos: se o loop não
+avança por mais de BOT_LOOP_STALL_MS, a pilha da thread do loop é capturada,
+mostrando o código que está bloqueando. Opcionalmente (BOT_ASYNCIO_DEBUG=true)
+ativa o modo debug do asyncio, que registra callbacks mais lentos que
+BOT_SLOW_CALLBACK_MS. Os números ficam disponíveis no /stats/ do servidor API.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from bot.logging_config import log_error
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """Recebe os avisos de callback lento do logger 'asyncio'"""
+
+    def __init__(self, watchdog):
+        super().__init__(level=logging.WARNING)
+        self.watchdog = watchdog
+
+    def emit(self, record):
+        message = record.getMessage()
+        if message.startswith('Executing '):
+            self.watchdog.record_slow_callback(message)
+
+
+class LoopWatchdog:
+    """Mede o atraso do event loop e captura a pilha quando ele trava"""
+
+    def __init__(self, interval=None, stall_threshold=None, slow_callback=None, asyncio_debug=None, samples=600):
+        self.interval = interval or float(os.getenv('BOT_LOOP_LAG_INTERVAL', '0.5'))
+        self.stall_threshold = stall_threshold or float(os.getenv('BOT_LOOP_STALL_MS', '1000')) / 1000
+        self.slow_callback = slow_callback or float(os.getenv('BOT_SLOW_CALLBACK_MS', '100')) / 1000
+        if asyncio_debug is None:
+            asyncio_debug = os.getenv('BOT_ASYNCIO_DEBUG', 'False').lower() == 'true'
+        self.asyncio_debug = asyncio_debug
+
+        self.lags = deque(maxlen=samples)
+        self.stalls = deque(maxlen=10)
+        self.slow_callbacks = deque(maxlen=20)
+        self.counters = {'stalls': 0, 'slow_callbacks': 0}
+
+        self._loop = None
+        self._loop_thread_id = None
+        self._last_tick = None
+        self._task = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._log_handler = None
+
+    def start(self):
+        """Inicia a medição; deve ser chamado de dentro do event loop"""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+
+        self._loop.slow_callback_duration = self.slow_callback
+        if self.asyncio_debug:
+            self._loop.set_debug(True)
+            self._log_handler = _SlowCallbackHandler(self)
+            logging.getLogger('asyncio').addHandler(self._log_handler)
+
+        self._task = self._loop.create_task(self._measure())
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Encerra a task e a thread de vigia"""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._log_handler is not None:
+            logging.getLogger('asyncio').removeHandler(self._log_handler)
+            self._log_handler = None
+
+    async def _measure(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.lags.append(max(0.0, now - started - self.interval))
+            self._last_tick = now
+
+    def _watch(self):
+        """Thread de vigia: captura a pilha do loop enquanto ele está travado"""
+        reported_tick = None
+        while not self._stop.wait(self.stall_threshold / 2):
+            last_tick = self._last_tick
+            blocked_for = time.monotonic() - last_tick - self.interval
+            if blocked_for < self.stall_threshold or last_tick == reported_tick:
+                continue
+
+            # Um registro por travamento
+            reported_tick = last_tick
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = ''.join(traceback.format_stack(frame)) if frame is not None else ''
+            self.record_stall(blocked_for, stack)
+
+    def record_stall(self, blocked_for, stack):
+        self.counters['stalls'] += 1
+        self.stalls.append({
+            'at': datetime.now().isoformat(),
+            'blocked_ms': round(blocked_for * 1000),
+            'stack': stack,
+        })
+        log_error(f"Event loop travado há {blocked_for * 1000:.0f} ms", context=stack)
+
+    def record_slow_callback(self, message):
+        self.counters['slow_callbacks'] += 1
+        self.slow_callbacks.append({'at': datetime.now().isoformat(), 'message': message})
+
+    def snapshot(self):
+        """Percentis de atraso (ms) e os travamentos mais recentes"""
+        lags = sorted(self.lags)
+        return {
+            'running': self._task is not None,
+            'samples': len(lags),
+            'lag_ms': {
+                'p50': round(_percentile(lags, 0.50) * 1000, 2),
+                'p95': round(_percentile(lags, 0.95) * 1000, 2),
+                'p99': round(_percentile(lags, 0.99) * 1000, 2),
+                'max': round((lags[-1] if lags else 0.0) * 1000, 2),
+            },
+            'stall_threshold_ms': round(self.stall_threshold * 1000),
+            'slow_callback_ms': round(self.slow_callback * 1000),
+            'asyncio_debug': self.asyncio_debug,
+            'stalls': self.counters['stalls'],
+            'slow_callbacks': self.counters['slow_callbacks'],
+            'recent_stalls': list(self.stalls),
+            'recent_slow_callbacks': list(self.slow_callbacks),
+        }
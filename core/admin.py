@@ -100,11 +100,13 @@ class MessageAdmin(admin.ModelAdmin):
     search_fields = ['anonymized_username', 'content']
     readonly_fields = ['created_at']
     
+    list_select_related = ['report', 'blob']
+    
     def content_preview(self, obj):
         """Exibe uma prévia do conteúdo da mensagem"""
-        if len(obj.content) > 50:
-            return obj.content[:50] + "..."
-        return obj.content
+        if len(obj.text) > 50:
+            return obj.text[:50] + "..."
+        return obj.text
     content_preview.short_description = "Prévia do Conteúdo"
 
 
@@ -6,6 +6,7 @@ from . import api_views
 
 urlpatterns = [
     # Endpoints para o bot Discord
+    path('reports/', api_views.list_reports, name='api_list_reports'),
     path('reports/create/', api_views.create_report, name='api_create_report'),
     path('reports/<int:report_id>/', api_views.get_report_details, name='api_report_details'),
     path('punishments/apply/', api_views.apply_punishment, name='api_apply_punishment'),
@@ -14,11 +15,13 @@ urlpatterns = [
     path('votes/cast/', api_views.cast_vote, name='api_cast_vote'),
     
     # Endpoints para Guardiões
+    path('guardians/', api_views.list_guardians, name='api_list_guardians'),
     path('guardians/online/', api_views.get_online_guardians, name='api_online_guardians'),
     path('guardians/status/', api_views.update_guardian_status, name='api_update_status'),
     
     # Endpoints para estatísticas
     path('stats/dashboard/', api_views.get_dashboard_stats, name='api_dashboard_stats'),
+    path('stats/database/', api_views.get_database_stats, name='api_database_stats'),
     
     # Endpoints para autenticação
     path('auth/check-session/', api_views.check_session, name='api_check_session'),
@@ -3,18 +3,31 @@ API Views para o Sistema Guardião
 Integração entre Django e Bot Discord
 """
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
+from django.utils import timezone
 from django.views import View
 from django.http import JsonResponse
 import json
 import requests
 import os
-from .models import Guardian, Report, Vote, Message, Appeal, VotingSession, SessionGuardian, ReportQueue
-from .serializers import ReportSerializer, VoteSerializer, GuardianSerializer
+from .models import Guardian, Report, Vote, Appeal, VotingSession, SessionGuardian, ReportQueue
+from .serializers import (
+    ReportSerializer, VoteSerializer, GuardianSerializer, ReportSummarySerializer,
+    GuardianSummarySerializer, optimize_queryset, shape_from_request,
+)
+from .transcripts import get_report_transcript, store_report_messages
+from .duty import record_status_change
+from .identity import request_guardian
+from guardiao.db_pool import pool_stats
+from .throttling import POLL_THROTTLES, poll_hint
+from .pagination import KeysetPagination, GuardianRankingPagination
+from .versioning import (
+    conditional_poll, new_reports_etag, guardian_status_etag, pending_report_etag, session_etag,
+)
 
 
 @api_view(['POST'])
@@ -47,16 +60,19 @@ def create_report(request):
         
         # Criar mensagens se fornecidas
         if 'messages' in data:
-            for msg_data in data['messages']:
-                Message.objects.create(
-                    report=report,
-                    original_user_id=msg_data['original_user_id'],
-                    original_message_id=msg_data['original_message_id'],
-                    anonymized_username=msg_data['anonymized_username'],
-                    content=msg_data['content'],
-                    timestamp=msg_data['timestamp'],
-                    is_reported_user=msg_data.get('is_reported_user', False)
-                )
+            store_report_messages(report, data['channel_id'], [
+                {
+                    'original_user_id': msg_data['original_user_id'],
+                    'original_message_id': msg_data['original_message_id'],
+                    'anonymized_username': msg_data['anonymized_username'],
+                    'content': msg_data['content'],
+                    'has_attachments': msg_data.get('has_attachments', False),
+                    'attachments_info': msg_data.get('attachments_info'),
+                    'timestamp': msg_data['timestamp'],
+                    'is_reported_user': msg_data.get('is_reported_user', False),
+                }
+                for msg_data in data['messages']
+            ])
         
         # Notificar Guardiões online
         notify_guardians(report)
@@ -132,13 +148,15 @@ def get_online_guardians(request):
     Endpoint para obter lista de Guardiões online
     """
     try:
-        guardians = Guardian.objects.filter(status='online')
-        serializer = GuardianSerializer(guardians, many=True)
+        fields, expand = shape_from_request(request)
+        guardians = optimize_queryset(Guardian.objects.filter(status='online'), GuardianSerializer, fields, expand)
+        serializer = GuardianSerializer(guardians, many=True, fields=fields)
+        data = serializer.data
         
         return Response({
             'success': True,
-            'guardians': serializer.data,
-            'count': guardians.count()
+            'guardians': data,
+            'count': len(data)
         })
         
     except Exception as e:
@@ -148,6 +166,37 @@ def get_online_guardians(request):
         )
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def list_reports(request):
+    """
+    Lista de denúncias paginada por cursor (?cursor=, ?status=, ?estimate=1,
+    ?fields=, ?expand=messages,votes)
+    """
+    fields, expand = shape_from_request(request)
+    reports = optimize_queryset(Report.objects.all(), ReportSerializer, fields, expand, keep=('created_at',))
+    if request.GET.get('status'):
+        reports = reports.filter(status=request.GET['status'])
+    
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(reports, request)
+    serializer = ReportSerializer(page, many=True, fields=fields, expand=expand)
+    return paginator.get_paginated_response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def list_guardians(request):
+    """
+    Ranking de Guardiões paginado por cursor (?cursor=, ?estimate=1, ?fields=)
+    """
+    fields, expand = shape_from_request(request)
+    guardians = optimize_queryset(Guardian.objects.all(), GuardianSerializer, fields, expand, keep=('points',))
+    paginator = GuardianRankingPagination()
+    page = paginator.paginate_queryset(guardians, request)
+    return paginator.get_paginated_response(GuardianSerializer(page, many=True, fields=fields).data)
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def cast_vote(request):
@@ -244,11 +293,13 @@ def cast_vote(request):
 @permission_classes([AllowAny])
 def get_report_details(request, report_id):
     """
-    Endpoint para obter detalhes de uma denúncia
+    Endpoint para obter detalhes de uma denúncia (mensagens e votos inclusos,
+    salvo ?expand= ou ?fields= diferentes)
     """
     try:
-        report = Report.objects.get(id=report_id)
-        serializer = ReportSerializer(report)
+        fields, expand = shape_from_request(request, default_expand=ReportSerializer.Meta.expandable_fields)
+        report = optimize_queryset(Report.objects.all(), ReportSerializer, fields, expand).get(id=report_id)
+        serializer = ReportSerializer(report, fields=fields, expand=expand)
         
         return Response({
             'success': True,
@@ -307,7 +358,7 @@ def update_guardian_status(request):
             )
         
         try:
-            guardian = Guardian.objects.get(discord_id=guardian_discord_id)
+            guardian = request_guardian(request)
             print(f"✅ Guardião encontrado: {guardian.discord_display_name} (ID: {guardian.discord_id})")
         except Guardian.DoesNotExist:
             print("❌ Guardião não encontrado")
@@ -318,7 +369,10 @@ def update_guardian_status(request):
         
         old_status = guardian.status
         guardian.status = new_status
-        guardian.save()
+        # Entrar em serviço conta como atividade (core/duty.py)
+        guardian.last_activity = timezone.now()
+        guardian.save(update_fields=['status', 'last_activity', 'updated_at'])
+        record_status_change(guardian.id, new_status)
         print(f"✅ Status alterado de {old_status} para {new_status}")
         print(f"🔍 Verificando status após save: {guardian.status}")
         
@@ -370,6 +424,23 @@ def get_dashboard_stats(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+def get_database_stats(request):
+    """
+    Endpoint com as métricas de conexão com o banco deste processo
+    (checkouts, esperas e tamanho do pool, quando DB_POOL está ativo)
+    """
+    return Response({
+        'success': True,
+        'pid': os.getpid(),
+        'databases': pool_stats(),
+    })
+
+
+@poll_hint('guardian')
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@throttle_classes(POLL_THROTTLES)
+@conditional_poll(session_etag)
 def check_session(request):
     """
     Endpoint para verificar se o usuário está logado
@@ -404,8 +475,11 @@ def check_session(request):
         )
 
 
+@poll_hint('reports')
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@throttle_classes(POLL_THROTTLES)
+@conditional_poll(new_reports_etag)
 def check_new_reports(request):
     """
     Endpoint para verificar novas denúncias (para notificações em tempo real)
@@ -435,17 +509,7 @@ def check_new_reports(request):
             # Primeira verificação - retornar todas as denúncias pendentes
             new_reports = Report.objects.filter(status='pending').order_by('-created_at')
         
-        reports_data = []
-        for report in new_reports:
-            reports_data.append({
-                'id': report.id,
-                'reason': report.reason,
-                'created_at': report.created_at.isoformat(),
-                'reported_user_id': report.reported_user_id,
-                'reporter_user_id': report.reporter_user_id,
-                'guild_id': report.guild_id,
-                'channel_id': report.channel_id,
-            })
+        reports_data = ReportSummarySerializer(new_reports).data
         
         from django.utils import timezone
         
@@ -476,6 +540,7 @@ def notify_guardians(report):
         bot_url = os.getenv('BOT_API_URL', 'http://localhost:8081')
         requests.post(f'{bot_url}/notify_guardians/', json={
             'report_id': report.id,
+            'guild_id': report.guild_id,
             'guardian_ids': list(online_guardians.values_list('discord_id', flat=True))
         })
         
@@ -502,8 +567,11 @@ def notify_bot_apply_punishment(report):
 
 # ===== NOVOS ENDPOINTS PARA SISTEMA DE FILA E MODAL =====
 
+@poll_hint('guardian')
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@throttle_classes(POLL_THROTTLES)
+@conditional_poll(pending_report_etag)
 def get_pending_report_for_guardian(request, guardian_id):
     """
     Endpoint para obter a próxima denúncia pendente para um Guardião
@@ -624,20 +692,7 @@ def get_pending_report_for_guardian(request, guardian_id):
                     session_data['time_remaining'] = max(0, int(remaining.total_seconds()))
                 
                 # Buscar mensagens da denúncia
-                messages = Message.objects.filter(report=active_session.session.report).order_by('timestamp')
-                session_data['messages'] = [
-                    {
-                        'id': msg.id,
-                        'original_user_id': msg.original_user_id,
-                        'anonymized_username': msg.anonymized_username,
-                        'content': msg.content,
-                        'timestamp': msg.timestamp.isoformat(),
-                        'is_reported_user': msg.is_reported_user,
-                        'has_attachments': msg.has_attachments,
-                        'attachments_info': msg.attachments_info
-                    }
-                    for msg in messages
-                ]
+                session_data['messages'] = get_report_transcript(active_session.session.report_id)
                 
                 return Response(session_data)
         
@@ -773,20 +828,7 @@ def get_pending_report_for_guardian(request, guardian_id):
                 session_data['time_remaining'] = max(0, int(remaining.total_seconds()))
                 
                 # Buscar mensagens da denúncia
-                messages = Message.objects.filter(report=existing_session.report).order_by('timestamp')
-                session_data['messages'] = [
-                    {
-                        'id': msg.id,
-                        'original_user_id': msg.original_user_id,
-                        'anonymized_username': msg.anonymized_username,
-                        'content': msg.content,
-                        'timestamp': msg.timestamp.isoformat(),
-                        'is_reported_user': msg.is_reported_user,
-                        'has_attachments': msg.has_attachments,
-                        'attachments_info': msg.attachments_info
-                    }
-                    for msg in messages
-                ]
+                session_data['messages'] = get_report_transcript(existing_session.report_id)
                 
                 return Response(session_data)
             
@@ -833,22 +875,7 @@ def get_pending_report_for_guardian(request, guardian_id):
         }
         
         # Buscar mensagens da denúncia
-        messages = Message.objects.filter(report=session.report).order_by('timestamp')
-        print(f"🔍 Mensagens encontradas para denúncia {session.report.id}: {messages.count()}")
-        
-        session_data['messages'] = [
-            {
-                'id': msg.id,
-                'original_user_id': msg.original_user_id,
-                'anonymized_username': msg.anonymized_username,
-                'content': msg.content,
-                'timestamp': msg.timestamp.isoformat(),
-                'is_reported_user': msg.is_reported_user,
-                'has_attachments': msg.has_attachments,
-                'attachments_info': msg.attachments_info
-            }
-            for msg in messages
-        ]
+        session_data['messages'] = get_report_transcript(session.report_id)
         
         print(f"🔍 Mensagens retornadas: {len(session_data['messages'])}")
         
@@ -861,8 +888,11 @@ def get_pending_report_for_guardian(request, guardian_id):
         )
 
 
+@poll_hint('guardian')
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@throttle_classes(POLL_THROTTLES)
+@conditional_poll(guardian_status_etag)
 def get_guardian_status(request, guardian_id):
     """
     Endpoint para verificar o status de um Guardião
@@ -870,19 +900,15 @@ def get_guardian_status(request, guardian_id):
     try:
         print(f"🔍 Verificando status do Guardião ID: {guardian_id}")
         try:
-            guardian = Guardian.objects.get(discord_id=guardian_id)
-            print(f"✅ Guardião encontrado: {guardian.discord_display_name} (Status: {guardian.status})")
+            rows = GuardianSummarySerializer(Guardian.objects.filter(discord_id=guardian_id)).data
+            if not rows:
+                raise Guardian.DoesNotExist
+            guardian = rows[0]
+            print(f"✅ Guardião encontrado: {guardian['discord_display_name']} (Status: {guardian['status']})")
             return Response({
                 'success': True,
-                'guardian': {
-                    'id': guardian.id,
-                    'discord_id': guardian.discord_id,
-                    'discord_display_name': guardian.discord_display_name,
-                    'status': guardian.status,
-                    'level': guardian.level,
-                    'points': guardian.points
-                },
-                'is_online': guardian.status == 'online'
+                'guardian': guardian,
+                'is_online': guardian['status'] == 'online'
             })
         except Guardian.DoesNotExist:
             # Se for discord_id 1 (usuário de teste), criar um Guardião temporário
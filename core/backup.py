@@ -9,6 +9,7 @@ from django.core.management.base import BaseCommand
 from django.conf import settings
 from django.utils import timezone
 from .models import Guardian, Report, Vote, Message, Appeal, AppealVote
+from .transcripts import invalidate_report_transcript
 from bot.logging_config import log_system_event, log_error
 
 
@@ -116,14 +117,14 @@ class BackupManager:
     def _backup_messages(self, zipf):
         """Backup das mensagens"""
         messages_data = []
-        for message in Message.objects.all():
+        for message in Message.objects.select_related('blob'):
             messages_data.append({
                 'id': message.id,
                 'report_id': message.report_id,
                 'original_user_id': message.original_user_id,
                 'original_message_id': message.original_message_id,
                 'anonymized_username': message.anonymized_username,
-                'content': message.content,
+                'content': message.text,
                 'timestamp': message.timestamp.isoformat(),
                 'is_reported_user': message.is_reported_user,
                 'created_at': message.created_at.isoformat(),
@@ -295,6 +296,9 @@ class BackupManager:
                 is_reported_user=message_data['is_reported_user'],
                 created_at=datetime.fromisoformat(message_data['created_at']),
             )
+        
+        for report_id in {message_data['report_id'] for message_data in messages_data}:
+            invalidate_report_transcript(report_id)
     
     def _restore_appeals(self, zipf):
         """Restaura apelações"""
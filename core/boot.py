@@ -0,0 +1,230 @@
+"""
+Inicialização idempotente do Sistema Guardião
+
+Antes de servir, o start_server.py precisa garantir que as migrações foram
+aplicadas e que os arquivos estáticos foram coletados. Este módulo calcula
+uma impressão digital do grafo de migrações e da árvore de estáticos, grava
+o resultado em BOOT_STATE_FILE e pula o trabalho quando nada mudou.
+As migrações rodam sob um lock (advisory lock no PostgreSQL, arquivo nos
+demais bancos) para que vários processos iniciando juntos não concorram.
+"""
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.migrations.recorder import MigrationRecorder
+from bot.logging_config import log_system_event
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: sem lock de arquivo (desenvolvimento com um único processo)
+    fcntl = None
+
+# Chave do advisory lock das migrações (PostgreSQL)
+MIGRATION_LOCK_KEY = 0x6775617264  # "guard"
+
+
+def _hash_files(paths):
+    """Hash de uma lista de arquivos (caminho, tamanho e mtime)"""
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        digest.update(f'{path}:{stat.st_size}:{stat.st_mtime_ns}\n'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def migration_files():
+    """Arquivos de migração de todos os apps instalados"""
+    files = []
+    for app_config in apps.get_app_configs():
+        migrations_dir = os.path.join(app_config.path, 'migrations')
+        if not os.path.isdir(migrations_dir):
+            continue
+        for name in os.listdir(migrations_dir):
+            if name.endswith('.py') and name != '__init__.py':
+                files.append(os.path.join(migrations_dir, name))
+    return files
+
+
+def static_files():
+    """Arquivos de origem dos estáticos (diretórios dos apps e STATICFILES_DIRS)"""
+    roots = [str(path) for path in getattr(settings, 'STATICFILES_DIRS', [])]
+    roots += [
+        os.path.join(app_config.path, 'static')
+        for app_config in apps.get_app_configs()
+    ]
+
+    files = []
+    for root in roots:
+        for dirpath, _, filenames in os.walk(root):
+            files.extend(os.path.join(dirpath, name) for name in filenames)
+    return files
+
+
+def database_identity():
+    """Identifica o banco atual (o estado gravado vale só para ele)"""
+    db = settings.DATABASES['default']
+    return f"{db['ENGINE']}:{db.get('HOST', '')}:{db.get('PORT', '')}:{db['NAME']}"
+
+
+class BootManager:
+    """Executa migrate/collectstatic apenas quando necessário"""
+
+    def __init__(self, state_file=None):
+        self.state_file = state_file or getattr(
+            settings, 'BOOT_STATE_FILE', os.path.join(settings.BASE_DIR, '.boot_state.json')
+        )
+        self.lock_file = f'{self.state_file}.lock'
+
+    def load_state(self):
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_state(self, state):
+        tmp_path = f'{self.state_file}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_file)
+
+    def migrations_fingerprint(self):
+        files = migration_files()
+        return f'{database_identity()}|{len(files)}|{_hash_files(files)}'
+
+    def static_fingerprint(self):
+        static_root = str(settings.STATIC_ROOT)
+        return f'{static_root}|{settings.STATICFILES_STORAGE}|{settings.STATIC_MINIFY}|{_hash_files(static_files())}'
+
+    def applied_migrations_count(self):
+        """Uma consulta para confirmar que o banco ainda tem as migrações gravadas"""
+        recorder = MigrationRecorder(connection)
+        if not recorder.has_table():
+            return 0
+        return recorder.migration_qs.count()
+
+    @contextmanager
+    def migration_lock(self):
+        """Lock exclusivo entre processos durante as migrações"""
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_lock(%s)', [MIGRATION_LOCK_KEY])
+            try:
+                yield
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT pg_advisory_unlock(%s)', [MIGRATION_LOCK_KEY])
+        elif fcntl is None:
+            yield
+        else:
+            with open(self.lock_file, 'w') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def ensure_migrations(self, force=False):
+        """Aplica as migrações se o grafo ou o banco mudaram"""
+        fingerprint = self.migrations_fingerprint()
+        state = self.load_state()
+        if (not force and state.get('migrations') == fingerprint
+                and state.get('applied_migrations') == self.applied_migrations_count()):
+            return False
+
+        with self.migration_lock():
+            # Outro processo pode ter migrado enquanto aguardávamos o lock
+            state = self.load_state()
+            if (not force and state.get('migrations') == fingerprint
+                    and state.get('applied_migrations') == self.applied_migrations_count()):
+                return False
+
+            call_command('migrate', interactive=False, verbosity=1)
+
+            state = self.load_state()
+            state['migrations'] = fingerprint
+            state['applied_migrations'] = self.applied_migrations_count()
+            self.save_state(state)
+        return True
+
+    def ensure_static(self, force=False):
+        """Coleta os estáticos se a árvore de origem mudou"""
+        fingerprint = self.static_fingerprint()
+        state = self.load_state()
+        if not force and state.get('static') == fingerprint and os.path.isdir(settings.STATIC_ROOT):
+            return False
+
+        # Sem --clear: o collectstatic só copia arquivos modificados
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+        state = self.load_state()
+        state['static'] = fingerprint
+        self.save_state(state)
+        return True
+
+    def run(self, migrate=True, static=True, force=False):
+        """Executa a inicialização e retorna o que foi feito"""
+        started = time.monotonic()
+        result = {
+            'migrated': self.ensure_migrations(force) if migrate else False,
+            'collected_static': self.ensure_static(force) if static else False,
+        }
+        result['seconds'] = round(time.monotonic() - started, 3)
+
+        log_system_event(
+            "BOOT",
+            f"migrate: {'sim' if result['migrated'] else 'pulado'}, "
+            f"collectstatic: {'sim' if result['collected_static'] else 'pulado'}, "
+            f"{result['seconds']}s"
+        )
+        return result
+
+
+class BootCommand(BaseCommand):
+    """Comando Django para a inicialização idempotente"""
+
+    help = 'Aplica migrações e coleta estáticos apenas quando houve mudanças'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Executa tudo mesmo sem mudanças'
+        )
+        parser.add_argument(
+            '--static-only',
+            action='store_true',
+            help='Apenas coleta os estáticos (para a etapa de build)'
+        )
+        parser.add_argument(
+            '--migrate-only',
+            action='store_true',
+            help='Apenas aplica as migrações'
+        )
+
+    def handle(self, *args, **options):
+        """Executa a inicialização"""
+        result = BootManager().run(
+            migrate=not options['static_only'],
+            static=not options['migrate_only'],
+            force=options['force'],
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Migrações: {'aplicadas' if result['migrated'] else 'sem mudanças'} | "
+                f"Estáticos: {'coletados' if result['collected_static'] else 'sem mudanças'} | "
+                f"{result['seconds']}s"
+            )
+        )
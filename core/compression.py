@@ -0,0 +1,90 @@
+"""
+Compressão das respostas HTML e JSON
+
+Comprime respostas de texto acima de COMPRESSION_MIN_SIZE bytes com brotli,
+quando o pacote está instalado e o navegador aceita, ou com gzip. O gzip
+recebe o mesmo preenchimento aleatório do GZipMiddleware do Django contra o
+BREACH; o formato brotli não tem onde colocá-lo, por isso respostas que
+carregam o token CSRF (páginas com formulário) sempre usam gzip. Arquivos
+estáticos ficam com o WhiteNoise, que já serve versões pré-comprimidas, e
+respostas em streaming não são tocadas.
+"""
+import re
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('text/html', 'application/json', 'text/plain', 'text/css', 'text/javascript', 'application/javascript')
+
+re_accepts_br = re.compile(r'\bbr\b')
+re_accepts_gzip = re.compile(r'\bgzip\b')
+
+# Mesma proteção contra BREACH do GZipMiddleware do Django
+GZIP_MAX_RANDOM_BYTES = 100
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return compress_string(content, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+
+
+def carries_csrf_token(request, response):
+    """
+    get_token() foi chamado: a resposta contém o token CSRF. O
+    CsrfViewMiddleware (mais interno) já zerou CSRF_COOKIE_NEEDS_UPDATE quando a
+    resposta chega aqui, mas deixa o cookie renovado na resposta.
+    """
+    if settings.CSRF_USE_SESSIONS:
+        return 'CSRF_COOKIE' in request.META
+    return settings.CSRF_COOKIE_NAME in response.cookies or bool(request.META.get('CSRF_COOKIE_NEEDS_UPDATE'))
+
+
+def choose_encoding(accept_encoding, allow_brotli=True):
+    """Melhor codificação aceita pelo cliente (ou None)"""
+    if brotli is not None and allow_brotli and re_accepts_br.search(accept_encoding):
+        return 'br'
+    if re_accepts_gzip.search(accept_encoding):
+        return 'gzip'
+    return None
+
+
+class CompressionMiddleware:
+    """Comprime respostas grandes de HTML e JSON"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if content_type not in COMPRESSIBLE_TYPES or len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''),
+            allow_brotli=not carries_csrf_token(request, response),
+        )
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        response.headers['Content-Encoding'] = encoding
+
+        # ETag forte vira fraco (RFC 9110); conditional_poll já aceita W/
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        return response
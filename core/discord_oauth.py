@@ -0,0 +1,192 @@
+"""
+Cliente HTTP do login com Discord (OAuth2)
+
+As chamadas ao Discord usam uma requests.Session por processo, com pool de
+conexões (reaproveita TCP/TLS entre logins), timeout de conexão e de leitura
+em cada tentativa e novas tentativas com backoff para falhas de conexão e
+respostas 429/502/503/504. Timeouts de leitura nunca são repetidos, e o POST
+do token só é repetido em 429: depois de um 502/504 o Discord pode já ter
+consumido o código de autorização, e a nova tentativa terminaria em
+invalid_grant. O número de callbacks esperando o Discord ao mesmo tempo é
+limitado por processo (DISCORD_OAUTH_CONCURRENCY, por padrão metade das
+threads do Gunicorn, para que uma onda de logins não ocupe todas); acima do
+limite, o callback recebe uma mensagem para tentar de novo.
+
+DISCORD_API_BASE permite apontar para o servidor falso do comando oauth_stub.
+"""
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+import requests
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .models import Guardian
+
+DISCORD_EPOCH_MS = 1420070400000
+
+_session = None
+_session_lock = threading.Lock()
+_slots = None
+
+
+class DiscordOAuthError(Exception):
+    """Falha na troca do código ou na leitura do perfil"""
+
+
+class DiscordOAuthBusy(DiscordOAuthError):
+    """Muitos logins em andamento neste processo"""
+
+
+class DiscordRetry(Retry):
+    """Retry que só repete POST em 429 (pedido recusado antes de ser processado)"""
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method.upper() == 'POST' and status_code != 429:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+def get_session():
+    """Session compartilhada pelas threads do processo (criada após o fork)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = DiscordRetry(
+                    total=settings.DISCORD_HTTP_RETRIES,
+                    read=0,
+                    backoff_factor=0.3,
+                    status_forcelist=(429, 502, 503, 504),
+                    allowed_methods=frozenset({'GET', 'POST'}),
+                    # O Retry-After do Discord pode passar do tempo de uma requisição
+                    respect_retry_after_header=False,
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    max_retries=retry,
+                    pool_connections=1,
+                    pool_maxsize=settings.DISCORD_HTTP_POOL_SIZE,
+                )
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+@contextmanager
+def oauth_slot():
+    """Limita os callbacks simultâneos esperando o Discord"""
+    global _slots
+    if _slots is None:
+        with _session_lock:
+            if _slots is None:
+                _slots = threading.BoundedSemaphore(settings.DISCORD_OAUTH_CONCURRENCY)
+    if not _slots.acquire(timeout=settings.DISCORD_OAUTH_QUEUE_WAIT):
+        raise DiscordOAuthBusy('Muitos logins em andamento')
+    try:
+        yield
+    finally:
+        _slots.release()
+
+
+def redirect_uri():
+    return f"{settings.SITE_URL}/auth/discord/callback/"
+
+
+def authorize_url():
+    return (
+        f"{settings.DISCORD_API_BASE}/oauth2/authorize"
+        f"?client_id={settings.DISCORD_CLIENT_ID}"
+        f"&redirect_uri={redirect_uri()}"
+        f"&response_type=code"
+        f"&scope=identify"
+    )
+
+
+def _request(method, path, **kwargs):
+    try:
+        response = get_session().request(
+            method, f"{settings.DISCORD_API_BASE}{path}", timeout=settings.DISCORD_HTTP_TIMEOUT, **kwargs
+        )
+        data = response.json()
+    except (requests.RequestException, ValueError) as e:
+        raise DiscordOAuthError(f'{method} {path}: {e}') from e
+    if response.status_code >= 400:
+        raise DiscordOAuthError(f'{method} {path}: HTTP {response.status_code} {data}')
+    return data
+
+
+def exchange_code(code):
+    """Troca o código de autorização por um access token"""
+    data = _request('POST', '/oauth2/token', data={
+        'client_id': settings.DISCORD_CLIENT_ID,
+        'client_secret': settings.DISCORD_CLIENT_SECRET,
+        'grant_type': 'authorization_code',
+        'code': code,
+        'redirect_uri': redirect_uri(),
+    })
+    if 'access_token' not in data:
+        raise DiscordOAuthError('Resposta sem access_token')
+    return data['access_token']
+
+
+def fetch_user(access_token):
+    data = _request('GET', '/users/@me', headers={'Authorization': f'Bearer {access_token}'})
+    if 'id' not in data:
+        raise DiscordOAuthError('Resposta sem id do usuário')
+    return data
+
+
+def account_created_at(discord_id):
+    """Data de criação da conta (os IDs do Discord são snowflakes com timestamp)"""
+    timestamp_ms = (int(discord_id) >> 22) + DISCORD_EPOCH_MS
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=dt_timezone.utc)
+
+
+def profile_fields(user_data):
+    avatar = user_data.get('avatar')
+    return {
+        'discord_username': user_data['username'],
+        'discord_display_name': user_data.get('display_name') or user_data['username'],
+        'avatar_url': f"https://cdn.discordapp.com/avatars/{user_data['id']}/{avatar}.png" if avatar else None,
+    }
+
+
+def upsert_guardian(user_data):
+    """
+    Cria o perfil ou atualiza apenas os campos que mudaram (o role nunca é
+    alterado aqui). Retorna (guardian, created).
+    """
+    discord_id = int(user_data['id'])
+    profile = profile_fields(user_data)
+    guardian = Guardian.objects.filter(discord_id=discord_id).first()
+
+    if guardian is None:
+        try:
+            with transaction.atomic():
+                guardian = Guardian.objects.create(
+                    discord_id=discord_id,
+                    role='usuario',  # Sempre começar como USUARIO
+                    discord_account_created_at=account_created_at(discord_id),
+                    status='offline',
+                    level=1,
+                    points=0,
+                    **profile,
+                )
+            return guardian, True
+        except IntegrityError:
+            # Dois callbacks do mesmo usuário ao mesmo tempo
+            guardian = Guardian.objects.get(discord_id=discord_id)
+
+    changed = [field for field, value in profile.items() if getattr(guardian, field) != value]
+    for field in changed:
+        setattr(guardian, field, profile[field])
+    if not guardian.discord_account_created_at:
+        guardian.discord_account_created_at = account_created_at(discord_id)
+        changed.append('discord_account_created_at')
+    if changed:
+        guardian.save(update_fields=changed + ['updated_at'])
+    return guardian, False
@@ -0,0 +1,135 @@
+"""
+Contabilização das horas de serviço dos Guardiões
+
+Cada entrada em serviço abre um DutyInterval e cada saída o fecha. A
+consolidação periódica soma a duração real ainda não contabilizada de cada
+período e aplica o resultado a todos os Guardiões com um único UPDATE, de
+modo que o resultado é o mesmo qualquer que seja a frequência de execução.
+
+Como no cálculo original, só conta o tempo de quem teve atividade na última
+hora: o período de um Guardião online sem atividade há mais de
+DUTY_ACTIVITY_WINDOW é fechado em last_activity + DUTY_ACTIVITY_WINDOW, e um
+novo só é aberto quando ele voltar a ter atividade.
+"""
+import math
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, FloatField, IntegerField, Value, When
+from django.utils import timezone
+from .models import Guardian, DutyInterval
+from . import versioning
+from bot.logging_config import log_system_event
+
+# Pontos ganhos por hora completa em serviço
+POINTS_PER_DUTY_HOUR = 1
+
+# Tempo sem atividade após o qual o Guardião para de acumular horas
+DUTY_ACTIVITY_WINDOW = timedelta(hours=1)
+
+
+def record_status_change(guardian_id, new_status, at=None):
+    """Abre ou fecha o período em serviço conforme o novo status"""
+    at = at or timezone.now()
+    open_intervals = DutyInterval.objects.filter(guardian_id=guardian_id, ended_at__isnull=True)
+
+    if new_status == 'online':
+        if not open_intervals.exists():
+            try:
+                with transaction.atomic():
+                    DutyInterval.objects.create(guardian_id=guardian_id, started_at=at)
+            except IntegrityError:
+                # Outra requisição abriu o período ao mesmo tempo (core_dutyinterval_one_open)
+                pass
+    else:
+        open_intervals.update(ended_at=at)
+
+
+def reconcile_intervals(now=None):
+    """
+    Corrige períodos de Guardiões cujo status mudou sem passar por
+    record_status_change (updates em massa, criação já online, etc.)
+    """
+    now = now or timezone.now()
+    active_since = now - DUTY_ACTIVITY_WINDOW
+
+    closed = DutyInterval.objects.filter(ended_at__isnull=True).exclude(
+        guardian__status='online'
+    ).update(ended_at=now)
+
+    # Online, mas sem atividade: o período termina quando a janela de atividade acabou
+    idle = list(
+        DutyInterval.objects.filter(
+            ended_at__isnull=True, guardian__last_activity__lt=active_since
+        ).select_related('guardian').only('id', 'started_at', 'guardian__last_activity')
+    )
+    for interval in idle:
+        interval.ended_at = max(interval.started_at, interval.guardian.last_activity + DUTY_ACTIVITY_WINDOW)
+    DutyInterval.objects.bulk_update(idle, ['ended_at'], batch_size=500)
+
+    missing = Guardian.objects.filter(status='online', last_activity__gte=active_since).exclude(
+        id__in=DutyInterval.objects.filter(ended_at__isnull=True).values('guardian_id')
+    ).values_list('id', flat=True)
+    opened = DutyInterval.objects.bulk_create([
+        DutyInterval(guardian_id=guardian_id, started_at=now) for guardian_id in missing
+    ], ignore_conflicts=True)
+
+    return closed + len(idle), len(opened)
+
+
+def rollup_service_hours(now=None):
+    """
+    Contabiliza o tempo em serviço ainda não consolidado.
+
+    Retorna o número de Guardiões atualizados.
+    """
+    now = now or timezone.now()
+    reconcile_intervals(now)
+
+    with transaction.atomic():
+        intervals = list(
+            DutyInterval.objects.select_for_update().filter(settled=False).only(
+                'id', 'guardian_id', 'started_at', 'ended_at', 'accounted_seconds'
+            )
+        )
+
+        hours = {}
+        points = {}
+        for interval in intervals:
+            end = min(interval.ended_at or now, now)
+            elapsed = max(0.0, (end - interval.started_at).total_seconds())
+            pending = elapsed - interval.accounted_seconds
+
+            if pending > 0:
+                hours[interval.guardian_id] = hours.get(interval.guardian_id, 0.0) + pending / 3600
+                # Um ponto por hora completa do período
+                earned = math.floor(elapsed / 3600) - math.floor(interval.accounted_seconds / 3600)
+                if earned > 0:
+                    points[interval.guardian_id] = points.get(interval.guardian_id, 0) + earned * POINTS_PER_DUTY_HOUR
+
+            interval.accounted_seconds = max(elapsed, interval.accounted_seconds)
+            interval.settled = interval.ended_at is not None and interval.ended_at <= now
+
+        if hours:
+            Guardian.objects.filter(id__in=list(hours)).update(
+                total_service_hours=F('total_service_hours') + Case(
+                    *[When(id=guardian_id, then=Value(value)) for guardian_id, value in hours.items()],
+                    default=Value(0.0),
+                    output_field=FloatField(),
+                ),
+                points=F('points') + Case(
+                    *[When(id=guardian_id, then=Value(value)) for guardian_id, value in points.items()],
+                    default=Value(0),
+                    output_field=IntegerField(),
+                ),
+            )
+
+        if intervals:
+            DutyInterval.objects.bulk_update(intervals, ['accounted_seconds', 'settled'], batch_size=500)
+
+    if hours:
+        versioning.bump(versioning.GUARDIANS)
+        log_system_event(
+            "SERVICE_HOURS_UPDATED",
+            f"{len(hours)} guardians, {sum(hours.values()):.2f}h, {sum(points.values())} pontos"
+        )
+    return len(hours)
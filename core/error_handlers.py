@@ -7,6 +7,7 @@ from django.conf import settings
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from rest_framework import status
+from rest_framework.exceptions import Throttled
 from rest_framework.response import Response
 from rest_framework.views import exception_handler
 
@@ -35,6 +36,13 @@ def custom_exception_handler(exc, context):
             custom_response_data['message'] = 'Dados de entrada inválidos'
             custom_response_data['validation_errors'] = exc.message_dict if hasattr(exc, 'message_dict') else str(exc)
         
+        if isinstance(exc, Throttled):
+            # Limite de polling: o cliente já recebe Retry-After
+            custom_response_data['message'] = 'Muitas requisições, aguarde antes de tentar novamente'
+            custom_response_data['retry_after'] = exc.wait
+            response.data = custom_response_data
+            return response
+        
         response.data = custom_response_data
         
         # Log do erro
@@ -0,0 +1,71 @@
+"""
+Identidade do Guardião por requisição
+
+O GuardianIdentityMiddleware expõe o Guardião da sessão como
+request.guardian, resolvido só no primeiro acesso e uma vez por requisição
+(endpoints que não o usam não pagam nada). Sem login, o valor é None.
+
+Com GUARDIAN_IDENTITY_CACHE (padrão quando há REDIS_URL), o perfil fica no
+cache por GUARDIAN_IDENTITY_TTL segundos, com uma chave que inclui as versões
+do Guardião (core/versioning.py): qualquer save() dele ou atualização em massa
+de Guardiões, feita pelo site ou pelo bot, gera uma chave nova e o perfil é
+relido do banco. Os contadores precisam estar num cache visto por todos os
+processos; com o LocMem de cada processo as mudanças feitas em outro worker
+ou no bot não seriam vistas, por isso sem Redis o perfil é lido do banco a
+cada requisição.
+
+O objeto pode vir do cache; quem o altera deve salvar com update_fields para
+não sobrescrever campos atualizados por outros processos.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from . import versioning
+from .models import Guardian
+
+
+def identity_cache_key(discord_id):
+    versions = versioning.get_versions(versioning.GUARDIANS, versioning.guardian_key(discord_id))
+    return f'identity:{discord_id}:' + ':'.join(str(version) for version in versions)
+
+
+def resolve_guardian(request):
+    """Guardião da sessão (None sem login ou se o perfil não existe mais)"""
+    discord_id = request.session.get('guardian_id')
+    if not discord_id:
+        return None
+    if not settings.GUARDIAN_IDENTITY_CACHE:
+        return Guardian.objects.filter(discord_id=discord_id).first()
+    key = identity_cache_key(discord_id)
+    guardian = cache.get(key)
+    if guardian is None:
+        guardian = Guardian.objects.filter(discord_id=discord_id).first()
+        if guardian is not None:
+            cache.set(key, guardian, settings.GUARDIAN_IDENTITY_TTL)
+    return guardian
+
+
+def get_guardian(request):
+    """Guardião da requisição, resolvido uma única vez"""
+    if not hasattr(request, '_cached_guardian'):
+        request._cached_guardian = resolve_guardian(request)
+    return request._cached_guardian
+
+
+def request_guardian(request):
+    """Guardião da requisição; Guardian.DoesNotExist se não houver"""
+    guardian = get_guardian(request)
+    if guardian is None:
+        raise Guardian.DoesNotExist
+    return guardian
+
+
+class GuardianIdentityMiddleware:
+    """Define request.guardian (resolvido no primeiro acesso)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.guardian = SimpleLazyObject(lambda: get_guardian(request))
+        return self.get_response(request)
@@ -6,6 +6,9 @@ import os
 import json
 from django.conf import settings
 from .models import Report, Guardian, Vote
+from .notifications import notification_manager
+from .scoring import apply_report_result, is_vote_correct
+from .duty import rollup_service_hours
 from bot.logging_config import log_system_event, log_error
 
 
@@ -29,6 +32,7 @@ class BotIntegration:
                 f'{self.bot_url}/notify_guardians/',
                 json={
                     'report_id': report.id,
+                    'guild_id': report.guild_id,
                     'guardian_ids': guardian_ids
                 },
                 timeout=self.timeout
@@ -139,64 +143,35 @@ class ReportProcessor:
     def update_guardian_points(self, report):
         """Atualiza pontos dos Guardiões baseado no resultado"""
         try:
-            votes = Vote.objects.filter(report=report)
-            final_punishment = report.punishment
+            level_ups = apply_report_result(report)
             
-            for vote in votes:
-                guardian = vote.guardian
-                
-                # Verificar se o voto foi correto
-                vote_correct = self.is_vote_correct(vote.vote_type, final_punishment)
-                
-                if vote_correct:
-                    guardian.correct_votes += 1
-                    guardian.points += 1
-                else:
-                    guardian.incorrect_votes += 1
-                
-                guardian.save()
+            for level_up in level_ups:
+                notification_manager.notify_guardian_level_up(
+                    level_up.guardian_id, level_up.discord_id, level_up.old_level, level_up.new_level
+                )
+            
+            return level_ups
                 
         except Exception as e:
             log_error(f"Erro ao atualizar pontos dos Guardiões: {e}")
+            return []
     
     def is_vote_correct(self, vote_type, final_punishment):
         """Verifica se um voto foi correto baseado na punição final"""
-        # Lógica para determinar se o voto foi correto
-        if final_punishment == 'none':
-            return vote_type == 'improcedente'
-        elif final_punishment in ['mute_1h', 'mute_12h']:
-            return vote_type in ['intimidou', 'grave']
-        elif final_punishment == 'ban_24h':
-            return vote_type == 'grave'
-        
-        return False
+        return is_vote_correct(vote_type, final_punishment)
 
 
 class GuardianManager:
     """Classe para gerenciar Guardiões"""
     
     def update_service_hours(self):
-        """Atualiza horas de serviço dos Guardiões"""
+        """Contabiliza as horas de serviço a partir dos períodos em serviço"""
         try:
-            from django.utils import timezone
-            from datetime import timedelta
-            
-            # Guardiões que estavam online na última hora
-            one_hour_ago = timezone.now() - timedelta(hours=1)
-            online_guardians = Guardian.objects.filter(
-                status='online',
-                last_activity__gte=one_hour_ago
-            )
-            
-            for guardian in online_guardians:
-                guardian.total_service_hours += 1
-                guardian.points += 1
-                guardian.save()
-            
-            log_system_event("SERVICE_HOURS_UPDATED", f"{online_guardians.count()} guardians updated")
+            return rollup_service_hours()
             
         except Exception as e:
             log_error(f"Erro ao atualizar horas de serviço: {e}")
+            return 0
 
 
 # Instâncias globais
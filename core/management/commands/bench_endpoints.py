@@ -0,0 +1,125 @@
+"""
+Comando Django para medir tamanho e tempo de renderização dos endpoints
+"""
+import json
+import statistics
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from rest_framework.renderers import JSONRenderer
+from core import compression, renderers
+from core.models import Guardian, Report
+
+DEFAULT_URLS = [
+    '/api/reports/',
+    '/api/reports/?expand=messages,votes',
+    '/api/reports/?fields=id,status,created_at',
+    '/api/reports/check-new/',
+    '/api/guardians/',
+    '/api/guardians/online/',
+    '/api/stats/dashboard/',
+    '/reports/',
+]
+
+
+def _median_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+class Command(BaseCommand):
+    """Comando para comparar bytes transferidos e tempo de renderização por endpoint"""
+
+    help = 'Mede bytes (sem compressão, gzip, brotli) e tempo de renderização JSON por endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', action='append', dest='urls', help='Endpoint a medir (pode repetir)')
+        parser.add_argument('--repeat', type=int, default=20, help='Repetições por medida')
+        parser.add_argument('--guardian', type=int, help='discord_id do Guardião usado na sessão')
+        parser.add_argument('--format', choices=['json', 'summary'], default='summary', help='Formato da saída')
+
+    def handle(self, *args, **options):
+        urls = options['urls'] or self.default_urls(options['guardian'])
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        if options['guardian']:
+            self.login(client, options['guardian'])
+
+        # Sem limite de requisições durante a medição
+        rates = {scope: {'capacity': 10 ** 9, 'refill_per_second': 10 ** 9} for scope in settings.POLL_THROTTLE_RATES}
+        with override_settings(POLL_THROTTLE_RATES=rates):
+            results = [self.measure(client, url, options['repeat']) for url in urls]
+
+        if options['format'] == 'json':
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            self.output_summary(results)
+
+    def default_urls(self, guardian_id):
+        urls = list(DEFAULT_URLS)
+        latest = Report.objects.order_by('-id').values_list('id', flat=True).first()
+        if latest:
+            urls.append(f'/api/reports/{latest}/')
+        if guardian_id:
+            urls.append(f'/api/guardian/{guardian_id}/pending-report/')
+            urls.append(f'/api/guardian/{guardian_id}/status/')
+        return urls
+
+    def login(self, client, discord_id):
+        guardian = Guardian.objects.get(discord_id=discord_id)
+        session = client.session
+        session['guardian_id'] = guardian.discord_id
+        session['guardian_db_id'] = guardian.id
+        session.save()
+
+    def measure(self, client, url, repeat):
+        """Tempo da requisição, renderização JSON e bytes com cada codificação"""
+        response = client.get(url)
+        result = {
+            'url': url,
+            'status': response.status_code,
+            'request_ms': round(_median_ms(lambda: client.get(url), repeat), 2),
+            'bytes': len(response.content),
+        }
+
+        data = getattr(response, 'data', None)
+        if data is not None:
+            renderer = JSONRenderer()
+            result['render_json_ms'] = round(_median_ms(lambda: renderer.render(data), repeat), 3)
+            if renderers.fast_json_enabled():
+                fast = renderers.FastJSONRenderer()
+                result['render_orjson_ms'] = round(_median_ms(lambda: fast.render(data), repeat), 3)
+
+        content = response.content
+        result['gzip_bytes'] = len(compression.compress(content, 'gzip'))
+        result['gzip_ms'] = round(_median_ms(lambda: compression.compress(content, 'gzip'), repeat), 3)
+        if compression.brotli is not None:
+            result['br_bytes'] = len(compression.compress(content, 'br'))
+            result['br_ms'] = round(_median_ms(lambda: compression.compress(content, 'br'), repeat), 3)
+        result['compressed_by_middleware'] = len(content) >= settings.COMPRESSION_MIN_SIZE
+        return result
+
+    def output_summary(self, results):
+        """Saída resumida"""
+        self.stdout.write(self.style.SUCCESS('=== BENCHMARK DE ENDPOINTS ==='))
+        self.stdout.write(f"orjson: {'ativo' if renderers.fast_json_enabled() else 'inativo'} | "
+                          f"brotli: {'disponível' if compression.brotli else 'indisponível'} | "
+                          f"compressão a partir de {settings.COMPRESSION_MIN_SIZE} bytes")
+        for result in results:
+            self.stdout.write(f"\n{result['url']} [{result['status']}]")
+            self.stdout.write(f"   Requisição: {result['request_ms']} ms")
+            if 'render_json_ms' in result:
+                line = f"   Renderização: json {result['render_json_ms']} ms"
+                if 'render_orjson_ms' in result:
+                    line += f" | orjson {result['render_orjson_ms']} ms"
+                self.stdout.write(line)
+            line = f"   Bytes: {result['bytes']} | gzip {result['gzip_bytes']} ({result['gzip_ms']} ms)"
+            if 'br_bytes' in result:
+                line += f" | brotli {result['br_bytes']} ({result['br_ms']} ms)"
+            if not result['compressed_by_middleware']:
+                line += ' | abaixo do limite, enviado sem compressão'
+            self.stdout.write(line)
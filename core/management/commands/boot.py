@@ -0,0 +1,10 @@
+"""
+Comando Django para a inicialização idempotente (migrate + collectstatic)
+"""
+from django.core.management.base import BaseCommand
+from core.boot import BootCommand
+
+
+class Command(BootCommand):
+    """Comando para inicialização do sistema"""
+    pass
@@ -0,0 +1,60 @@
+"""
+Comando Django para gerar os arquivos estáticos de produção
+"""
+import os
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from core.storage import available_minifiers
+
+
+class Command(BaseCommand):
+    """Minifica, gera hash e comprime os estáticos, mostrando o resultado"""
+
+    help = 'Executa o collectstatic (minificação, hash e .gz/.br) e mostra os tamanhos gerados'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Apaga o STATIC_ROOT antes de coletar'
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Lista também os estáticos de terceiros (admin, DRF)'
+        )
+
+    def handle(self, *args, **options):
+        minifiers = available_minifiers()
+        if settings.STATIC_MINIFY and len(minifiers) < 2:
+            self.stdout.write(self.style.WARNING(
+                '⚠️ Minificação parcial: instale rjsmin e rcssmin para minificar JS e CSS'
+            ))
+
+        call_command('collectstatic', interactive=False, clear=options['clear'], verbosity=0)
+
+        self.stdout.write(self.style.SUCCESS('=== ESTÁTICOS GERADOS ==='))
+        minified = getattr(staticfiles_storage, 'minified', {})
+        hashed_files = getattr(staticfiles_storage, 'hashed_files', {})
+        for name in sorted(hashed_files):
+            if not options['all'] and not name.startswith('guardiao/'):
+                continue
+            hashed_name = hashed_files[name]
+            line = f'{name} -> {hashed_name}: {self._size(hashed_name)}'
+            if name in minified:
+                before, after = minified[name]
+                line += f' (original {self._format(before)}, minificado {self._format(after)})'
+            for suffix in ('.gz', '.br'):
+                size = self._size(hashed_name + suffix)
+                if size != '-':
+                    line += f' | {suffix[1:]} {size}'
+            self.stdout.write(f'   {line}')
+
+    def _size(self, name):
+        path = os.path.join(settings.STATIC_ROOT, name)
+        return self._format(os.path.getsize(path)) if os.path.exists(path) else '-'
+
+    def _format(self, size):
+        return f'{size / 1024:.1f} KB'
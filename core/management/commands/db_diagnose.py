@@ -0,0 +1,180 @@
+"""
+Comando para diagnosticar a conexão com o PostgreSQL
+
+Reúne as verificações que antes rodavam a cada importação das settings
+(processos, interfaces de rede, resolução de nomes, /etc/hosts e hosts
+alternativos) e mede o tempo de importação das settings.
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from guardiao import dbselect
+
+
+class Command(BaseCommand):
+    help = 'Diagnostica a conexão com o banco de dados e mede o tempo de importação das settings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--benchmark',
+            type=int,
+            nargs='?',
+            const=5,
+            help='Mede a importação das settings em N processos novos (padrão: 5)'
+        )
+
+    def handle(self, *args, **options):
+        if options.get('benchmark'):
+            self.run_benchmark(options['benchmark'])
+            return
+
+        self.stdout.write('🔍 Diagnóstico do banco de dados\n')
+        self.stdout.write(f"Engine em uso: {connection.vendor}")
+        self.stdout.write(f"Seleção: {dbselect.selection or 'indisponível'}")
+
+        host = os.getenv('DB_HOST', dbselect.DEFAULT_HOST)
+        port = int(os.getenv('DB_PORT', dbselect.DEFAULT_PORT))
+
+        self.check_processes()
+        self.check_network()
+        self.check_resolution(host)
+        self.check_hosts_file()
+        working_host = self.check_hosts(host, port)
+        if working_host:
+            self.check_postgresql(working_host, port)
+
+    def check_processes(self):
+        """Verifica se há processo do PostgreSQL na máquina"""
+        self.stdout.write('\n🔍 Processos:')
+        try:
+            result = subprocess.run(['ps', 'aux'], capture_output=True, text=True, timeout=5)
+            if 'postgres' in result.stdout.lower():
+                self.stdout.write(self.style.SUCCESS('  ✅ Processo do PostgreSQL encontrado'))
+            else:
+                self.stdout.write('  ❌ Processo do PostgreSQL não encontrado')
+        except Exception as e:
+            self.stdout.write(f'  ❌ Erro ao verificar processos: {e}')
+
+    def check_network(self):
+        """Lista as interfaces de rede"""
+        self.stdout.write('\n🔍 Interfaces de rede:')
+        try:
+            result = subprocess.run(['ip', 'addr'], capture_output=True, text=True, timeout=5)
+            for line in result.stdout.split('\n'):
+                if 'inet' in line and '127.0.0.1' not in line:
+                    self.stdout.write(f'  {line.strip()}')
+        except Exception as e:
+            self.stdout.write(f'  ❌ Erro ao verificar rede: {e}')
+
+    def check_resolution(self, host):
+        """Resolve o hostname configurado"""
+        self.stdout.write(f"\n🔍 Resolução de '{host}':")
+        try:
+            self.stdout.write(self.style.SUCCESS(f'  ✅ {host} -> {socket.gethostbyname(host)}'))
+        except Exception as e:
+            self.stdout.write(f'  ❌ Não foi possível resolver: {e}')
+
+    def check_hosts_file(self):
+        """Procura o host do banco em /etc/hosts"""
+        self.stdout.write('\n🔍 /etc/hosts:')
+        try:
+            with open('/etc/hosts', 'r') as f:
+                lines = [line.strip() for line in f if 'postgresql' in line]
+            if lines:
+                for line in lines:
+                    self.stdout.write(f'  {line}')
+            else:
+                self.stdout.write("  ❌ 'postgresql' não encontrado")
+        except Exception as e:
+            self.stdout.write(f'  ❌ Erro ao ler /etc/hosts: {e}')
+
+    def check_hosts(self, host, port):
+        """Testa o host configurado e os alternativos"""
+        self.stdout.write('\n🔍 Hosts:')
+        working_host = None
+        for test_host in [host] + [h for h in dbselect.ALTERNATIVE_HOSTS if h != host]:
+            started = time.perf_counter()
+            reachable = dbselect.probe(test_host, port, timeout=2)
+            elapsed = (time.perf_counter() - started) * 1000
+            if reachable:
+                self.stdout.write(self.style.SUCCESS(f'  ✅ {test_host}:{port} acessível ({elapsed:.0f} ms)'))
+                working_host = working_host or test_host
+            else:
+                self.stdout.write(f'  ❌ {test_host}:{port} inacessível ({elapsed:.0f} ms)')
+
+        if working_host and working_host != host:
+            self.stdout.write(self.style.WARNING(f'  💡 Configure DB_HOST={working_host}'))
+        return working_host
+
+    def check_postgresql(self, host, port):
+        """Abre uma conexão real com o PostgreSQL"""
+        self.stdout.write('\n🔍 Conexão PostgreSQL:')
+        try:
+            import psycopg2
+            conn = psycopg2.connect(
+                host=host,
+                port=port,
+                user=os.getenv('DB_USER', 'guardiao'),
+                password=os.getenv('DB_PASSWORD', 'PasswordGuardiaoAdmin2025!'),
+                database=os.getenv('DB_NAME', 'guardiaodatabase'),
+                connect_timeout=5
+            )
+            conn.close()
+            self.stdout.write(self.style.SUCCESS(f'  ✅ Conexão bem-sucedida com {host}'))
+        except Exception as e:
+            self.stdout.write(f'  ❌ Falha na conexão: {e}')
+
+    def run_benchmark(self, runs):
+        """Mede a importação das settings em processos novos (com e sem cache da sonda)"""
+        code = (
+            'import time; started = time.perf_counter(); '
+            'import guardiao.settings; '
+            'print(time.perf_counter() - started)'
+        )
+        scenarios = [
+            ('sonda sem cache', {'DB_SELECT_CACHE_TTL': '0'}),
+            ('cache da sonda', {}),
+            ('DB_ENGINE explícito', {'DB_ENGINE': 'postgresql' if connection.vendor == 'postgresql' else 'sqlite'}),
+        ]
+
+        self.stdout.write(f'⏱️ Importação das settings ({runs} processos por cenário)\n')
+        for label, extra_env in scenarios:
+            env = {**os.environ, **extra_env}
+            timings = []
+            for _ in range(runs):
+                result = subprocess.run(
+                    [sys.executable, '-c', code],
+                    capture_output=True, text=True, env=env, cwd=str(settings.BASE_DIR)
+                )
+                try:
+                    timings.append(float(result.stdout.strip().splitlines()[-1]))
+                except (ValueError, IndexError):
+                    self.stdout.write(self.style.ERROR(f'  Falha em "{label}": {result.stderr.strip()[-200:]}'))
+                    break
+            if timings:
+                timings.sort()
+                self.stdout.write(
+                    f'  {label}: mediana {timings[len(timings) // 2] * 1000:.0f} ms, '
+                    f'máx {timings[-1] * 1000:.0f} ms'
+                )
+
+        # Custo das verificações que antes rodavam em toda importação
+        started = time.perf_counter()
+        host = os.getenv('DB_HOST', dbselect.DEFAULT_HOST)
+        port = int(os.getenv('DB_PORT', dbselect.DEFAULT_PORT))
+        for test_host in [host] + dbselect.ALTERNATIVE_HOSTS:
+            dbselect.probe(test_host, port, timeout=2)
+        for command in (['ps', 'aux'], ['ip', 'addr']):
+            try:
+                subprocess.run(command, capture_output=True, timeout=5)
+            except Exception:
+                pass
+        self.stdout.write(
+            f'  verificações antigas (uma tentativa, sem retries): '
+            f'{(time.perf_counter() - started) * 1000:.0f} ms'
+        )
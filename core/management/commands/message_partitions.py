@@ -0,0 +1,10 @@
+"""
+Comando Django para gerenciar as partições da tabela de mensagens
+"""
+from django.core.management.base import BaseCommand
+from core.partitioning import PartitionCommand
+
+
+class Command(PartitionCommand):
+    """Comando para particionamento de mensagens"""
+    pass
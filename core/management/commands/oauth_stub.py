@@ -0,0 +1,132 @@
+"""
+Comando Django com um servidor OAuth2 falso do Discord para testes locais
+"""
+import json
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+from django.core.management.base import BaseCommand
+
+
+class StubState:
+    """Códigos e tokens emitidos pelo servidor falso"""
+
+    def __init__(self, user, delay, fail_every):
+        self.user = user
+        self.delay = delay
+        self.fail_every = fail_every
+        self.codes = set()
+        self.tokens = set()
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def should_fail(self):
+        with self.lock:
+            self.requests += 1
+            return bool(self.fail_every) and self.requests % self.fail_every == 0
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _json(self, status, data):
+            body = json.dumps(data).encode()
+            try:
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except BrokenPipeError:
+                # O cliente desistiu (timeout)
+                pass
+
+        def _simulate(self):
+            """Atraso e falhas 503 configurados; retorna True se a falha foi enviada"""
+            if state.delay:
+                time.sleep(state.delay)
+            if state.should_fail():
+                self._json(503, {'message': 'stub: falha simulada'})
+                return True
+            return False
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path.endswith('/oauth2/authorize'):
+                # Autoriza direto e volta para o redirect_uri com um código novo
+                params = parse_qs(url.query)
+                code = secrets.token_urlsafe(16)
+                with state.lock:
+                    state.codes.add(code)
+                self.send_response(302)
+                self.send_header('Location', f"{params['redirect_uri'][0]}?{urlencode({'code': code})}")
+                self.end_headers()
+            elif url.path.endswith('/users/@me'):
+                if self._simulate():
+                    return
+                token = self.headers.get('Authorization', '').removeprefix('Bearer ')
+                if token not in state.tokens:
+                    self._json(401, {'message': '401: Unauthorized'})
+                    return
+                self._json(200, state.user)
+            else:
+                self._json(404, {'message': 'Not Found'})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if not url.path.endswith('/oauth2/token'):
+                self._json(404, {'message': 'Not Found'})
+                return
+            if self._simulate():
+                return
+            length = int(self.headers.get('Content-Length', 0))
+            form = parse_qs(self.rfile.read(length).decode())
+            code = form.get('code', [''])[0]
+            with state.lock:
+                valid = code in state.codes
+                state.codes.discard(code)
+                token = secrets.token_urlsafe(24)
+                if valid:
+                    state.tokens.add(token)
+            if not valid:
+                self._json(400, {'error': 'invalid_grant'})
+                return
+            self._json(200, {'access_token': token, 'token_type': 'Bearer', 'expires_in': 604800, 'scope': 'identify'})
+
+    return Handler
+
+
+class Command(BaseCommand):
+    """Servidor OAuth2 falso do Discord"""
+
+    help = 'Sobe um servidor OAuth2 falso do Discord (use DISCORD_API_BASE=http://127.0.0.1:<porta>)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8765, help='Porta do servidor')
+        parser.add_argument('--user-id', type=str, default='80351110224678912', help='ID do usuário retornado')
+        parser.add_argument('--username', type=str, default='stubuser', help='Nome do usuário retornado')
+        parser.add_argument('--delay', type=float, default=0, help='Atraso (segundos) em token e users/@me')
+        parser.add_argument('--fail-every', type=int, default=0, help='Responde 503 a cada N requisições')
+
+    def handle(self, *args, **options):
+        user = {
+            'id': options['user_id'],
+            'username': options['username'],
+            'display_name': options['username'].title(),
+            'avatar': None,
+        }
+        state = StubState(user, options['delay'], options['fail_every'])
+        server = ThreadingHTTPServer(('127.0.0.1', options['port']), make_handler(state))
+
+        self.stdout.write(self.style.SUCCESS(f"🧪 OAuth falso em http://127.0.0.1:{options['port']}"))
+        self.stdout.write(f"💡 Inicie o site com DISCORD_API_BASE=http://127.0.0.1:{options['port']} e acesse /auth/discord/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
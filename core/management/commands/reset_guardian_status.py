@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand
 from core.models import Guardian
+from core.duty import reconcile_intervals
+from core import versioning
 
 
 class Command(BaseCommand):
@@ -22,6 +24,8 @@ class Command(BaseCommand):
         
         # Colocar todos como offline
         updated_count = Guardian.objects.filter(status='online').update(status='offline')
+        reconcile_intervals()
+        versioning.bump(versioning.GUARDIANS)
         
         self.stdout.write(f'✅ {updated_count} Guardiões colocados como offline')
         self.stdout.write('🎉 Reset de status concluído!')
@@ -0,0 +1,10 @@
+"""
+Comando Django para aplicar as políticas de retenção de dados
+"""
+from django.core.management.base import BaseCommand
+from core.retention import RetentionCommand
+
+
+class Command(RetentionCommand):
+    """Comando para retenção de dados antigos"""
+    pass
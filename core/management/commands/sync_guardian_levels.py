@@ -0,0 +1,10 @@
+"""
+Comando Django para sincronizar os níveis dos Guardiões com os pontos
+"""
+from django.core.management.base import BaseCommand
+from core.scoring import LevelSyncCommand
+
+
+class Command(LevelSyncCommand):
+    """Comando para sincronização de níveis"""
+    pass
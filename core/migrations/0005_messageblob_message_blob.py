@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_message_attachments_info_message_has_attachments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MessageBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel_id', models.BigIntegerField(verbose_name='ID do Canal')),
+                ('original_message_id', models.BigIntegerField(verbose_name='ID Original da Mensagem')),
+                ('original_user_id', models.BigIntegerField(verbose_name='ID Original do Usuário')),
+                ('content', models.TextField(verbose_name='Conteúdo da Mensagem')),
+                ('content_hash', models.CharField(max_length=64, verbose_name='Hash do Conteúdo')),
+                ('has_attachments', models.BooleanField(default=False, verbose_name='Tem Anexos')),
+                ('attachments_info', models.JSONField(blank=True, null=True, verbose_name='Informações dos Anexos')),
+                ('timestamp', models.DateTimeField(verbose_name='Timestamp')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+            ],
+            options={
+                'verbose_name': 'Conteúdo de Mensagem',
+                'verbose_name_plural': 'Conteúdos de Mensagens',
+                'unique_together': {('channel_id', 'original_message_id')},
+            },
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='links', to='core.messageblob', verbose_name='Conteúdo Compartilhado'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_messageblob_message_blob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DutyInterval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(verbose_name='Início')),
+                ('ended_at', models.DateTimeField(blank=True, null=True, verbose_name='Fim')),
+                ('accounted_seconds', models.FloatField(default=0.0, verbose_name='Segundos Contabilizados')),
+                ('settled', models.BooleanField(db_index=True, default=False, verbose_name='Consolidado')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('guardian', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='duty_intervals', to='core.guardian', verbose_name='Guardião')),
+            ],
+            options={
+                'verbose_name': 'Período em Serviço',
+                'verbose_name_plural': 'Períodos em Serviço',
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['guardian', 'ended_at'], name='core_dutyin_guardia_80fcfd_idx')],
+            },
+        ),
+    ]
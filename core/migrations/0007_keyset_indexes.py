@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_dutyinterval'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='guardian',
+            index=models.Index(fields=['points', 'id'], name='core_guardian_points_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['created_at', 'id'], name='core_report_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='core_report_status_created_idx'),
+        ),
+    ]
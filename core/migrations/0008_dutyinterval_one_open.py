@@ -0,0 +1,29 @@
+from django.db import migrations, models
+
+
+def close_duplicate_open_intervals(apps, schema_editor):
+    """Fecha, sem duração, os períodos abertos além do mais antigo de cada Guardião"""
+    DutyInterval = apps.get_model('core', 'DutyInterval')
+    seen = set()
+    duplicates = []
+    for interval in DutyInterval.objects.filter(ended_at__isnull=True).order_by('guardian_id', 'started_at', 'id'):
+        if interval.guardian_id in seen:
+            interval.ended_at = interval.started_at
+            duplicates.append(interval)
+        seen.add(interval.guardian_id)
+    DutyInterval.objects.bulk_update(duplicates, ['ended_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(close_duplicate_open_intervals, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dutyinterval',
+            constraint=models.UniqueConstraint(condition=models.Q(('ended_at__isnull', True)), fields=('guardian',), name='core_dutyinterval_one_open'),
+        ),
+    ]
@@ -50,6 +50,10 @@ class Guardian(models.Model):
         verbose_name = "Guardião"
         verbose_name_plural = "Guardiões"
         ordering = ['-points', '-level']
+        indexes = [
+            # Paginação por cursor do ranking (core/pagination.py)
+            models.Index(fields=['points', 'id'], name='core_guardian_points_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.discord_display_name} (Nível {self.level})"
@@ -97,6 +101,39 @@ class Guardian(models.Model):
         return max(0, 90 - days_since_creation)
 
 
+class DutyInterval(models.Model):
+    """Período em serviço de um Guardião (aberto ao entrar, fechado ao sair)"""
+
+    guardian = models.ForeignKey(Guardian, on_delete=models.CASCADE, related_name='duty_intervals', verbose_name="Guardião")
+    started_at = models.DateTimeField(verbose_name="Início")
+    ended_at = models.DateTimeField(null=True, blank=True, verbose_name="Fim")
+
+    # Segundos já contabilizados em total_service_hours pelas consolidações
+    accounted_seconds = models.FloatField(default=0.0, verbose_name="Segundos Contabilizados")
+    settled = models.BooleanField(default=False, db_index=True, verbose_name="Consolidado")
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+
+    class Meta:
+        verbose_name = "Período em Serviço"
+        verbose_name_plural = "Períodos em Serviço"
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['guardian', 'ended_at']),
+        ]
+        constraints = [
+            # No máximo um período aberto por Guardião
+            models.UniqueConstraint(
+                fields=['guardian'],
+                condition=models.Q(ended_at__isnull=True),
+                name='core_dutyinterval_one_open',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.guardian.discord_display_name} - {self.started_at}"
+
+
 class Report(models.Model):
     """Modelo para representar uma denúncia"""
     
@@ -140,6 +177,11 @@ class Report(models.Model):
         verbose_name = "Denúncia"
         verbose_name_plural = "Denúncias"
         ordering = ['-created_at']
+        indexes = [
+            # Paginação por cursor (core/pagination.py)
+            models.Index(fields=['created_at', 'id'], name='core_report_created_id_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='core_report_status_created_idx'),
+        ]
     
     def __str__(self):
         return f"Denúncia #{self.id} - Usuário {self.reported_user_id}"
@@ -206,11 +248,39 @@ class Vote(models.Model):
         return f"{self.guardian.discord_display_name} votou {self.get_vote_type_display()} na denúncia #{self.report.id}"
 
 
+class MessageBlob(models.Model):
+    """Conteúdo de uma mensagem do Discord, compartilhado entre denúncias do mesmo canal"""
+    
+    channel_id = models.BigIntegerField(verbose_name="ID do Canal")
+    original_message_id = models.BigIntegerField(verbose_name="ID Original da Mensagem")
+    original_user_id = models.BigIntegerField(verbose_name="ID Original do Usuário")
+    
+    content = models.TextField(verbose_name="Conteúdo da Mensagem")
+    content_hash = models.CharField(max_length=64, verbose_name="Hash do Conteúdo")
+    
+    has_attachments = models.BooleanField(default=False, verbose_name="Tem Anexos")
+    attachments_info = models.JSONField(blank=True, null=True, verbose_name="Informações dos Anexos")
+    
+    timestamp = models.DateTimeField(verbose_name="Timestamp")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+    
+    class Meta:
+        verbose_name = "Conteúdo de Mensagem"
+        verbose_name_plural = "Conteúdos de Mensagens"
+        unique_together = ['channel_id', 'original_message_id']
+    
+    def __str__(self):
+        return f"Mensagem {self.original_message_id} do canal {self.channel_id}"
+
+
 class Message(models.Model):
     """Modelo para armazenar mensagens das denúncias"""
     
     report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='messages', verbose_name="Denúncia")
     
+    # Conteúdo compartilhado (quando presente, content/attachments_info ficam vazios aqui)
+    blob = models.ForeignKey(MessageBlob, on_delete=models.PROTECT, null=True, blank=True, related_name='links', verbose_name="Conteúdo Compartilhado")
+    
     # IDs originais do Discord
     original_user_id = models.BigIntegerField(verbose_name="ID Original do Usuário")
     original_message_id = models.BigIntegerField(verbose_name="ID Original da Mensagem")
@@ -236,6 +306,16 @@ class Message(models.Model):
     
     def __str__(self):
         return f"Mensagem de {self.anonymized_username} na denúncia #{self.report.id}"
+    
+    @property
+    def text(self):
+        """Conteúdo da mensagem, vindo do conteúdo compartilhado quando existir"""
+        return self.blob.content if self.blob_id else self.content
+    
+    @property
+    def attachments(self):
+        """Informações dos anexos, vindas do conteúdo compartilhado quando existir"""
+        return self.blob.attachments_info if self.blob_id else self.attachments_info
 
 
 class Appeal(models.Model):
@@ -310,13 +390,10 @@ class Appeal(models.Model):
     
     def penalize_original_guardians(self):
         """Penaliza Guardiões que votaram incorretamente na denúncia original"""
-        original_votes = Vote.objects.filter(report=self.report)
+        from .scoring import penalize_report_voters
         
-        for vote in original_votes:
-            if vote.vote_type in ['intimidou', 'grave']:
-                guardian = vote.guardian
-                guardian.points = max(0, guardian.points - 3)  # Perder 3 pontos
-                guardian.save()
+        # Perder 3 pontos (um único UPDATE)
+        penalize_report_voters(self.report)
     
     def apply_doubled_punishment(self):
         """Aplica punição dobrada se necessário"""
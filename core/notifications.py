@@ -6,6 +6,7 @@ import os
 from django.conf import settings
 from django.utils import timezone
 from .models import Guardian, Report
+from .scoring import apply_report_result, is_vote_correct
 from bot.logging_config import log_system_event, log_error
 
 
@@ -136,16 +137,16 @@ class NotificationManager:
             log_error(f"Erro ao notificar usuário {user_id}: {e}")
             return False
     
-    def notify_guardian_level_up(self, guardian, old_level, new_level):
+    def notify_guardian_level_up(self, guardian_id, discord_id, old_level, new_level):
         """Notifica Guardião sobre subida de nível"""
         try:
             self._notify_user(
-                guardian.discord_id,
+                discord_id,
                 f"🎉 Parabéns! Você subiu de nível!",
                 f"Você subiu do nível {old_level} para o nível {new_level}! Continue o bom trabalho!"
             )
             
-            log_system_event("GUARDIAN_LEVEL_UP_NOTIFIED", f"Guardian {guardian.id}: {old_level} -> {new_level}")
+            log_system_event("GUARDIAN_LEVEL_UP_NOTIFIED", f"Guardian {guardian_id}: {old_level} -> {new_level}")
             return True
             
         except Exception as e:
@@ -227,56 +228,19 @@ class ReportProcessor:
     def _update_guardian_points(self, report):
         """Atualiza pontos dos Guardiões"""
         try:
-            votes = Vote.objects.filter(report=report)
-            final_punishment = report.punishment
+            level_ups = apply_report_result(report)
             
-            for vote in votes:
-                guardian = vote.guardian
-                
-                # Verificar se o voto foi correto
-                vote_correct = self._is_vote_correct(vote.vote_type, final_punishment)
-                
-                if vote_correct:
-                    guardian.correct_votes += 1
-                    guardian.points += 1
-                    
-                    # Verificar se subiu de nível
-                    old_level = guardian.level
-                    self._update_guardian_level(guardian)
-                    
-                    if guardian.level > old_level:
-                        self.notification_manager.notify_guardian_level_up(guardian, old_level, guardian.level)
-                else:
-                    guardian.incorrect_votes += 1
-                
-                guardian.save()
+            for level_up in level_ups:
+                self.notification_manager.notify_guardian_level_up(
+                    level_up.guardian_id, level_up.discord_id, level_up.old_level, level_up.new_level
+                )
                 
         except Exception as e:
             log_error(f"Erro ao atualizar pontos dos Guardiões: {e}")
     
     def _is_vote_correct(self, vote_type, final_punishment):
         """Verifica se um voto foi correto"""
-        if final_punishment == 'none':
-            return vote_type == 'improcedente'
-        elif final_punishment in ['mute_1h', 'mute_12h']:
-            return vote_type in ['intimidou', 'grave']
-        elif final_punishment == 'ban_24h':
-            return vote_type == 'grave'
-        
-        return False
-    
-    def _update_guardian_level(self, guardian):
-        """Atualiza nível do Guardião baseado em pontos"""
-        if guardian.points >= 1000:
-            guardian.level = 5  # Mestre
-        elif guardian.points >= 500:
-            guardian.level = 4  # Veterano
-        elif guardian.points >= 200:
-            guardian.level = 3  # Experiente
-        elif guardian.points >= 50:
-            guardian.level = 2  # Aprendiz
-        else:
-            guardian.level = 1  # Novato
+        return is_vote_correct(vote_type, final_punishment)
 
 
 # Instâncias globais
@@ -0,0 +1,181 @@
+"""
+Paginação por cursor (keyset)
+
+Em vez de COUNT(*) e OFFSET, cada página continua a partir dos valores da
+chave de ordenação do último item, por exemplo (created_at, id). Com um
+índice nessa chave, qualquer página custa o mesmo que a primeira. Os
+cursores são opacos (base64 de JSON) e servem tanto para a URL quanto para a
+API. O total, quando pedido, é a estimativa das estatísticas do PostgreSQL.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from django.db import connection
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+# Chaves de ordenação (todas decrescentes, com o id como desempate)
+REPORTS_ORDER = ('-created_at', '-id')
+GUARDIANS_ORDER = ('-points', '-id')
+
+
+class InvalidCursor(ValueError):
+    """Cursor malformado ou de outra ordenação"""
+
+
+def encode_cursor(values, direction='next'):
+    payload = [direction] + [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, fields):
+    """Retorna (direção, valores) de um cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        direction, values = payload[0], payload[1:]
+    except (ValueError, TypeError, IndexError, binascii.Error):
+        raise InvalidCursor(cursor)
+    if direction not in ('next', 'prev') or len(values) != len(fields):
+        raise InvalidCursor(cursor)
+
+    decoded = []
+    for field, value in zip(fields, values):
+        if field.get_internal_type() == 'DateTimeField':
+            value = parse_datetime(value) if isinstance(value, str) else None
+            if value is None:
+                raise InvalidCursor(cursor)
+        decoded.append(value)
+    return direction, decoded
+
+
+def estimated_count(model):
+    """Total aproximado de linhas (PostgreSQL); None em outros bancos"""
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [model._meta.db_table])
+        row = cursor.fetchone()
+    # -1 quando a tabela ainda não foi analisada
+    return max(row[0], 0) if row else None
+
+
+class KeysetPage:
+    """Uma página e os cursores vizinhos"""
+
+    def __init__(self, object_list, next_cursor, previous_cursor, estimated_total=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.estimated_total = estimated_total
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """Pagina um queryset por uma chave de ordenação única"""
+
+    def __init__(self, queryset, ordering, per_page=20):
+        self.queryset = queryset
+        self.ordering = ordering
+        self.per_page = per_page
+        self.field_names = [name.lstrip('-') for name in ordering]
+        self.fields = [queryset.model._meta.get_field(name) for name in self.field_names]
+
+    def _after(self, values, descending_fields):
+        """Q para as linhas depois de `values` na ordem indicada"""
+        condition = Q()
+        for index, name in enumerate(self.field_names):
+            lookup = 'lt' if descending_fields[index] else 'gt'
+            step = Q(**{f'{name}__{lookup}': values[index]})
+            for previous_name, previous_value in zip(self.field_names[:index], values[:index]):
+                step &= Q(**{previous_name: previous_value})
+            condition |= step
+        # Limite redundante na primeira chave: o OR acima não vira início de
+        # faixa no índice, e sem ele o banco percorre todas as linhas anteriores
+        first_lookup = 'lte' if descending_fields[0] else 'gte'
+        return Q(**{f'{self.field_names[0]}__{first_lookup}': values[0]}) & condition
+
+    def _key(self, obj):
+        return [getattr(obj, name) for name in self.field_names]
+
+    def page(self, cursor=None, with_estimate=False):
+        descending = [name.startswith('-') for name in self.ordering]
+        direction = 'next'
+        queryset = self.queryset
+
+        if cursor:
+            direction, values = decode_cursor(cursor, self.fields)
+            if direction == 'prev':
+                # Página anterior: percorre a chave no sentido inverso
+                descending = [not desc for desc in descending]
+            queryset = queryset.filter(self._after(values, descending))
+
+        ordering = [('-' if desc else '') + name for desc, name in zip(descending, self.field_names)]
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if direction == 'prev':
+            rows.reverse()
+            has_next, has_previous = bool(rows), has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor) and bool(rows)
+
+        next_cursor = encode_cursor(self._key(rows[-1]), 'next') if has_next and rows else None
+        previous_cursor = encode_cursor(self._key(rows[0]), 'prev') if has_previous and rows else None
+        estimate = estimated_count(self.queryset.model) if with_estimate else None
+        return KeysetPage(rows, next_cursor, previous_cursor, estimate)
+
+
+class KeysetPagination(BasePagination):
+    """Paginação do DRF com KeysetPaginator (?cursor=, ?page_size=, ?estimate=1)"""
+    ordering = REPORTS_ORDER
+    page_size = 20
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        try:
+            page_size = min(int(request.query_params.get('page_size', self.page_size)), self.max_page_size)
+        except ValueError:
+            page_size = self.page_size
+        with_estimate = request.query_params.get('estimate') in ('1', 'true')
+        try:
+            self.page = KeysetPaginator(queryset, self.ordering, max(page_size, 1)).page(
+                request.query_params.get('cursor'), with_estimate=with_estimate
+            )
+        except InvalidCursor:
+            raise NotFound('Cursor inválido')
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.page.next_cursor,
+            'previous': self.page.previous_cursor,
+            'estimated_total': self.page.estimated_total,
+            'results': data,
+        })
+
+
+class GuardianRankingPagination(KeysetPagination):
+    """Ranking de Guardiões por pontos"""
+    ordering = GUARDIANS_ORDER
@@ -0,0 +1,384 @@
+"""
+Particionamento por tempo da tabela de mensagens (PostgreSQL)
+
+A tabela core_message pode ser convertida em uma tabela particionada por
+faixa mensal de created_at. Partições futuras são criadas antecipadamente e
+a retenção passa a ser feita removendo partições inteiras, de modo que o
+custo de limpeza e de vacuum deixa de crescer com o tamanho da tabela. Uma
+partição só é removida quando nenhuma das suas mensagens pertence a uma
+denúncia ainda em andamento.
+
+Em SQLite (ou com MESSAGE_PARTITIONING desativado) nada muda: a tabela
+continua sendo uma tabela comum.
+"""
+from datetime import date
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import Message, Report
+from bot.logging_config import log_system_event, log_error
+
+
+# Denúncias cujas mensagens não são mais necessárias para votação ou apelação
+FINAL_REPORT_STATUSES = ('completed', 'closed')
+
+
+def _month_start(value, offset=0):
+    """Primeiro dia do mês de `value` deslocado em `offset` meses"""
+    month_index = value.year * 12 + (value.month - 1) + offset
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+class MessagePartitionManager:
+    """Gerencia as partições mensais da tabela de mensagens"""
+
+    def __init__(self):
+        self.table = Message._meta.db_table
+        self.months_ahead = getattr(settings, 'MESSAGE_PARTITION_MONTHS_AHEAD', 3)
+        self.retention_months = getattr(settings, 'MESSAGE_PARTITION_RETENTION_MONTHS', 6)
+
+    def is_supported(self):
+        """Particionamento só é suportado no PostgreSQL"""
+        return connection.vendor == 'postgresql'
+
+    def is_enabled(self):
+        """Verifica se o particionamento está habilitado nas configurações"""
+        return self.is_supported() and getattr(settings, 'MESSAGE_PARTITIONING', False)
+
+    def is_partitioned(self):
+        """Verifica se a tabela já é particionada"""
+        if not self.is_supported():
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT relkind FROM pg_class WHERE relname = %s", [self.table])
+            row = cursor.fetchone()
+        return bool(row and row[0] == 'p')
+
+    def partition_name(self, month):
+        """Nome da partição de um mês"""
+        return f'{self.table}_p{month.year:04d}{month.month:02d}'
+
+    def list_partitions(self):
+        """Lista as partições existentes (nome, limite inferior)"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT child.relname
+                FROM pg_inherits
+                JOIN pg_class parent ON pg_inherits.inhparent = parent.oid
+                JOIN pg_class child ON pg_inherits.inhrelid = child.oid
+                WHERE parent.relname = %s
+                ORDER BY child.relname
+                """,
+                [self.table]
+            )
+            names = [row[0] for row in cursor.fetchall()]
+
+        partitions = []
+        prefix = f'{self.table}_p'
+        for name in names:
+            if not name.startswith(prefix):
+                continue
+            suffix = name[len(prefix):]
+            try:
+                partitions.append((name, date(int(suffix[:4]), int(suffix[4:6]), 1)))
+            except ValueError:
+                continue
+        return partitions
+
+    @property
+    def default_partition(self):
+        return f'{self.table}_default'
+
+    def has_default_partition(self, cursor):
+        cursor.execute("SELECT 1 FROM pg_class WHERE relname = %s", [self.default_partition])
+        return cursor.fetchone() is not None
+
+    def create_partition(self, month, cursor):
+        """Cria a partição de um mês, se ainda não existir"""
+        name = self.partition_name(month)
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{self.table}" '
+            f'FOR VALUES FROM (%s) TO (%s)',
+            [month.isoformat(), _month_start(month, 1).isoformat()]
+        )
+        return name
+
+    def create_partition_from_default(self, month, cursor):
+        """
+        Cria a partição de um mês tirando da partição padrão as linhas desse
+        mês (o PostgreSQL recusa criar a partição enquanto elas estiverem lá)
+        """
+        bounds = [month.isoformat(), _month_start(month, 1).isoformat()]
+        moved = f'{self.table}_moving'
+        with transaction.atomic():
+            cursor.execute(f'LOCK TABLE "{self.default_partition}" IN ACCESS EXCLUSIVE MODE')
+            cursor.execute(f'CREATE TEMP TABLE "{moved}" (LIKE "{self.table}")')
+            cursor.execute(
+                f'WITH moved_rows AS (DELETE FROM "{self.default_partition}" '
+                f'WHERE created_at >= %s AND created_at < %s RETURNING *) '
+                f'INSERT INTO "{moved}" SELECT * FROM moved_rows',
+                bounds
+            )
+            count = cursor.rowcount
+            name = self.create_partition(month, cursor)
+            cursor.execute(f'INSERT INTO "{self.table}" SELECT * FROM "{moved}"')
+            cursor.execute(f'DROP TABLE "{moved}"')
+        if count:
+            log_system_event("MESSAGE_PARTITION_DEFAULT_MOVED", f"{count} mensagens movidas para {name}")
+        return name
+
+    def ensure_future_partitions(self, months_ahead=None):
+        """Garante partições do mês atual até `months_ahead` meses à frente"""
+        if not self.is_partitioned():
+            return []
+
+        months_ahead = self.months_ahead if months_ahead is None else months_ahead
+        current = _month_start(timezone.now())
+        created = []
+
+        with connection.cursor() as cursor:
+            existing = {name for name, _ in self.list_partitions()}
+            has_default = self.has_default_partition(cursor)
+            for offset in range(months_ahead + 1):
+                month = _month_start(current, offset)
+                if self.partition_name(month) in existing:
+                    continue
+                if has_default:
+                    created.append(self.create_partition_from_default(month, cursor))
+                else:
+                    created.append(self.create_partition(month, cursor))
+
+        if created:
+            log_system_event("MESSAGE_PARTITIONS_CREATED", ", ".join(created))
+        return created
+
+    def drop_old_partitions(self, retention_months=None):
+        """
+        Remove partições inteiras mais antigas que o período de retenção.
+        Partições com mensagens de denúncias ainda não finalizadas (pendentes,
+        em votação ou em apelação) são mantidas até a próxima execução.
+        """
+        if not self.is_partitioned():
+            return []
+
+        retention_months = self.retention_months if retention_months is None else retention_months
+        cutoff = _month_start(timezone.now(), -retention_months)
+        dropped = []
+        kept = []
+
+        with connection.cursor() as cursor:
+            for name, month in self.list_partitions():
+                # A partição inteira precisa estar antes do corte
+                if _month_start(month, 1) > cutoff:
+                    continue
+                with transaction.atomic():
+                    # Bloqueia a partição: nenhuma mensagem nova entra entre a verificação e o DROP
+                    cursor.execute(f'LOCK TABLE "{name}" IN ACCESS EXCLUSIVE MODE')
+                    if self.has_open_reports(name, cursor):
+                        kept.append(name)
+                        continue
+                    cursor.execute(f'ALTER TABLE "{self.table}" DETACH PARTITION "{name}"')
+                    cursor.execute(f'DROP TABLE "{name}"')
+                dropped.append(name)
+
+        if kept:
+            log_system_event("MESSAGE_PARTITIONS_KEPT", f"Denúncias não finalizadas em: {', '.join(kept)}")
+        if dropped:
+            log_system_event("MESSAGE_PARTITIONS_DROPPED", ", ".join(dropped))
+        return dropped
+
+    def has_open_reports(self, partition, cursor):
+        """A partição tem mensagens de denúncias que ainda não foram finalizadas"""
+        cursor.execute(
+            f'SELECT 1 FROM "{partition}" message '
+            f'JOIN "{Report._meta.db_table}" report ON report.id = message.report_id '
+            f'WHERE report.status NOT IN %s LIMIT 1',
+            [FINAL_REPORT_STATUSES]
+        )
+        return cursor.fetchone() is not None
+
+    def convert_to_partitioned(self, keep_legacy=False):
+        """
+        Converte a tabela comum em tabela particionada por mês de created_at.
+        Operação única, feita em uma transação (com a tabela bloqueada). Com
+        keep_legacy, a tabela antiga é mantida como cópia, sem chaves estrangeiras.
+        """
+        if not self.is_supported():
+            raise RuntimeError("Particionamento requer PostgreSQL")
+        if self.is_partitioned():
+            return False
+
+        legacy = f'{self.table}_legacy'
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE "{self.table}" IN ACCESS EXCLUSIVE MODE')
+
+            cursor.execute(
+                """
+                SELECT is_identity FROM information_schema.columns
+                WHERE table_name = %s AND column_name = 'id'
+                """,
+                [self.table]
+            )
+            is_identity = cursor.fetchone()[0] == 'YES'
+
+            # Índices secundários (a PK será recriada incluindo created_at)
+            cursor.execute(
+                """
+                SELECT indexname, indexdef FROM pg_indexes
+                WHERE tablename = %s AND indexname NOT IN (
+                    SELECT conname FROM pg_constraint
+                    WHERE conrelid = %s::regclass AND contype IN ('p', 'u')
+                )
+                """,
+                [self.table, self.table]
+            )
+            indexes = cursor.fetchall()
+
+            cursor.execute(
+                """
+                SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+                WHERE conrelid = %s::regclass AND contype = 'f'
+                """,
+                [self.table]
+            )
+            foreign_keys = cursor.fetchall()
+
+            cursor.execute(f'ALTER TABLE "{self.table}" RENAME TO "{legacy}"')
+            for index_name, _ in indexes:
+                cursor.execute(f'ALTER INDEX "{index_name}" RENAME TO "{index_name}_legacy"')
+            for constraint_name, _ in foreign_keys:
+                cursor.execute(
+                    f'ALTER TABLE "{legacy}" RENAME CONSTRAINT "{constraint_name}" TO "{constraint_name}_legacy"'
+                )
+
+            like_options = 'INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS'
+            if is_identity:
+                like_options += ' INCLUDING IDENTITY'
+            cursor.execute(
+                f'CREATE TABLE "{self.table}" (LIKE "{legacy}" {like_options}) '
+                f'PARTITION BY RANGE (created_at)'
+            )
+            cursor.execute(f'ALTER TABLE "{self.table}" ADD PRIMARY KEY (id, created_at)')
+
+            # Partições do mês mais antigo até os meses futuros, mais a partição padrão
+            cursor.execute(f'SELECT MIN(created_at) FROM "{legacy}"')
+            oldest = cursor.fetchone()[0] or timezone.now()
+            month = _month_start(oldest)
+            last = _month_start(timezone.now(), self.months_ahead)
+            while month <= last:
+                self.create_partition(month, cursor)
+                month = _month_start(month, 1)
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS "{self.table}_default" PARTITION OF "{self.table}" DEFAULT'
+            )
+
+            cursor.execute(f'INSERT INTO "{self.table}" SELECT * FROM "{legacy}"')
+
+            if is_identity:
+                cursor.execute(
+                    f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 1)) FROM \"{self.table}\"",
+                    [self.table]
+                )
+            else:
+                # Coluna serial: a sequência continua a mesma, mas passa a pertencer à nova tabela
+                cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [legacy])
+                sequence = cursor.fetchone()[0]
+                if sequence:
+                    cursor.execute(f'ALTER SEQUENCE {sequence} OWNED BY "{self.table}".id')
+
+            for index_name, index_def in indexes:
+                cursor.execute(index_def)
+            for constraint_name, constraint_def in foreign_keys:
+                cursor.execute(
+                    f'ALTER TABLE "{self.table}" ADD CONSTRAINT "{constraint_name}" {constraint_def}'
+                )
+
+            if keep_legacy:
+                # A cópia antiga não pode impedir a exclusão de denúncias (as FKs
+                # do Django não têm ON DELETE CASCADE no banco)
+                for constraint_name, _ in foreign_keys:
+                    cursor.execute(f'ALTER TABLE "{legacy}" DROP CONSTRAINT "{constraint_name}_legacy"')
+            else:
+                cursor.execute(f'DROP TABLE "{legacy}"')
+
+        log_system_event("MESSAGE_TABLE_PARTITIONED", f"{self.table} convertida (legado mantido: {keep_legacy})")
+        return True
+
+    def maintain(self):
+        """Manutenção periódica: cria partições futuras e remove as antigas"""
+        if not self.is_enabled():
+            return {'created': [], 'dropped': []}
+
+        try:
+            return {
+                'created': self.ensure_future_partitions(),
+                'dropped': self.drop_old_partitions(),
+            }
+        except Exception as e:
+            log_error(f"Erro na manutenção de partições de mensagens: {e}")
+            return {'created': [], 'dropped': []}
+
+
+class PartitionCommand(BaseCommand):
+    """Comando Django para gerenciar as partições de mensagens"""
+
+    help = 'Gerencia o particionamento mensal da tabela de mensagens (PostgreSQL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'action',
+            choices=['status', 'convert', 'ensure', 'drop'],
+            help='Ação a executar'
+        )
+        parser.add_argument(
+            '--keep-legacy',
+            action='store_true',
+            help='Mantém a tabela antiga (sem chaves estrangeiras) após a conversão'
+        )
+        parser.add_argument(
+            '--months',
+            type=int,
+            help='Meses à frente (ensure) ou meses de retenção (drop)'
+        )
+
+    def handle(self, *args, **options):
+        """Executa a ação solicitada"""
+        manager = MessagePartitionManager()
+
+        if not manager.is_supported():
+            self.stdout.write(
+                self.style.WARNING('Banco atual não é PostgreSQL - a tabela de mensagens continua comum')
+            )
+            return
+
+        action = options['action']
+
+        if action == 'status':
+            if not manager.is_partitioned():
+                self.stdout.write('Tabela de mensagens não particionada')
+                return
+            partitions = manager.list_partitions()
+            self.stdout.write(f'Tabela particionada com {len(partitions)} partições mensais:')
+            for name, month in partitions:
+                self.stdout.write(f'  • {name} ({month:%m/%Y})')
+
+        elif action == 'convert':
+            if manager.convert_to_partitioned(keep_legacy=options['keep_legacy']):
+                self.stdout.write(self.style.SUCCESS('Tabela de mensagens convertida para particionada'))
+            else:
+                self.stdout.write('Tabela de mensagens já é particionada')
+
+        elif action == 'ensure':
+            created = manager.ensure_future_partitions(options.get('months'))
+            self.stdout.write(self.style.SUCCESS(f'{len(created)} partições criadas'))
+
+        elif action == 'drop':
+            dropped = manager.drop_old_partitions(options.get('months'))
+            self.stdout.write(self.style.SUCCESS(f'{len(dropped)} partições removidas'))
+
+
+# Instância global
+partition_manager = MessagePartitionManager()
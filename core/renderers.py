@@ -0,0 +1,71 @@
+"""
+Renderização e leitura de JSON com orjson
+
+O orjson faz parte do requirements.txt; quando instalado e FAST_JSON
+estiver ativo, as respostas da API (REST_FRAMEWORK) e as JsonResponse das
+views usam o orjson, bem mais rápido que o módulo json da biblioteca padrão
+em payloads grandes como as sessões de votação com mensagens e anexos. Sem
+ele, tudo volta para o json padrão com a mesma saída.
+"""
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_encoder = DjangoJSONEncoder()
+
+
+def fast_json_enabled():
+    return orjson is not None and settings.FAST_JSON
+
+
+def _default(obj):
+    # Tipos que o orjson não conhece (Decimal, timedelta, textos lazy...)
+    return _encoder.default(obj)
+
+
+def dumps(data):
+    """JSON em bytes (UTF-8)"""
+    if fast_json_enabled():
+        return orjson.dumps(data, default=_default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+    return _encoder.encode(data).encode('utf-8')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer do DRF com orjson (saída indentada continua no renderer padrão)"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or not fast_json_enabled():
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=self.encoder_class().default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser do DRF com orjson"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if not fast_json_enabled():
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class FastJsonResponse(HttpResponse):
+    """Equivalente a JsonResponse usando dumps()"""
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError('In order to allow non-dict objects to be serialized set the safe parameter to False.')
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
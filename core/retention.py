@@ -0,0 +1,298 @@
+"""
+Motor de retenção e arquivamento de dados antigos do Sistema Guardião
+
+Remove registros antigos em lotes limitados por faixa de chave primária,
+com pausas entre os lotes, para nunca manter locks longos em tabelas quentes.
+Opcionalmente arquiva cada lote em NDJSON comprimido (gzip) antes de apagar.
+"""
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from .models import (
+    Report, Vote, Message, MessageBlob, Appeal, AppealVote, DutyInterval,
+    VotingSession, SessionGuardian, ReportQueue,
+)
+from . import versioning
+from bot.logging_config import log_system_event, log_error
+
+
+class RetentionPolicy:
+    """Política de retenção para um modelo"""
+
+    def __init__(self, name, model, date_field, days, filters=None, children=None, archive=False):
+        self.name = name
+        self.model = model
+        self.date_field = date_field
+        self.days = days
+        self.filters = filters or {}
+        # Lista de (modelo filho, campo de lookup) apagados antes do pai,
+        # na ordem folha -> raiz
+        self.children = children or []
+        self.archive = archive
+
+    def get_queryset(self, now=None):
+        """Retorna os registros elegíveis para remoção"""
+        now = now or timezone.now()
+        cutoff = now - timedelta(days=self.days)
+        return self.model.objects.filter(
+            **{f'{self.date_field}__lt': cutoff},
+            **self.filters
+        )
+
+
+def get_default_policies():
+    """Políticas padrão, sobrescritas por settings.RETENTION_POLICIES"""
+    policies = {
+        'reports': RetentionPolicy(
+            name='reports',
+            model=Report,
+            date_field='created_at',
+            days=30,
+            filters={'status': 'completed'},
+            children=[
+                (AppealVote, 'appeal__report_id__in'),
+                (Appeal, 'report_id__in'),
+                (SessionGuardian, 'session__report_id__in'),
+                (VotingSession, 'report_id__in'),
+                (ReportQueue, 'report_id__in'),
+                (Vote, 'report_id__in'),
+                (Message, 'report_id__in'),
+            ],
+        ),
+        'voting_sessions': RetentionPolicy(
+            name='voting_sessions',
+            model=VotingSession,
+            date_field='created_at',
+            days=7,
+            filters={'status__in': ['completed', 'cancelled']},
+            children=[
+                (SessionGuardian, 'session_id__in'),
+            ],
+        ),
+        'report_queue': RetentionPolicy(
+            name='report_queue',
+            model=ReportQueue,
+            date_field='created_at',
+            days=7,
+            filters={'status__in': ['completed', 'cancelled']},
+        ),
+        # Conteúdo compartilhado que não é mais referenciado por nenhuma denúncia
+        'message_blobs': RetentionPolicy(
+            name='message_blobs',
+            model=MessageBlob,
+            date_field='created_at',
+            days=1,
+            filters={'links__isnull': True},
+        ),
+        # Períodos em serviço já contabilizados em total_service_hours
+        'duty_intervals': RetentionPolicy(
+            name='duty_intervals',
+            model=DutyInterval,
+            date_field='ended_at',
+            days=90,
+            filters={'settled': True},
+        ),
+    }
+
+    overrides = getattr(settings, 'RETENTION_POLICIES', {}) or {}
+    for name, options in overrides.items():
+        policy = policies.get(name)
+        if not policy:
+            continue
+        for key in ('days', 'archive', 'filters'):
+            if key in options:
+                setattr(policy, key, options[key])
+
+    return policies
+
+
+class RetentionManager:
+    """Executa políticas de retenção em lotes limitados"""
+
+    def __init__(self, batch_size=None, sleep_seconds=None, archive_dir=None):
+        self.batch_size = batch_size or getattr(settings, 'RETENTION_BATCH_SIZE', 500)
+        self.sleep_seconds = sleep_seconds if sleep_seconds is not None else getattr(settings, 'RETENTION_BATCH_SLEEP', 0.2)
+        self.archive_dir = archive_dir or os.path.join(settings.BASE_DIR, 'backups', 'archive')
+
+    def run_all(self, names=None, dry_run=False, archive=None, stdout=None):
+        """Executa todas as políticas (ou apenas as informadas)"""
+        results = {}
+        for name, policy in get_default_policies().items():
+            if names and name not in names:
+                continue
+            if archive is not None:
+                policy.archive = archive
+            results[name] = self.run_policy(policy, dry_run=dry_run, stdout=stdout)
+        return results
+
+    def run_policy(self, policy, dry_run=False, stdout=None):
+        """Remove os registros elegíveis de uma política, lote a lote"""
+        started = time.monotonic()
+        deleted = 0
+        batches = 0
+        last_pk = None
+        archive_file = None
+
+        try:
+            base_queryset = policy.get_queryset()
+
+            if dry_run:
+                count = base_queryset.count()
+                return {'policy': policy.name, 'eligible': count, 'deleted': 0, 'batches': 0,
+                        'seconds': 0.0, 'rows_per_second': 0.0, 'dry_run': True}
+
+            while True:
+                batch_queryset = base_queryset.order_by('pk')
+                if last_pk is not None:
+                    batch_queryset = batch_queryset.filter(pk__gt=last_pk)
+                ids = list(batch_queryset.values_list('pk', flat=True)[:self.batch_size])
+
+                if not ids:
+                    break
+
+                if policy.archive and archive_file is None:
+                    archive_file = self._open_archive(policy)
+
+                with transaction.atomic():
+                    if archive_file:
+                        self._archive_batch(archive_file, policy, ids)
+                    deleted += self._delete_batch(policy, ids)
+
+                batches += 1
+                last_pk = ids[-1]
+
+                if stdout:
+                    stdout.write(f"  • {policy.name}: lote {batches} ({len(ids)} registros)")
+
+                if len(ids) < self.batch_size:
+                    break
+
+                if self.sleep_seconds:
+                    time.sleep(self.sleep_seconds)
+
+        except Exception as e:
+            log_error(f"Erro na retenção '{policy.name}': {e}")
+        finally:
+            if archive_file:
+                archive_file.close()
+
+        elapsed = time.monotonic() - started
+        rows_per_second = deleted / elapsed if elapsed > 0 else 0.0
+
+        if deleted > 0:
+            # Exclusões em lote não disparam sinais
+            versioning.bump(versioning.REPORTS, versioning.QUEUE)
+            log_system_event(
+                "RETENTION_APPLIED",
+                f"{policy.name}: {deleted} registros em {batches} lotes ({rows_per_second:.1f} linhas/s)"
+            )
+
+        return {
+            'policy': policy.name,
+            'deleted': deleted,
+            'batches': batches,
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(rows_per_second, 1),
+            'archive': archive_file.name if archive_file else None,
+        }
+
+    def _delete_batch(self, policy, ids):
+        """Apaga um lote: filhos primeiro (DELETE direto), depois o pai"""
+        for child_model, lookup in policy.children:
+            child_model.objects.filter(**{lookup: ids}).delete()
+
+        _, per_model = policy.model.objects.filter(pk__in=ids).delete()
+        return per_model.get(policy.model._meta.label, 0)
+
+    def _open_archive(self, policy):
+        """Abre o arquivo NDJSON comprimido da execução"""
+        if not os.path.exists(self.archive_dir):
+            os.makedirs(self.archive_dir)
+
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(self.archive_dir, f'{policy.name}_{timestamp}.ndjson.gz')
+        return gzip.open(path, 'wt', encoding='utf-8')
+
+    def _archive_batch(self, archive_file, policy, ids):
+        """Grava o lote (pai e filhos) no arquivo NDJSON"""
+        self._write_rows(archive_file, policy.model, policy.model.objects.filter(pk__in=ids))
+        for child_model, lookup in policy.children:
+            self._write_rows(archive_file, child_model, child_model.objects.filter(**{lookup: ids}))
+
+    def _write_rows(self, archive_file, model, queryset):
+        """Escreve uma linha JSON por registro"""
+        label = model._meta.label_lower
+        for row in queryset.values().iterator():
+            archive_file.write(json.dumps({'model': label, 'fields': row}, cls=DjangoJSONEncoder, ensure_ascii=False))
+            archive_file.write('\n')
+
+
+class RetentionCommand(BaseCommand):
+    """Comando Django para aplicar as políticas de retenção"""
+
+    help = 'Remove dados antigos em lotes, com arquivamento opcional'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--policy',
+            action='append',
+            help='Política a executar (reports, voting_sessions, report_queue, message_blobs, duty_intervals). Pode repetir.'
+        )
+        parser.add_argument(
+            '--archive',
+            action='store_true',
+            help='Arquiva os registros em NDJSON comprimido antes de apagar'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas conta os registros elegíveis'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Tamanho do lote'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            help='Pausa entre lotes, em segundos'
+        )
+
+    def handle(self, *args, **options):
+        """Executa a retenção"""
+        manager = RetentionManager(
+            batch_size=options.get('batch_size'),
+            sleep_seconds=options.get('sleep'),
+        )
+
+        results = manager.run_all(
+            names=options.get('policy'),
+            dry_run=options['dry_run'],
+            archive=True if options['archive'] else None,
+            stdout=self.stdout,
+        )
+
+        for name, result in results.items():
+            if result.get('dry_run'):
+                self.stdout.write(f"{name}: {result['eligible']} registros elegíveis")
+            else:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"{name}: {result['deleted']} removidos em {result['batches']} lotes "
+                        f"({result['rows_per_second']} linhas/s)"
+                    )
+                )
+                if result.get('archive'):
+                    self.stdout.write(f"  Arquivo: {result['archive']}")
+
+
+# Instância global
+retention_manager = RetentionManager()
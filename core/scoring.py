@@ -0,0 +1,255 @@
+"""
+Pontuação dos Guardiões após a conclusão de denúncias e apelações
+
+Os pontos e contadores de todos os votantes de uma denúncia são atualizados
+com poucos UPDATEs em conjunto (expressões F), e o nível é recalculado no
+mesmo comando via Case/When. Os votantes são bloqueados (SELECT ... FOR
+UPDATE) antes da leitura dos pontos, então resultados simultâneos não perdem
+nem repetem subidas de nível. O número de consultas não depende da
+quantidade de votos.
+"""
+from collections import namedtuple
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+from .models import Guardian, Vote
+from . import versioning
+from bot.logging_config import log_system_event
+
+# (pontos mínimos, nível), do maior para o menor
+LEVEL_THRESHOLDS = [
+    (1000, 5),  # Mestre
+    (500, 4),   # Veterano
+    (200, 3),   # Experiente
+    (50, 2),    # Aprendiz
+]
+DEFAULT_LEVEL = 1  # Novato
+
+CORRECT_VOTE_POINTS = 1
+APPEAL_PENALTY_POINTS = 3
+
+# Votos considerados corretos para cada punição final
+CORRECT_VOTES_BY_PUNISHMENT = {
+    'none': ['improcedente'],
+    'mute_1h': ['intimidou', 'grave'],
+    'mute_12h': ['intimidou', 'grave'],
+    'ban_24h': ['grave'],
+}
+
+LevelUp = namedtuple('LevelUp', ['guardian_id', 'discord_id', 'old_level', 'new_level'])
+LevelChange = namedtuple('LevelChange', ['guardian_id', 'old_level', 'new_level'])
+
+LEVEL_TRIGGER_NAME = 'core_guardian_sync_level'
+
+
+def level_for_points(points):
+    """Nível correspondente a uma quantidade de pontos"""
+    for minimum, level in LEVEL_THRESHOLDS:
+        if points >= minimum:
+            return level
+    return DEFAULT_LEVEL
+
+
+def level_expression(delta=0):
+    """
+    Expressão SQL do nível para `points + delta`.
+
+    Em um UPDATE, F('points') ainda é o valor antigo, por isso os limites são
+    deslocados pelo delta em vez de somar o delta à coluna.
+    """
+    return Case(
+        *[When(points__gte=minimum - delta, then=Value(level)) for minimum, level in LEVEL_THRESHOLDS],
+        default=Value(DEFAULT_LEVEL),
+        output_field=IntegerField(),
+    )
+
+
+def level_case_sql(column='points'):
+    """Mesma regra de level_expression em SQL puro (para o UPDATE e o trigger)"""
+    whens = ' '.join(
+        f'WHEN {column} >= {int(minimum)} THEN {int(level)}' for minimum, level in LEVEL_THRESHOLDS
+    )
+    return f'CASE {whens} ELSE {int(DEFAULT_LEVEL)} END'
+
+
+def is_vote_correct(vote_type, final_punishment):
+    """Verifica se um voto foi correto para a punição final"""
+    return vote_type in CORRECT_VOTES_BY_PUNISHMENT.get(final_punishment, [])
+
+
+def apply_report_result(report):
+    """
+    Aplica o resultado de uma denúncia a todos os Guardiões que votaram.
+
+    Retorna a lista de subidas de nível (LevelUp) para notificação.
+    """
+    correct_types = CORRECT_VOTES_BY_PUNISHMENT.get(report.punishment, [])
+
+    correct_ids = []
+    incorrect_ids = []
+    level_ups = []
+
+    with transaction.atomic():
+        votes = dict(Vote.objects.filter(report=report).values_list('guardian_id', 'vote_type'))
+
+        # Bloqueia os votantes (em ordem de id, sem deadlocks entre resultados
+        # simultâneos) para que a subida de nível seja calculada sobre os pontos atuais
+        guardians = Guardian.objects.select_for_update().filter(id__in=list(votes)).order_by('id').values_list(
+            'id', 'discord_id', 'points', 'level'
+        )
+        for guardian_id, discord_id, points, level in guardians:
+            if votes[guardian_id] in correct_types:
+                correct_ids.append(guardian_id)
+                new_level = level_for_points(points + CORRECT_VOTE_POINTS)
+                if new_level > level:
+                    level_ups.append(LevelUp(guardian_id, discord_id, level, new_level))
+            else:
+                incorrect_ids.append(guardian_id)
+
+        if correct_ids:
+            Guardian.objects.filter(id__in=correct_ids).update(
+                correct_votes=F('correct_votes') + 1,
+                points=F('points') + CORRECT_VOTE_POINTS,
+                level=level_expression(CORRECT_VOTE_POINTS),
+            )
+
+        if incorrect_ids:
+            Guardian.objects.filter(id__in=incorrect_ids).update(
+                incorrect_votes=F('incorrect_votes') + 1,
+            )
+
+    if correct_ids or incorrect_ids:
+        versioning.bump(versioning.GUARDIANS)
+    return level_ups
+
+
+def penalize_report_voters(report, vote_types=('intimidou', 'grave')):
+    """Remove pontos dos Guardiões que votaram por punição em uma denúncia revertida"""
+    updated = Guardian.objects.filter(
+        id__in=Vote.objects.filter(report=report, vote_type__in=vote_types).values('guardian_id')
+    ).update(
+        points=Greatest(F('points') - APPEAL_PENALTY_POINTS, 0)
+    )
+    if updated:
+        versioning.bump(versioning.GUARDIANS)
+    return updated
+
+
+def sync_guardian_levels():
+    """
+    Recalcula o nível de todos os Guardiões a partir dos pontos.
+
+    No PostgreSQL é um único UPDATE ... RETURNING; nos demais bancos, uma
+    leitura das linhas divergentes seguida de um UPDATE em conjunto.
+    Retorna a lista de mudanças (LevelChange).
+    """
+    table = Guardian._meta.db_table
+
+    if connection.vendor == 'postgresql':
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE "{table}" AS g
+                SET level = target.level
+                FROM (
+                    SELECT id, level AS old_level, {level_case_sql()} AS level
+                    FROM "{table}"
+                ) AS target
+                WHERE g.id = target.id AND g.level <> target.level
+                RETURNING g.id, target.old_level, g.level
+                """
+            )
+            changes = [LevelChange(*row) for row in cursor.fetchall()]
+    else:
+        with transaction.atomic():
+            stale = Guardian.objects.alias(target=level_expression()).exclude(level=F('target'))
+            changes = [
+                LevelChange(*row)
+                for row in stale.annotate(new_level=level_expression()).values_list('id', 'level', 'new_level')
+            ]
+            if changes:
+                stale.update(level=level_expression())
+
+    if changes:
+        versioning.bump(versioning.GUARDIANS)
+        log_system_event("GUARDIAN_LEVELS_SYNCED", f"{len(changes)} níveis atualizados")
+    return changes
+
+
+def install_level_trigger():
+    """
+    Instala (PostgreSQL) um trigger que mantém o nível sincronizado com os
+    pontos em qualquer INSERT/UPDATE, inclusive fora do Django.
+    """
+    if connection.vendor != 'postgresql':
+        raise RuntimeError("Trigger de nível requer PostgreSQL")
+
+    table = Guardian._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            CREATE OR REPLACE FUNCTION {LEVEL_TRIGGER_NAME}() RETURNS trigger AS $$
+            BEGIN
+                NEW.level := {level_case_sql('NEW.points')};
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+        cursor.execute(f'DROP TRIGGER IF EXISTS {LEVEL_TRIGGER_NAME} ON "{table}"')
+        cursor.execute(
+            f'CREATE TRIGGER {LEVEL_TRIGGER_NAME} BEFORE INSERT OR UPDATE OF points ON "{table}" '
+            f'FOR EACH ROW EXECUTE FUNCTION {LEVEL_TRIGGER_NAME}()'
+        )
+    log_system_event("GUARDIAN_LEVEL_TRIGGER", "instalado")
+
+
+def drop_level_trigger():
+    """Remove o trigger de nível (PostgreSQL)"""
+    if connection.vendor != 'postgresql':
+        return
+
+    table = Guardian._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DROP TRIGGER IF EXISTS {LEVEL_TRIGGER_NAME} ON "{table}"')
+        cursor.execute(f'DROP FUNCTION IF EXISTS {LEVEL_TRIGGER_NAME}()')
+    log_system_event("GUARDIAN_LEVEL_TRIGGER", "removido")
+
+
+class LevelSyncCommand(BaseCommand):
+    """Comando Django para sincronizar os níveis dos Guardiões"""
+
+    help = 'Recalcula os níveis dos Guardiões a partir dos pontos (um único UPDATE)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--install-trigger',
+            action='store_true',
+            help='Instala o trigger que mantém o nível sincronizado no banco (PostgreSQL)'
+        )
+        parser.add_argument(
+            '--drop-trigger',
+            action='store_true',
+            help='Remove o trigger de nível'
+        )
+
+    def handle(self, *args, **options):
+        """Executa a sincronização"""
+        if options['drop_trigger']:
+            drop_level_trigger()
+            self.stdout.write(self.style.SUCCESS('Trigger de nível removido'))
+            return
+
+        if options['install_trigger']:
+            try:
+                install_level_trigger()
+            except RuntimeError as e:
+                self.stdout.write(self.style.ERROR(str(e)))
+                return
+            self.stdout.write(self.style.SUCCESS('Trigger de nível instalado'))
+
+        changes = sync_guardian_levels()
+        self.stdout.write(self.style.SUCCESS(f'{len(changes)} níveis atualizados'))
+        for change in changes[:20]:
+            self.stdout.write(f'  • Guardião {change.guardian_id}: {change.old_level} -> {change.new_level}')
@@ -1,11 +1,102 @@
 """
 Serializers para a API do Sistema Guardião
 """
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import Guardian, Report, Vote, Message, Appeal, AppealVote
+from .transcripts import store_report_messages
 
 
-class GuardianSerializer(serializers.ModelSerializer):
+def _split(value):
+    return [item.strip() for item in value.split(',') if item.strip()] if value else []
+
+
+def shape_from_request(request, default_expand=()):
+    """Campos (?fields=) e expansões (?expand=) pedidos na query string"""
+    fields = _split(request.query_params.get('fields')) or None
+    if 'expand' in request.query_params:
+        expand = _split(request.query_params.get('expand'))
+    else:
+        # Sem ?expand=, as expansões padrão valem apenas se não foram excluídas por ?fields=
+        expand = [name for name in default_expand if not fields or name in fields]
+    return fields, expand
+
+
+def resolve_shape(serializer_class, fields=None, expand=None):
+    """Campos que o serializer vai produzir e expansões válidas"""
+    meta = serializer_class.Meta
+    expandable = getattr(meta, 'expandable_fields', ())
+    expanded = [name for name in (expand or ()) if name in expandable]
+    names = [
+        name for name in meta.fields
+        if name in expanded or (name not in expandable and (not fields or name in fields))
+    ]
+    return names, expanded
+
+
+def optimize_queryset(queryset, serializer_class, fields=None, expand=None, keep=()):
+    """
+    Ajusta o queryset ao formato pedido: prefetch apenas das expansões
+    incluídas (Meta.prefetch_plan) e only() com as colunas necessárias.
+    `keep` lista colunas extras usadas por quem consome o queryset (ex.: a
+    chave da paginação).
+    """
+    meta = serializer_class.Meta
+    names, expanded = resolve_shape(serializer_class, fields, expand)
+
+    plan = getattr(meta, 'prefetch_plan', {})
+    for name in expanded:
+        queryset = queryset.prefetch_related(*plan.get(name, [name]))
+
+    if fields:
+        sources = getattr(meta, 'field_sources', {})
+        concrete = {field.name for field in meta.model._meta.concrete_fields}
+        columns = {meta.model._meta.pk.name, *keep}
+        for name in names:
+            if name in sources:
+                columns.update(sources[name])
+            elif name in concrete:
+                columns.add(name)
+        queryset = queryset.only(*columns)
+    return queryset
+
+
+class DynamicFieldsMixin:
+    """
+    Formato de resposta sob demanda: `fields` limita os campos e `expand`
+    inclui os campos de Meta.expandable_fields, que ficam fora por padrão.
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        names, _ = resolve_shape(type(self), fields, expand)
+        for name in set(self.fields) - set(names):
+            self.fields.pop(name)
+
+
+class ValuesSerializer:
+    """
+    Serialização somente leitura direto de .values(), sem instanciar
+    modelos. Para chamadas internas frequentes com formato fixo.
+    """
+    fields = ()
+    # Campo -> função de formatação (para manter o formato já usado pelos clientes)
+    formatters = {}
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+
+    @property
+    def data(self):
+        rows = list(self.queryset.values(*self.fields))
+        for row in rows:
+            for field, formatter in self.formatters.items():
+                if row[field] is not None:
+                    row[field] = formatter(row[field])
+        return rows
+
+
+class GuardianSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer para o modelo Guardian"""
     
     class Meta:
@@ -17,10 +108,19 @@ class GuardianSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at', 'last_activity'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'accuracy_percentage']
+        field_sources = {'accuracy_percentage': ['correct_votes', 'incorrect_votes']}
+
+
+class MessageTextField(serializers.CharField):
+    """Conteúdo da mensagem: lido do conteúdo compartilhado quando existir, gravado em content"""
+
+    def get_attribute(self, instance):
+        return instance.text
 
 
 class MessageSerializer(serializers.ModelSerializer):
     """Serializer para o modelo Message"""
+    content = MessageTextField(allow_blank=True)
     
     class Meta:
         model = Message
@@ -43,8 +143,8 @@ class VoteSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class ReportSerializer(serializers.ModelSerializer):
-    """Serializer para o modelo Report"""
+class ReportSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """Serializer para o modelo Report (mensagens e votos só com ?expand=)"""
     
     messages = MessageSerializer(many=True, read_only=True)
     votes = VoteSerializer(many=True, read_only=True)
@@ -61,6 +161,11 @@ class ReportSerializer(serializers.ModelSerializer):
             'id', 'votes_improcedente', 'votes_intimidou', 'votes_grave',
             'total_votes', 'created_at', 'completed_at', 'punishment'
         ]
+        expandable_fields = ['messages', 'votes']
+        prefetch_plan = {
+            'messages': [Prefetch('messages', queryset=Message.objects.select_related('blob'))],
+            'votes': [Prefetch('votes', queryset=Vote.objects.select_related('guardian'))],
+        }
 
 
 class AppealSerializer(serializers.ModelSerializer):
@@ -94,6 +199,19 @@ class AppealVoteSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
+# Serializers leves (somente leitura, via .values())
+class ReportSummarySerializer(ValuesSerializer):
+    """Resumo de denúncia usado no polling de novas denúncias"""
+    fields = ('id', 'reason', 'created_at', 'reported_user_id', 'reporter_user_id', 'guild_id', 'channel_id')
+    # Mesmo formato de antes (isoformat, com +00:00), lido pelo scripts.js
+    formatters = {'created_at': lambda value: value.isoformat()}
+
+
+class GuardianSummarySerializer(ValuesSerializer):
+    """Resumo de Guardião usado no polling de status"""
+    fields = ('id', 'discord_id', 'discord_display_name', 'status', 'level', 'points')
+
+
 # Serializers para criação de objetos
 class CreateReportSerializer(serializers.ModelSerializer):
     """Serializer para criar uma nova denúncia"""
@@ -111,8 +229,20 @@ class CreateReportSerializer(serializers.ModelSerializer):
         messages_data = validated_data.pop('messages', [])
         report = Report.objects.create(**validated_data)
         
-        for message_data in messages_data:
-            Message.objects.create(report=report, **message_data)
+        # Conteúdo vai para MessageBlob, compartilhado com outras denúncias do canal
+        store_report_messages(report, report.channel_id, [
+            {
+                'original_message_id': message_data['original_message_id'],
+                'original_user_id': message_data['original_user_id'],
+                'anonymized_username': message_data['anonymized_username'],
+                'content': message_data['content'],
+                'has_attachments': False,
+                'attachments_info': None,
+                'timestamp': message_data['timestamp'],
+                'is_reported_user': message_data.get('is_reported_user', False),
+            }
+            for message_data in messages_data
+        ])
         
         return report
 
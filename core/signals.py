@@ -0,0 +1,48 @@
+"""
+Sinais do app core
+
+Incrementam as versões usadas nos ETags dos endpoints de polling e no
+catálogo do treinamento (core/versioning.py). Nos modelos tocados pela
+retenção, apenas post_save: receptores de post_delete impediriam as exclusões
+rápidas em lote, e a retenção incrementa as versões por conta própria.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from . import versioning
+from .models import Guardian, Report, ReportQueue, VotingSession, SessionGuardian, Vote, TrainingSection, TrainingExercise
+
+
+@receiver(post_save, sender=Report)
+def report_saved(sender, instance, **kwargs):
+    versioning.bump(versioning.REPORTS, versioning.QUEUE)
+
+
+@receiver(post_save, sender=ReportQueue)
+@receiver(post_save, sender=VotingSession)
+def queue_saved(sender, instance, **kwargs):
+    versioning.bump(versioning.QUEUE)
+
+
+@receiver(post_save, sender=Guardian)
+def guardian_saved(sender, instance, **kwargs):
+    versioning.bump(versioning.guardian_key(instance.discord_id))
+
+
+@receiver(post_save, sender=SessionGuardian)
+@receiver(post_save, sender=Vote)
+def guardian_activity_saved(sender, instance, **kwargs):
+    # Usa o Guardião já carregado na instância; senão busca só o discord_id
+    if sender.guardian.is_cached(instance):
+        discord_id = instance.guardian.discord_id
+    else:
+        discord_id = Guardian.objects.filter(pk=instance.guardian_id).values_list('discord_id', flat=True).first()
+    if discord_id is not None:
+        versioning.bump(versioning.guardian_key(discord_id))
+
+
+@receiver(post_save, sender=TrainingSection)
+@receiver(post_save, sender=TrainingExercise)
+@receiver(post_delete, sender=TrainingSection)
+@receiver(post_delete, sender=TrainingExercise)
+def training_content_changed(sender, instance, **kwargs):
+    versioning.bump(versioning.TRAINING)
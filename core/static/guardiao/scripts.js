@@ -50,6 +50,38 @@ const Utils = {
         }
     },
 
+    // Intervalo (ms) até a próxima consulta, sugerido pelo servidor
+    // via X-Poll-Interval ou Retry-After (429)
+    pollDelay(response, fallbackMs) {
+        const retryAfter = parseInt(response.headers.get('Retry-After'), 10);
+        const interval = parseInt(response.headers.get('X-Poll-Interval'), 10);
+        const seconds = Math.max(retryAfter || 0, interval || 0);
+        return seconds > 0 ? seconds * 1000 : fallbackMs;
+    },
+
+    // GET condicional: envia If-None-Match e, em 304, reaproveita o último corpo
+    etagCache: new Map(),
+
+    async conditionalFetch(url, options = {}) {
+        const cached = this.etagCache.get(url);
+        const headers = { ...(options.headers || {}) };
+        if (cached) {
+            headers['If-None-Match'] = cached.etag;
+        }
+
+        const response = await fetch(url, { ...options, headers, cache: 'no-store' });
+        if (response.status === 304 && cached) {
+            return { response, ok: true, data: cached.data };
+        }
+
+        const data = await response.json();
+        const etag = response.headers.get('ETag');
+        if (response.ok && etag) {
+            this.etagCache.set(url, { etag, data });
+        }
+        return { response, ok: response.ok, data };
+    },
+
     // AJAX helper
     async request(url, options = {}) {
         const defaultOptions = {
@@ -177,6 +209,7 @@ class RealTimeUpdates {
                 this.currentSession = null;
                 this.votingTimer = null;
                 this.lastNotificationTime = 0; // Para cooldown de notificação
+                this.pollHint = 0; // Maior intervalo sugerido pelo servidor no ciclo atual
         this.clearOldLocalStorage();
         this.init();
     }
@@ -191,11 +224,21 @@ class RealTimeUpdates {
             init() {
                 // Check for new reports every 5 seconds
                 if (window.location.pathname.includes('/dashboard') || window.location.pathname === '/') {
-                    setInterval(this.checkForUpdates.bind(this), 5000);
-                    // Verificar se há denúncia pendente para o Guardião atual
-                    this.checkPendingReport();
-                    // Verificar denúncias pendentes a cada 1 minuto (60000ms)
-                    setInterval(this.checkPendingReport.bind(this), 60000);
+                    // O servidor ajusta os intervalos (X-Poll-Interval): mais longos
+                    // com a fila vazia ou o servidor sobrecarregado
+                    const updatesLoop = async () => {
+                        const delay = await this.checkForUpdates();
+                        setTimeout(updatesLoop, delay || 5000);
+                    };
+                    setTimeout(updatesLoop, 5000);
+                    
+                    // Verificar se há denúncia pendente para o Guardião atual (padrão: a cada 1 minuto)
+                    const pendingLoop = async () => {
+                        this.pollHint = 0;
+                        await this.checkPendingReport();
+                        setTimeout(pendingLoop, this.pollHint || 60000);
+                    };
+                    pendingLoop();
                 } else {
                     // Se não estiver no dashboard, fechar qualquer modal/notificação aberta
                     this.closeVotingModal();
@@ -209,8 +252,11 @@ class RealTimeUpdates {
                 ? `/api/reports/check-new/?last_check=${this.lastCheck}`
                 : '/api/reports/check-new/';
 
-            const response = await fetch(url);
-            const data = await response.json();
+            const { response, ok, data } = await Utils.conditionalFetch(url);
+            const delay = Utils.pollDelay(response, 5000);
+            if (!ok) {
+                return delay;
+            }
             
             // Sistema antigo de notificações desabilitado
             // Agora usamos apenas o modal de votação
@@ -218,11 +264,18 @@ class RealTimeUpdates {
 
             // Update last check timestamp
             this.lastCheck = data.timestamp;
+            return delay;
         } catch (error) {
             console.error('Erro ao verificar atualizações:', error);
         }
     }
 
+            notePollHint(response) {
+                this.pollHint = Math.max(this.pollHint, Utils.pollDelay(response, 0));
+                // 429: manter o estado atual e tentar novamente mais tarde
+                return response.status === 429;
+            }
+
     showReportNotification(report) {
         // Play notification sound
         this.playNotificationSound();
@@ -316,10 +369,13 @@ class RealTimeUpdates {
             async checkPendingReport() {
                 try {
                     // Verificar se o usuário está logado (verificar se há sessão ativa)
-                    const sessionCheck = await fetch('/api/auth/check-session/', {
+                    const sessionCheck = await Utils.conditionalFetch('/api/auth/check-session/', {
                         method: 'GET',
                         credentials: 'include'
                     });
+                    if (this.notePollHint(sessionCheck.response)) {
+                        return;
+                    }
                     
                     if (!sessionCheck.ok) {
                         console.log('🚪 Usuário não logado - não verificando denúncias pendentes');
@@ -328,7 +384,7 @@ class RealTimeUpdates {
                         return;
                     }
                     
-                    const sessionData = await sessionCheck.json();
+                    const sessionData = sessionCheck.data;
                     if (!sessionData.authenticated) {
                         console.log('🚪 Sessão inválida - não verificando denúncias pendentes');
                         this.closeVotingModal();
@@ -346,8 +402,11 @@ class RealTimeUpdates {
                     }
 
                     // Primeiro verificar se o Guardião está online
-                    const statusResponse = await fetch(`/api/guardian/${guardianId}/status/`);
-                    const statusData = await statusResponse.json();
+                    const statusResponse = await Utils.conditionalFetch(`/api/guardian/${guardianId}/status/`);
+                    if (this.notePollHint(statusResponse.response)) {
+                        return;
+                    }
+                    const statusData = statusResponse.data;
                     
                     console.log('👤 Status do Guardião:', statusData);
 
@@ -367,8 +426,10 @@ class RealTimeUpdates {
 
                     console.log('✅ Guardião online - verificando denúncias pendentes');
 
-                    const response = await fetch(`/api/guardian/${guardianId}/pending-report/`);
-                    const data = await response.json();
+                    const { response, data } = await Utils.conditionalFetch(`/api/guardian/${guardianId}/pending-report/`);
+                    if (this.notePollHint(response)) {
+                        return;
+                    }
                     
                     console.log('📋 Resposta da API:', data);
 
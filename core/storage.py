@@ -0,0 +1,79 @@
+"""
+Armazenamento dos arquivos estáticos
+
+No collectstatic, os arquivos .js e .css são minificados (rjsmin/rcssmin,
+do requirements.txt; sem eles os arquivos são copiados como estão) e em
+seguida o WhiteNoise gera os nomes com hash do conteúdo, o manifesto e as
+versões .gz/.br. Como o nome muda a cada alteração, o WhiteNoise serve esses
+arquivos com cache de longa duração (immutable) e o navegador só baixa de
+novo o que mudou.
+"""
+import os
+from django.conf import settings
+from django.contrib.staticfiles.storage import StaticFilesStorage
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+
+def available_minifiers():
+    minifiers = {}
+    if rjsmin is not None:
+        minifiers['.js'] = rjsmin.jsmin
+    if rcssmin is not None:
+        minifiers['.css'] = rcssmin.cssmin
+    return minifiers
+
+
+class GuardiaoStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """Minifica, gera hash e comprime os estáticos"""
+
+    # Arquivos fora do manifesto (ex.: antes do primeiro collectstatic) não derrubam a página
+    manifest_strict = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.minified = {}  # nome -> (bytes antes, bytes depois)
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run and settings.STATIC_MINIFY:
+            paths = self.minify(paths)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def minify(self, paths):
+        """
+        Grava no STATIC_ROOT a versão minificada e passa a usá-la como origem do hash
+        (o ManifestStaticFilesStorage lê os arquivos da origem, não do STATIC_ROOT)
+        """
+        minifiers = available_minifiers()
+        paths = dict(paths)
+        for name in list(paths):
+            minifier = minifiers.get(os.path.splitext(name)[1])
+            if minifier is None or name.endswith(('.min.js', '.min.css')):
+                continue
+            storage, source_path = paths[name]
+            with storage.open(source_path) as f:
+                original = f.read().decode('utf-8')
+            minified = minifier(original)
+            if len(minified) >= len(original):
+                continue
+            with open(self.path(name), 'w', encoding='utf-8') as f:
+                f.write(minified)
+            self.minified[name] = (len(original.encode('utf-8')), len(minified.encode('utf-8')))
+            paths[name] = (self, name)
+        return paths
+
+    def url(self, name, force=False):
+        try:
+            return super().url(name, force)
+        except ValueError:
+            # Arquivo ainda não coletado: URL sem hash (servida pelos finders em DEBUG)
+            return StaticFilesStorage.url(self, name)
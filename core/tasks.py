@@ -6,6 +6,9 @@ from django.utils import timezone
 from datetime import timedelta
 from .models import Report, Guardian, Vote
 from .integration import report_processor, guardian_manager, bot_integration
+from .retention import retention_manager
+from .partitioning import partition_manager
+from .scoring import sync_guardian_levels
 from bot.logging_config import log_system_event, log_error
 
 
@@ -20,6 +23,7 @@ class ProcessReportsCommand(BaseCommand):
             self.process_completed_reports()
             self.update_guardian_stats()
             self.cleanup_old_data()
+            self.maintain_message_partitions()
             
             self.stdout.write(
                 self.style.SUCCESS('Processamento concluído com sucesso')
@@ -56,30 +60,36 @@ class ProcessReportsCommand(BaseCommand):
         """Atualiza estatísticas dos Guardiões"""
         try:
             guardian_manager.update_service_hours()
+            # Pontos de serviço e penalidades não recalculam o nível
+            update_guardian_levels()
             self.stdout.write("Estatísticas dos Guardiões atualizadas")
             
         except Exception as e:
             log_error(f"Erro ao atualizar estatísticas: {e}")
     
     def cleanup_old_data(self):
-        """Limpa dados antigos"""
+        """Limpa dados antigos em lotes, conforme as políticas de retenção"""
         try:
-            # Remover denúncias antigas (mais de 30 dias)
-            cutoff_date = timezone.now() - timedelta(days=30)
-            old_reports = Report.objects.filter(
-                created_at__lt=cutoff_date,
-                status='completed'
-            )
-            
-            deleted_count = old_reports.count()
-            old_reports.delete()
+            results = retention_manager.run_all()
             
-            if deleted_count > 0:
-                log_system_event("OLD_DATA_CLEANED", f"{deleted_count} old reports deleted")
-                self.stdout.write(f"Removidas {deleted_count} denúncias antigas")
+            for name, result in results.items():
+                if result['deleted'] > 0:
+                    self.stdout.write(
+                        f"Retenção {name}: {result['deleted']} registros removidos "
+                        f"({result['rows_per_second']} linhas/s)"
+                    )
             
         except Exception as e:
             log_error(f"Erro na limpeza de dados: {e}")
+    
+    def maintain_message_partitions(self):
+        """Cria partições futuras de mensagens e remove as expiradas (PostgreSQL)"""
+        result = partition_manager.maintain()
+        
+        if result['created']:
+            self.stdout.write(f"Partições de mensagens criadas: {', '.join(result['created'])}")
+        if result['dropped']:
+            self.stdout.write(f"Partições de mensagens removidas: {', '.join(result['dropped'])}")
 
 
 class HealthCheckCommand(BaseCommand):
@@ -166,30 +176,7 @@ def process_pending_reports():
 def update_guardian_levels():
     """Atualiza níveis dos Guardiões baseado em pontos"""
     try:
-        guardians = Guardian.objects.all()
-        updated_count = 0
-        
-        for guardian in guardians:
-            old_level = guardian.level
-            
-            # Calcular novo nível baseado em pontos
-            if guardian.points >= 1000:
-                guardian.level = 5  # Mestre
-            elif guardian.points >= 500:
-                guardian.level = 4  # Veterano
-            elif guardian.points >= 200:
-                guardian.level = 3  # Experiente
-            elif guardian.points >= 50:
-                guardian.level = 2  # Aprendiz
-            else:
-                guardian.level = 1  # Novato
-            
-            if guardian.level != old_level:
-                guardian.save()
-                updated_count += 1
-                log_system_event("GUARDIAN_LEVEL_UP", f"Guardian {guardian.id}: {old_level} -> {guardian.level}")
-        
-        return updated_count
+        return len(sync_guardian_levels())
         
     except Exception as e:
         log_error(f"Erro ao atualizar níveis dos Guardiões: {e}")
@@ -1,3 +1,28 @@
-from django.test import TestCase
+from django.http import HttpResponse
+from django.middleware.csrf import CsrfViewMiddleware, get_token
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from core import compression
+from core.compression import CompressionMiddleware
 
-# Create your tests here.
+
+@override_settings(COMPRESSION_MIN_SIZE=100)
+class CompressionBreachTests(SimpleTestCase):
+    """Páginas com token CSRF nunca saem em brotli (sem o preenchimento contra BREACH)"""
+
+    def get_encoding(self, use_token):
+        def view(request):
+            if use_token:
+                get_token(request)
+            return HttpResponse('<p>conteúdo</p>' * 200, content_type='text/html')
+
+        # Mesma ordem do MIDDLEWARE: a compressão fica por fora do CSRF
+        middleware = CompressionMiddleware(CsrfViewMiddleware(view))
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip, br')
+        return middleware(request).get('Content-Encoding')
+
+    def test_page_with_csrf_token_uses_gzip(self):
+        self.assertEqual(self.get_encoding(use_token=True), 'gzip')
+
+    def test_page_without_csrf_token_prefers_brotli(self):
+        expected = 'br' if compression.brotli is not None else 'gzip'
+        self.assertEqual(self.get_encoding(use_token=False), expected)
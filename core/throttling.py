@@ -0,0 +1,173 @@
+"""
+Limite de requisições e intervalo sugerido para os endpoints de polling
+
+Os endpoints consultados periodicamente pelo dashboard usam dois limites
+guardados no cache compartilhado: um pelo Guardião da sessão e um por IP.
+Cada limite admite "capacity" requisições a cada capacity / refill_per_second
+segundos (janela deslizante); acima disso a resposta é 429 com Retry-After. As respostas também trazem o
+cabeçalho X-Poll-Interval, com o intervalo que o cliente deve esperar até a
+próxima consulta: maior quando a fila está vazia ou o servidor sobrecarregado.
+"""
+import math
+import os
+import time
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+from . import versioning
+
+POLL_INTERVAL_HEADER = 'X-Poll-Interval'
+
+
+class SlidingWindowLimiter:
+    """
+    Limite de requisições com estado no cache do Django
+
+    Janela deslizante aproximada: contadores por janela de capacity /
+    refill_per_second segundos, e a contagem da janela anterior entra com peso
+    proporcional ao tempo que ainda se sobrepõe à atual. Os contadores só usam
+    cache.add e cache.incr, atômicos no Redis e no LocMem, então processos e
+    threads concorrentes não admitem requisições a mais.
+    """
+
+    def __init__(self, key, capacity, refill_per_second):
+        self.key = key
+        self.capacity = capacity
+        self.window = capacity / refill_per_second
+
+    def consume(self):
+        """Retorna (permitido, segundos até haver espaço)"""
+        index, offset = divmod(time.time(), self.window)
+        index = int(index)
+        current_key = f'{self.key}:{index}'
+        # A janela ainda é lida como "anterior" durante a próxima
+        timeout = math.ceil(self.window * 2) + 1
+
+        cache.add(current_key, 0, timeout)
+        try:
+            count = cache.incr(current_key)
+        except ValueError:
+            # Expirou entre o add e o incr
+            cache.add(current_key, 0, timeout)
+            count = cache.incr(current_key)
+        previous = cache.get(f'{self.key}:{index - 1}', 0)
+
+        remaining = 1 - offset / self.window
+        estimated = previous * remaining + count
+        if estimated <= self.capacity:
+            return True, 0.0
+
+        # Requisições recusadas não contam
+        try:
+            cache.decr(current_key)
+        except ValueError:
+            pass
+        until_next_window = self.window - offset
+        if previous and count - 1 < self.capacity:
+            # A parcela da janela anterior cai a previous / window por segundo
+            wait = (estimated - self.capacity) * self.window / previous
+            return False, min(wait, until_next_window)
+        return False, until_next_window
+
+
+class PollThrottle(BaseThrottle):
+    """Throttle do DRF baseado em SlidingWindowLimiter"""
+    scope = None
+
+    def get_ident_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return True
+        rate = settings.POLL_THROTTLE_RATES[self.scope]
+        limiter = SlidingWindowLimiter(f'throttle:{self.scope}:{ident}', rate['capacity'], rate['refill_per_second'])
+        allowed, self.wait_seconds = limiter.consume()
+        return allowed
+
+    def wait(self):
+        return math.ceil(self.wait_seconds)
+
+
+class GuardianPollThrottle(PollThrottle):
+    """
+    Limite por Guardião da sessão
+
+    Nunca usa o ID da URL: os endpoints são públicos e qualquer cliente
+    poderia esgotar o limite de outro Guardião. Sem login vale só o limite por IP.
+    """
+    scope = 'guardian'
+
+    def get_ident_key(self, request, view):
+        return request.session.get('guardian_id')
+
+
+class IPPollThrottle(PollThrottle):
+    """Limite por endereço IP"""
+    scope = 'ip'
+
+    def get_ident_key(self, request, view):
+        return self.get_ident(request)
+
+
+POLL_THROTTLES = [GuardianPollThrottle, IPPollThrottle]
+
+
+def queue_has_work(query=True):
+    """
+    Há denúncias aguardando Guardiões. O resultado fica no cache junto com a
+    versão da fila (core/versioning.py) e só é consultado de novo quando ela
+    muda; com query=False (respostas 304) nunca consulta o banco e, sem
+    resultado em cache, considera que há trabalho.
+    """
+    version = versioning.get_versions(versioning.QUEUE)[0]
+    key = f'poll:queue_has_work:{version}'
+    has_work = cache.get(key)
+    if has_work is None:
+        if not query:
+            return True
+        from .models import ReportQueue
+        has_work = ReportQueue.objects.filter(status__in=['pending', 'assigned']).exists()
+        # Sem versões compartilhadas (POLL_ETAGS) a mudança pode não ter sido vista aqui
+        timeout = settings.POLL_INTERVAL_MAX if settings.POLL_ETAGS else settings.POLL_QUEUE_STATE_TTL
+        cache.set(key, has_work, timeout)
+    return has_work
+
+
+def overload_factor():
+    """Multiplicador do intervalo conforme a carga da máquina"""
+    try:
+        load = os.getloadavg()[0] / (os.cpu_count() or 1)
+    except OSError:
+        return 1
+    if load >= settings.POLL_OVERLOAD_LOAD * 2:
+        return 4
+    if load >= settings.POLL_OVERLOAD_LOAD:
+        return 2
+    return 1
+
+
+def poll_interval(scope, query=True):
+    """Intervalo sugerido (segundos) até a próxima consulta"""
+    intervals = settings.POLL_INTERVALS[scope]
+    interval = intervals['active'] if queue_has_work(query) else intervals['idle']
+    return min(interval * overload_factor(), settings.POLL_INTERVAL_MAX)
+
+
+def poll_hint(scope):
+    """Adiciona X-Poll-Interval à resposta de um endpoint de polling"""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = view_func(request, *args, **kwargs)
+            # Respostas 304 não consultam o banco
+            interval = poll_interval(scope, query=response.status_code != 304)
+            retry_after = response.get('Retry-After')
+            if retry_after:
+                interval = max(interval, int(retry_after))
+            response[POLL_INTERVAL_HEADER] = str(interval)
+            return response
+        return wrapper
+    return decorator
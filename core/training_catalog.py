@@ -0,0 +1,92 @@
+"""
+Catálogo do treinamento em memória
+
+Seções e exercícios ativos só mudam quando um administrador os edita, então
+cada processo guarda o catálogo (seções, exercícios, contagens e a ordem das
+seções) e as páginas do treinamento são montadas a partir dele, sem consultar
+o banco. A versão do catálogo fica no cache compartilhado (core/versioning.py)
+e é incrementada pelos sinais de TrainingSection e TrainingExercise; quando
+ela muda, o próximo acesso de cada processo recarrega o catálogo. Sem cache
+compartilhado (REDIS_URL) os outros processos não veem o incremento, por isso o
+catálogo também é recarregado após TRAINING_CATALOG_TTL segundos. Os
+fragmentos {% cache %} dos templates usam como chave a impressão digital do
+conteúdo carregado (ids e updated_at), igual em todos os processos.
+
+Os objetos do catálogo são compartilhados entre requisições e devem ser
+tratados como somente leitura.
+"""
+import hashlib
+import threading
+import time
+from django.conf import settings
+from . import versioning
+from .models import TrainingSection, TrainingExercise
+
+_lock = threading.Lock()
+_catalog = None
+
+
+class TrainingCatalog:
+    """Seções e exercícios ativos, em ordem"""
+
+    def __init__(self, version, sections, exercises):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.sections = sections
+        self._sections_by_id = {section.id: section for section in sections}
+        self._exercises_by_id = {}
+        self._exercises_by_section = {section.id: [] for section in sections}
+        for exercise in exercises:
+            section = self._sections_by_id.get(exercise.section_id)
+            if section is None:
+                continue
+            # Evita a consulta de exercise.section
+            exercise.section = section
+            self._exercises_by_id[exercise.id] = exercise
+            self._exercises_by_section[section.id].append(exercise)
+        for section in sections:
+            section.exercise_count = len(self._exercises_by_section[section.id])
+
+        stamps = [f'{obj.id}:{obj.updated_at.timestamp()}' for obj in sections + list(self._exercises_by_id.values())]
+        self.fingerprint = hashlib.sha1(' '.join(stamps).encode()).hexdigest()[:16]
+
+    @classmethod
+    def load(cls, version):
+        sections = list(TrainingSection.objects.filter(is_active=True).order_by('order'))
+        exercises = list(TrainingExercise.objects.filter(is_active=True).order_by('order'))
+        return cls(version, sections, exercises)
+
+    def is_current(self, version):
+        return self.version == version and time.monotonic() - self.loaded_at < settings.TRAINING_CATALOG_TTL
+
+    def section(self, section_id):
+        return self._sections_by_id.get(section_id)
+
+    def exercise(self, exercise_id):
+        return self._exercises_by_id.get(exercise_id)
+
+    def exercises(self, section):
+        return self._exercises_by_section.get(section.id, [])
+
+    def exercise_count(self, section):
+        return len(self.exercises(section))
+
+    def next_section(self, section):
+        """Próxima seção ativa pela ordem"""
+        return next((other for other in self.sections if other.order > section.order), None)
+
+    def final_section(self):
+        return next((section for section in self.sections if section.section_type == 'prova_final'), None)
+
+
+def get_catalog():
+    """Catálogo atual, recarregado quando a versão muda"""
+    global _catalog
+    version = versioning.get_versions(versioning.TRAINING)[0]
+    catalog = _catalog
+    if catalog is not None and catalog.is_current(version):
+        return catalog
+    with _lock:
+        if _catalog is None or not _catalog.is_current(version):
+            _catalog = TrainingCatalog.load(version)
+        return _catalog
@@ -0,0 +1,132 @@
+"""
+Armazenamento e leitura das transcrições (mensagens) das denúncias
+
+O conteúdo das mensagens fica em MessageBlob, endereçado por
+(channel_id, original_message_id). Cada denúncia guarda apenas um vínculo
+fino (Message) com o nome anonimizado daquela denúncia, de modo que várias
+denúncias do mesmo canal não duplicam as mesmas mensagens.
+"""
+import hashlib
+import json
+from django.core.cache import cache
+from django.db import transaction
+from .models import Message, MessageBlob
+
+# Transcrições só mudam quando mensagens são adicionadas (store_report_messages)
+TRANSCRIPT_CACHE_TIMEOUT = 60 * 60
+
+
+def _transcript_cache_key(report_id):
+    return f'transcript:{report_id}'
+
+
+def compute_content_hash(content, attachments_info):
+    """Hash do conteúdo e dos anexos de uma mensagem"""
+    payload = json.dumps([content, attachments_info], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def store_report_messages(report, channel_id, entries):
+    """
+    Salva as mensagens de uma denúncia reaproveitando o conteúdo já armazenado.
+
+    `entries` é uma lista de dicts com original_message_id, original_user_id,
+    anonymized_username, content, has_attachments, attachments_info,
+    timestamp e is_reported_user. Usa um número constante de consultas.
+    """
+    if not entries:
+        return 0
+
+    for entry in entries:
+        entry['content_hash'] = compute_content_hash(entry['content'], entry['attachments_info'])
+
+    message_ids = [entry['original_message_id'] for entry in entries]
+
+    with transaction.atomic():
+        existing = {
+            message_id: content_hash
+            for message_id, content_hash in MessageBlob.objects.filter(
+                channel_id=channel_id,
+                original_message_id__in=message_ids
+            ).values_list('original_message_id', 'content_hash')
+        }
+
+        new_blobs = [
+            MessageBlob(
+                channel_id=channel_id,
+                original_message_id=entry['original_message_id'],
+                original_user_id=entry['original_user_id'],
+                content=entry['content'],
+                content_hash=entry['content_hash'],
+                has_attachments=entry['has_attachments'],
+                attachments_info=entry['attachments_info'],
+                timestamp=entry['timestamp'],
+            )
+            for entry in entries
+            if entry['original_message_id'] not in existing
+        ]
+        if new_blobs:
+            MessageBlob.objects.bulk_create(new_blobs, ignore_conflicts=True)
+
+        blobs = dict(
+            MessageBlob.objects.filter(
+                channel_id=channel_id,
+                original_message_id__in=message_ids
+            ).values_list('original_message_id', 'id')
+        )
+
+        links = []
+        for entry in entries:
+            shared = (
+                entry['original_message_id'] in blobs
+                and existing.get(entry['original_message_id'], entry['content_hash']) == entry['content_hash']
+            )
+            # Mensagem editada desde a última denúncia: guarda o conteúdo na própria
+            # denúncia para não alterar a evidência das denúncias anteriores
+            links.append(Message(
+                report=report,
+                blob_id=blobs[entry['original_message_id']] if shared else None,
+                original_user_id=entry['original_user_id'],
+                original_message_id=entry['original_message_id'],
+                anonymized_username=entry['anonymized_username'],
+                content='' if shared else entry['content'],
+                has_attachments=entry['has_attachments'],
+                attachments_info=None if shared else entry['attachments_info'],
+                timestamp=entry['timestamp'],
+                is_reported_user=entry['is_reported_user'],
+            ))
+
+        Message.objects.bulk_create(links)
+        transaction.on_commit(lambda: invalidate_report_transcript(report.id))
+
+    return len(links)
+
+
+def get_report_transcript(report_id):
+    """Retorna as mensagens de uma denúncia (um JOIN, com cache)"""
+    cache_key = _transcript_cache_key(report_id)
+    transcript = cache.get(cache_key)
+
+    if transcript is None:
+        messages = Message.objects.filter(report_id=report_id).select_related('blob').order_by('timestamp')
+        transcript = [
+            {
+                'id': msg.id,
+                'original_user_id': msg.original_user_id,
+                'anonymized_username': msg.anonymized_username,
+                'content': msg.text,
+                'timestamp': msg.timestamp.isoformat(),
+                'is_reported_user': msg.is_reported_user,
+                'has_attachments': msg.has_attachments,
+                'attachments_info': msg.attachments,
+            }
+            for msg in messages
+        ]
+        cache.set(cache_key, transcript, TRANSCRIPT_CACHE_TIMEOUT)
+
+    return transcript
+
+
+def invalidate_report_transcript(report_id):
+    """Remove a transcrição de uma denúncia do cache"""
+    cache.delete(_transcript_cache_key(report_id))
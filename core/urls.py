@@ -16,6 +16,7 @@ urlpatterns = [
     path('training/section/<int:section_id>/', views.training_section, name='training_section'),
     path('training/exercise/<int:exercise_id>/', views.training_exercise, name='training_exercise'),
     path('training/answer/<int:exercise_id>/', views.training_answer, name='training_answer'),
+    path('training/section/<int:section_id>/submit/', views.training_submit, name='training_submit'),
     
     # Autenticação
     path('auth/discord/', views.discord_login, name='discord_login'),
@@ -0,0 +1,120 @@
+"""
+Versões do estado da fila e dos Guardiões para GET condicional
+
+Cada parte do estado consultado pelos endpoints de polling tem um contador
+no cache, incrementado a cada mudança (core/signals.py e atualizações em
+massa). O ETag das respostas é montado a partir desses contadores: se o
+cliente envia If-None-Match com o ETag atual, a resposta é 304 sem nenhuma
+consulta ao banco.
+
+Os contadores precisam ser vistos por todos os processos que escrevem (web e
+bot), por isso o recurso só é ativado por padrão com cache compartilhado
+(REDIS_URL); veja POLL_ETAGS nas settings.
+"""
+import hashlib
+import time
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+
+# Versões
+REPORTS = 'reports'      # denúncias criadas ou alteradas
+QUEUE = 'queue'          # fila e sessões de votação
+GUARDIANS = 'guardians'  # atualizações em massa de Guardiões (pontos, horas, nível)
+TRAINING = 'training'    # conteúdo do treinamento (core/training_catalog.py)
+
+
+def guardian_key(discord_id):
+    return f'guardian:{discord_id}'
+
+
+def _cache_key(name):
+    return f'version:{name}'
+
+
+def bump(*names):
+    """Incrementa as versões informadas"""
+    for name in names:
+        key = _cache_key(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Versão inexistente (cache vazio ou expirado): recomeça de um valor novo
+            cache.add(key, time.time_ns(), None)
+
+
+def get_versions(*names):
+    """Versões atuais, criando as que não existirem"""
+    keys = [_cache_key(name) for name in names]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        if key not in found:
+            cache.add(key, time.time_ns(), None)
+            found[key] = cache.get(key)
+        versions.append(found[key])
+    return versions
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1(':'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:20]
+    return quote_etag(digest)
+
+
+def time_bucket(seconds):
+    """Parte do ETag que muda a cada `seconds` (respostas que dependem do relógio)"""
+    return int(time.time() // seconds)
+
+
+def conditional_poll(etag_func):
+    """
+    Responde 304 quando o If-None-Match coincide com o ETag calculado por
+    etag_func(request, **kwargs), antes de executar a view.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not settings.POLL_ETAGS:
+                return view_func(request, *args, **kwargs)
+
+            etag = etag_func(request, **kwargs)
+            if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+            if if_none_match:
+                client_etags = [tag.removeprefix('W/') for tag in parse_etags(if_none_match)]
+                if etag in client_etags or '*' in client_etags:
+                    response = HttpResponseNotModified()
+                    response['ETag'] = etag
+                    return response
+
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200:
+                response['ETag'] = etag
+                response['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+
+# ===== ETags dos endpoints de polling =====
+
+def new_reports_etag(request, **kwargs):
+    return make_etag('reports', *get_versions(REPORTS), request.GET.get('last_check', ''))
+
+
+def guardian_status_etag(request, guardian_id, **kwargs):
+    return make_etag('status', guardian_id, *get_versions(GUARDIANS, guardian_key(guardian_id)))
+
+
+def pending_report_etag(request, guardian_id, **kwargs):
+    # O prazo das sessões depende do relógio: a resposta muda pelo menos a cada intervalo
+    return make_etag(
+        'pending', guardian_id,
+        *get_versions(QUEUE, GUARDIANS, guardian_key(guardian_id)),
+        time_bucket(settings.POLL_ETAG_TIME_BUCKET),
+    )
+
+
+def session_etag(request, **kwargs):
+    return make_etag('session', request.session.get('guardian_id'), request.session.get('guardian_db_id'))
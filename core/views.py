@@ -1,21 +1,26 @@
 """
 Views para o Sistema Guardião
 """
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login
 from django.contrib import messages
-from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils.decorators import method_decorator
 from django.views import View
-from django.core.paginator import Paginator
 from django.utils import timezone
-import requests
+from django.db import transaction
 import json
-from .models import Guardian, Report, Vote, Message, Appeal, TrainingSection, TrainingExercise, TrainingProgress, TrainingAnswer
+from .models import Guardian, Report, Vote, Message, Appeal, TrainingProgress, TrainingAnswer
 from .forms import VoteForm
+from .duty import record_status_change
+from .pagination import KeysetPaginator, InvalidCursor, REPORTS_ORDER
 from .decorators import guardian_required
+from .renderers import FastJsonResponse
+from .training_catalog import get_catalog
+from .identity import request_guardian
+from . import discord_oauth
 
 
 def home(request):
@@ -31,92 +36,36 @@ def home(request):
 
 def discord_login(request):
     """Inicia o processo de login com Discord OAuth2"""
-    from django.conf import settings
-    
-    client_id = settings.DISCORD_CLIENT_ID
-    redirect_uri = f"{settings.SITE_URL}/auth/discord/callback/"
-    
-    discord_auth_url = (
-        f"https://discord.com/api/oauth2/authorize"
-        f"?client_id={client_id}"
-        f"&redirect_uri={redirect_uri}"
-        f"&response_type=code"
-        f"&scope=identify"
-    )
-    
-    return redirect(discord_auth_url)
+    return redirect(discord_oauth.authorize_url())
 
 
 def discord_callback(request):
     """Callback do Discord OAuth2"""
-    from django.conf import settings
-    
     code = request.GET.get('code')
     if not code:
         messages.error(request, 'Erro na autenticação com Discord')
         return redirect('home')
     
     try:
-        # Trocar código por token
-        token_data = {
-            'client_id': settings.DISCORD_CLIENT_ID,
-            'client_secret': settings.DISCORD_CLIENT_SECRET,
-            'grant_type': 'authorization_code',
-            'code': code,
-            'redirect_uri': f"{settings.SITE_URL}/auth/discord/callback/"
-        }
-        
-        response = requests.post('https://discord.com/api/oauth2/token', data=token_data)
-        token_response = response.json()
-        
-        if 'access_token' not in token_response:
-            messages.error(request, 'Erro ao obter token do Discord')
-            return redirect('home')
-        
-        # Obter informações do usuário
-        headers = {'Authorization': f"Bearer {token_response['access_token']}"}
-        user_response = requests.get('https://discord.com/api/users/@me', headers=headers)
-        user_data = user_response.json()
-        
-        # Buscar data de criação da conta Discord
-        discord_account_created_at = None
-        if 'id' in user_data:
-            # Converter Discord ID para timestamp (Discord IDs contêm timestamp de criação)
-            discord_id = int(user_data['id'])
-            # Discord IDs são snowflakes que contêm timestamp
-            # Os primeiros 22 bits são o timestamp (em milissegundos desde 2015-01-01)
-            timestamp_ms = (discord_id >> 22) + 1420070400000  # 1420070400000 é o epoch do Discord
-            discord_account_created_at = timezone.datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
-        
-        # Criar ou atualizar perfil do Guardião
-        guardian, created = Guardian.objects.get_or_create(
-            discord_id=user_data['id'],
-            defaults={
-                'discord_username': user_data['username'],
-                'discord_display_name': user_data.get('display_name') or user_data['username'],
-                'avatar_url': f"https://cdn.discordapp.com/avatars/{user_data['id']}/{user_data['avatar']}.png" if user_data.get('avatar') else None,
-                'role': 'usuario',  # Sempre começar como USUARIO
-                'discord_account_created_at': discord_account_created_at,
-                'status': 'offline',  # Começar como offline
-                'level': 1,
-                'points': 0,
-            }
-        )
-        
-        if not created:
-            # Atualizar informações (mas manter role se já for guardian)
-            guardian.discord_username = user_data['username']
-            guardian.discord_display_name = user_data.get('display_name') or user_data['username']
-            guardian.avatar_url = f"https://cdn.discordapp.com/avatars/{user_data['id']}/{user_data['avatar']}.png" if user_data.get('avatar') else None
-            
-            # Atualizar data de criação se não estiver definida
-            if not guardian.discord_account_created_at and discord_account_created_at:
-                guardian.discord_account_created_at = discord_account_created_at
-            
-            guardian.save()
-            print(f"✅ Guardião existente atualizado: {guardian.discord_display_name} (ID: {guardian.discord_id}, Role: {guardian.role})")
-        else:
+        # Trocar código por token e obter informações do usuário
+        with discord_oauth.oauth_slot():
+            access_token = discord_oauth.exchange_code(code)
+            user_data = discord_oauth.fetch_user(access_token)
+    except discord_oauth.DiscordOAuthBusy:
+        messages.error(request, 'Muitos logins ao mesmo tempo. Tente novamente em alguns segundos.')
+        return redirect('home')
+    except discord_oauth.DiscordOAuthError as e:
+        print(f"❌ Erro no OAuth do Discord: {e}")
+        messages.error(request, 'Erro ao obter token do Discord')
+        return redirect('home')
+    
+    try:
+        # Criar ou atualizar perfil do Guardião (apenas campos alterados)
+        guardian, created = discord_oauth.upsert_guardian(user_data)
+        if created:
             print(f"🆕 Novo Guardião criado: {guardian.discord_display_name} (ID: {guardian.discord_id}, Role: {guardian.role})")
+        else:
+            print(f"✅ Guardião existente atualizado: {guardian.discord_display_name} (ID: {guardian.discord_id}, Role: {guardian.role})")
         
         # Criar sessão de usuário
         request.session['guardian_id'] = guardian.discord_id  # Usar discord_id para API
@@ -140,7 +89,7 @@ def dashboard(request):
         return redirect('discord_login')
     
     try:
-        guardian = Guardian.objects.get(discord_id=guardian_discord_id)
+        guardian = request_guardian(request)
     except Guardian.DoesNotExist:
         messages.error(request, 'Perfil de usuário não encontrado. Faça login novamente.')
         request.session.flush()
@@ -166,7 +115,7 @@ def report_detail(request, report_id):
         return redirect('discord_login')
     
     try:
-        guardian = Guardian.objects.get(discord_id=guardian_discord_id)
+        guardian = request_guardian(request)
     except Guardian.DoesNotExist:
         messages.error(request, 'Perfil de Guardião não encontrado. Faça login novamente.')
         request.session.flush()
@@ -178,7 +127,7 @@ def report_detail(request, report_id):
     has_voted = Vote.objects.filter(report=report, guardian=guardian).exists()
     
     # Obter mensagens da denúncia
-    messages_list = Message.objects.filter(report=report).order_by('timestamp')
+    messages_list = Message.objects.filter(report=report).select_related('blob').order_by('timestamp')
     
     # Obter votos existentes (sem mostrar quem votou)
     votes = Vote.objects.filter(report=report)
@@ -202,24 +151,24 @@ class VoteView(View):
     def post(self, request, report_id):
         guardian_discord_id = request.session.get('guardian_id')
         if not guardian_discord_id:
-            return JsonResponse({'error': 'Não autenticado'}, status=401)
+            return FastJsonResponse({'error': 'Não autenticado'}, status=401)
         
         try:
-            guardian = Guardian.objects.get(discord_id=guardian_discord_id)
+            guardian = request_guardian(request)
         except Guardian.DoesNotExist:
-            return JsonResponse({'error': 'Perfil de Guardião não encontrado'}, status=404)
+            return FastJsonResponse({'error': 'Perfil de Guardião não encontrado'}, status=404)
         report = get_object_or_404(Report, id=report_id)
         
         # Verificar se já votou
         if Vote.objects.filter(report=report, guardian=guardian).exists():
-            return JsonResponse({'error': 'Você já votou nesta denúncia'}, status=400)
+            return FastJsonResponse({'error': 'Você já votou nesta denúncia'}, status=400)
         
         try:
             data = json.loads(request.body)
             vote_type = data.get('vote_type')
             
             if vote_type not in ['improcedente', 'intimidou', 'grave']:
-                return JsonResponse({'error': 'Tipo de voto inválido'}, status=400)
+                return FastJsonResponse({'error': 'Tipo de voto inválido'}, status=400)
             
             # Criar voto
             Vote.objects.create(
@@ -249,10 +198,10 @@ class VoteView(View):
                 # Aqui seria enviada uma requisição para o bot aplicar a punição
                 # TODO: Implementar integração com bot
             
-            return JsonResponse({'success': True, 'message': 'Voto registrado com sucesso'})
+            return FastJsonResponse({'success': True, 'message': 'Voto registrado com sucesso'})
             
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=500)
+            return FastJsonResponse({'error': str(e)}, status=500)
 
 
 @method_decorator(csrf_exempt, name='dispatch')
@@ -266,14 +215,14 @@ class StatusToggleView(View):
         guardian_discord_id = request.session.get('guardian_id')
         if not guardian_discord_id:
             print("❌ Não autenticado")
-            return JsonResponse({'error': 'Não autenticado'}, status=401)
+            return FastJsonResponse({'error': 'Não autenticado'}, status=401)
         
         try:
-            guardian = Guardian.objects.get(discord_id=guardian_discord_id)
+            guardian = request_guardian(request)
             print(f"✅ Guardião encontrado: {guardian.discord_display_name} (ID: {guardian.discord_id})")
         except Guardian.DoesNotExist:
             print("❌ Perfil de Guardião não encontrado")
-            return JsonResponse({'error': 'Perfil de Guardião não encontrado'}, status=404)
+            return FastJsonResponse({'error': 'Perfil de Guardião não encontrado'}, status=404)
         
         try:
             data = json.loads(request.body)
@@ -282,14 +231,17 @@ class StatusToggleView(View):
             
             if new_status not in ['online', 'offline']:
                 print("❌ Status inválido")
-                return JsonResponse({'error': 'Status inválido'}, status=400)
+                return FastJsonResponse({'error': 'Status inválido'}, status=400)
             
             old_status = guardian.status
             guardian.status = new_status
-            guardian.save()
+            # Entrar em serviço conta como atividade (core/duty.py)
+            guardian.last_activity = timezone.now()
+            guardian.save(update_fields=['status', 'last_activity', 'updated_at'])
+            record_status_change(guardian.id, new_status)
             print(f"✅ Status alterado de {old_status} para {new_status}")
             
-            return JsonResponse({
+            return FastJsonResponse({
                 'success': True,
                 'status': guardian.status,
                 'status_display': guardian.get_status_display()
@@ -297,7 +249,7 @@ class StatusToggleView(View):
             
         except Exception as e:
             print(f"❌ Erro: {e}")
-            return JsonResponse({'error': str(e)}, status=500)
+            return FastJsonResponse({'error': str(e)}, status=500)
 
 
 # ===== SISTEMA DE TREINAMENTO =====
@@ -311,7 +263,7 @@ def training_start(request):
         return redirect('discord_login')
     
     try:
-        guardian = Guardian.objects.get(discord_id=guardian_discord_id)
+        guardian = request_guardian(request)
     except Guardian.DoesNotExist:
         messages.error(request, 'Usuário não encontrado.')
         return redirect('discord_login')
@@ -327,11 +279,13 @@ def training_start(request):
         return redirect('dashboard')
     
     # Obter seções de treinamento
-    sections = TrainingSection.objects.filter(is_active=True).order_by('order')
+    catalog = get_catalog()
     
     context = {
         'guardian': guardian,
-        'sections': sections,
+        'sections': catalog.sections,
+        'catalog_key': catalog.fingerprint,
+        'fragment_timeout': settings.TRAINING_FRAGMENT_CACHE_TIMEOUT,
     }
     
     return render(request, 'core/training_start.html', context)
@@ -346,7 +300,7 @@ def training_section(request, section_id):
         return redirect('discord_login')
     
     try:
-        guardian = Guardian.objects.get(discord_id=guardian_discord_id)
+        guardian = request_guardian(request)
     except Guardian.DoesNotExist:
         messages.error(request, 'Usuário não encontrado.')
         return redirect('discord_login')
@@ -361,9 +315,9 @@ def training_section(request, section_id):
         messages.info(request, 'Você já é um Guardião!')
         return redirect('dashboard')
     
-    try:
-        section = TrainingSection.objects.get(id=section_id, is_active=True)
-    except TrainingSection.DoesNotExist:
+    catalog = get_catalog()
+    section = catalog.section(section_id)
+    if section is None:
         messages.error(request, 'Seção de treinamento não encontrada.')
         return redirect('training_start')
     
@@ -374,14 +328,17 @@ def training_section(request, section_id):
         defaults={'status': 'in_progress', 'started_at': timezone.now()}
     )
     
-    # Obter exercícios da seção
-    exercises = TrainingExercise.objects.filter(section=section, is_active=True).order_by('order')
+    # Exercícios ainda sem resposta (formulário de envio em lote)
+    answered = set(TrainingAnswer.objects.filter(progress=progress).values_list('exercise_id', flat=True))
     
     context = {
         'guardian': guardian,
         'section': section,
         'progress': progress,
-        'exercises': exercises,
+        'exercises': catalog.exercises(section),
+        'pending_exercises': [exercise for exercise in catalog.exercises(section) if exercise.id not in answered],
+        'catalog_key': catalog.fingerprint,
+        'fragment_timeout': settings.TRAINING_FRAGMENT_CACHE_TIMEOUT,
     }
     
     return render(request, 'core/training_section.html', context)
@@ -396,7 +353,7 @@ def training_exercise(request, exercise_id):
         return redirect('discord_login')
     
     try:
-        guardian = Guardian.objects.get(discord_id=guardian_discord_id)
+        guardian = request_guardian(request)
     except Guardian.DoesNotExist:
         messages.error(request, 'Usuário não encontrado.')
         return redirect('discord_login')
@@ -411,9 +368,9 @@ def training_exercise(request, exercise_id):
         messages.info(request, 'Você já é um Guardião!')
         return redirect('dashboard')
     
-    try:
-        exercise = TrainingExercise.objects.get(id=exercise_id, is_active=True)
-    except TrainingExercise.DoesNotExist:
+    catalog = get_catalog()
+    exercise = catalog.exercise(exercise_id)
+    if exercise is None:
         messages.error(request, 'Exercício não encontrado.')
         return redirect('training_start')
     
@@ -449,7 +406,7 @@ def training_answer(request, exercise_id):
         return redirect('discord_login')
     
     try:
-        guardian = Guardian.objects.get(discord_id=guardian_discord_id)
+        guardian = request_guardian(request)
     except Guardian.DoesNotExist:
         messages.error(request, 'Usuário não encontrado.')
         return redirect('discord_login')
@@ -464,9 +421,9 @@ def training_answer(request, exercise_id):
         messages.info(request, 'Você já é um Guardião!')
         return redirect('dashboard')
     
-    try:
-        exercise = TrainingExercise.objects.get(id=exercise_id, is_active=True)
-    except TrainingExercise.DoesNotExist:
+    catalog = get_catalog()
+    exercise = catalog.exercise(exercise_id)
+    if exercise is None:
         messages.error(request, 'Exercício não encontrado.')
         return redirect('training_start')
     
@@ -506,7 +463,7 @@ def training_answer(request, exercise_id):
         progress.exercises_correct += 1
     
     # Verificar se completou todos os exercícios da seção
-    total_exercises = TrainingExercise.objects.filter(section=exercise.section, is_active=True).count()
+    total_exercises = catalog.exercise_count(exercise.section)
     if progress.exercises_completed >= total_exercises:
         progress.status = 'completed'
         progress.completed_at = timezone.now()
@@ -515,56 +472,135 @@ def training_answer(request, exercise_id):
     
     # Redirecionar para próxima seção ou prova final
     if progress.status == 'completed':
-        if exercise.section.section_type == 'prova_final':
-            # Verificar se passou na prova (máximo 1 erro)
-            if progress.exercises_correct >= (total_exercises - 1):
-                # APROVADO! Tornar-se Guardião
-                guardian.role = 'guardian'
-                guardian.save()
-                messages.success(request, '🎉 Parabéns! Você foi aprovado e agora é um Guardião!')
-                return redirect('dashboard')
-            else:
-                # REPROVADO
-                progress.status = 'failed'
-                progress.save()
-                messages.error(request, 'Você não atingiu a pontuação necessária. Tente novamente após 24 horas.')
-                return redirect('training_start')
+        return _finish_training_section(request, guardian, progress, exercise.section, catalog)
+    
+    # Exercício respondido, continuar na seção
+    messages.success(request, f'Resposta {"correta" if is_correct else "incorreta"}! {exercise.explanation}')
+    return redirect('training_exercise', exercise_id=exercise_id)
+
+
+def training_submit(request, section_id):
+    """Processar as respostas de todos os exercícios de uma seção de uma vez"""
+    if request.method != 'POST':
+        return redirect('training_section', section_id=section_id)
+    
+    guardian_discord_id = request.session.get('guardian_id')
+    
+    if not guardian_discord_id:
+        messages.error(request, 'Você precisa fazer login para acessar esta página.')
+        return redirect('discord_login')
+    
+    try:
+        guardian = request_guardian(request)
+    except Guardian.DoesNotExist:
+        messages.error(request, 'Usuário não encontrado.')
+        return redirect('discord_login')
+    
+    # Verificar se é elegível
+    if not guardian.is_eligible_for_guardian:
+        messages.error(request, 'Sua conta precisa ter pelo menos 3 meses para se tornar um Guardião.')
+        return redirect('dashboard')
+    
+    # Verificar se já é Guardião
+    if guardian.is_guardian:
+        messages.info(request, 'Você já é um Guardião!')
+        return redirect('dashboard')
+    
+    catalog = get_catalog()
+    section = catalog.section(section_id)
+    if section is None:
+        messages.error(request, 'Seção de treinamento não encontrada.')
+        return redirect('training_start')
+    
+    with transaction.atomic():
+        # Trava o progresso: envios simultâneos não duplicam respostas nem contagens
+        try:
+            progress = TrainingProgress.objects.select_for_update().get(guardian=guardian, section=section)
+        except TrainingProgress.DoesNotExist:
+            messages.error(request, 'Progresso não encontrado.')
+            return redirect('training_start')
+        
+        if progress.status != 'in_progress':
+            messages.info(request, 'Esta seção já foi concluída.')
+            return redirect('training_section', section_id=section_id)
+        
+        answered = set(TrainingAnswer.objects.filter(progress=progress).values_list('exercise_id', flat=True))
+        pending = [exercise for exercise in catalog.exercises(section) if exercise.id not in answered]
+        
+        # Todas as respostas pendentes precisam ser válidas
+        selected = {exercise.id: request.POST.get(f'answer_{exercise.id}') for exercise in pending}
+        if not pending or any(answer not in ('a', 'b', 'c') for answer in selected.values()):
+            messages.error(request, 'Responda todos os exercícios antes de enviar.')
+            return redirect('training_section', section_id=section_id)
+        
+        answers = [
+            TrainingAnswer(
+                progress=progress,
+                exercise=exercise,
+                selected_answer=selected[exercise.id],
+                is_correct=selected[exercise.id] == exercise.correct_answer,
+            )
+            for exercise in pending
+        ]
+        TrainingAnswer.objects.bulk_create(answers)
+        
+        progress.exercises_completed += len(answers)
+        progress.exercises_correct += sum(1 for answer in answers if answer.is_correct)
+        if progress.exercises_completed >= catalog.exercise_count(section):
+            progress.status = 'completed'
+            progress.completed_at = timezone.now()
+        progress.save()
+        
+        if progress.status == 'completed':
+            return _finish_training_section(request, guardian, progress, section, catalog)
+    
+    messages.success(request, f'{len(answers)} respostas registradas.')
+    return redirect('training_section', section_id=section_id)
+
+
+def _finish_training_section(request, guardian, progress, section, catalog):
+    """Resultado de uma seção concluída: aprovação na prova final ou próxima seção"""
+    total_exercises = catalog.exercise_count(section)
+    if section.section_type == 'prova_final':
+        # Verificar se passou na prova (máximo 1 erro)
+        if progress.exercises_correct >= (total_exercises - 1):
+            # APROVADO! Tornar-se Guardião
+            guardian.role = 'guardian'
+            guardian.save(update_fields=['role', 'updated_at'])
+            messages.success(request, '🎉 Parabéns! Você foi aprovado e agora é um Guardião!')
+            return redirect('dashboard')
         else:
-            # Seção concluída, ir para próxima
-            next_section = TrainingSection.objects.filter(
-                is_active=True, 
-                order__gt=exercise.section.order
-            ).order_by('order').first()
-            
-            if next_section:
-                messages.success(request, f'Seção "{exercise.section.title}" concluída!')
-                return redirect('training_section', section_id=next_section.id)
-            else:
-                # Ir para prova final
-                final_section = TrainingSection.objects.filter(
-                    section_type='prova_final', 
-                    is_active=True
-                ).first()
-                if final_section:
-                    messages.success(request, 'Todas as seções concluídas! Agora é hora da prova final.')
-                    return redirect('training_section', section_id=final_section.id)
-                else:
-                    messages.error(request, 'Prova final não encontrada.')
-                    return redirect('training_start')
+            # REPROVADO
+            progress.status = 'failed'
+            progress.save()
+            messages.error(request, 'Você não atingiu a pontuação necessária. Tente novamente após 24 horas.')
+            return redirect('training_start')
+    
+    # Seção concluída, ir para próxima
+    next_section = catalog.next_section(section)
+    
+    if next_section:
+        messages.success(request, f'Seção "{section.title}" concluída!')
+        return redirect('training_section', section_id=next_section.id)
     else:
-        # Exercício respondido, continuar na seção
-        messages.success(request, f'Resposta {"correta" if is_correct else "incorreta"}! {exercise.explanation}')
-        return redirect('training_exercise', exercise_id=exercise_id)
+        # Ir para prova final
+        final_section = catalog.final_section()
+        if final_section:
+            messages.success(request, 'Todas as seções concluídas! Agora é hora da prova final.')
+            return redirect('training_section', section_id=final_section.id)
+        else:
+            messages.error(request, 'Prova final não encontrada.')
+            return redirect('training_start')
 
 
 def reports_list(request):
     """Lista de denúncias"""
-    reports = Report.objects.all().order_by('-created_at')
-    
-    # Paginação
-    paginator = Paginator(reports, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Paginação por cursor: qualquer página custa o mesmo que a primeira
+    paginator = KeysetPaginator(Report.objects.all(), REPORTS_ORDER, 20)
+    try:
+        page_obj = paginator.page(request.GET.get('cursor'), with_estimate=True)
+    except InvalidCursor:
+        page_obj = paginator.page(with_estimate=True)
     
     context = {
         'page_obj': page_obj,
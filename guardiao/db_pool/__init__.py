@@ -0,0 +1,56 @@
+"""
+Backend PostgreSQL com pool de conexões em processo
+
+Ative com DB_POOL=true. O tamanho do pool depende do papel do processo
+(PROCESS_ROLE=web ou bot), configurado em DATABASES['default']['POOL'].
+"""
+import os
+import threading
+from django.conf import settings
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, factory, options):
+    """Pool do alias no processo atual (recriado após fork)"""
+    from .pool import ConnectionPool
+
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None or pool.pid != os.getpid():
+            # Conexões herdadas do processo pai não podem ser reutilizadas
+            pool = ConnectionPool(
+                factory,
+                max_size=options.get('MAX_SIZE', 10),
+                timeout=options.get('TIMEOUT', 10.0),
+                check_idle_after=options.get('CHECK_IDLE_AFTER', 30.0),
+                max_idle_seconds=options.get('MAX_IDLE_SECONDS', 300.0),
+            )
+            _pools[alias] = pool
+        return pool
+
+
+def get_existing_pool(alias):
+    """Pool do alias criado neste processo, se houver"""
+    pool = _pools.get(alias)
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    return None
+
+
+def pool_stats():
+    """Métricas de conexão do processo atual, por alias"""
+    stats = {}
+    for alias, db in settings.DATABASES.items():
+        pool = get_existing_pool(alias)
+        if pool is not None:
+            stats[alias] = {'pooled': True, **pool.snapshot()}
+        else:
+            stats[alias] = {
+                'pooled': False,
+                'engine': db['ENGINE'],
+                'conn_max_age': db.get('CONN_MAX_AGE', 0),
+                'conn_health_checks': db.get('CONN_HEALTH_CHECKS', False),
+            }
+    return stats
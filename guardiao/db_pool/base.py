@@ -0,0 +1,32 @@
+"""
+DatabaseWrapper do PostgreSQL que retira e devolve conexões ao pool
+"""
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresDatabaseWrapper
+from . import get_existing_pool, get_pool
+from .pool import PoolTimeout
+
+
+class DatabaseWrapper(PostgresDatabaseWrapper):
+    """Igual ao backend do PostgreSQL, mas fechar a conexão a devolve ao pool"""
+
+    def _get_pool(self, conn_params):
+        return get_pool(
+            self.alias,
+            lambda: super(DatabaseWrapper, self).get_new_connection(conn_params),
+            self.settings_dict.get('POOL', {}),
+        )
+
+    def get_new_connection(self, conn_params):
+        try:
+            return self._get_pool(conn_params).getconn()
+        except PoolTimeout as e:
+            raise self.Database.OperationalError(str(e)) from e
+
+    def _close(self):
+        pool = get_existing_pool(self.alias)
+        if pool is None:
+            # Conexão herdada de outro processo: fecha normalmente
+            return super()._close()
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                return pool.putconn(self.connection)
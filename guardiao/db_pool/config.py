@@ -0,0 +1,36 @@
+"""
+Configuração das conexões PostgreSQL aplicada pelas settings
+
+Sem DB_POOL, as conexões são persistentes (DB_CONN_MAX_AGE) com verificação
+de saúde. Com DB_POOL=true, o banco usa este backend com um pool dimensionado
+pelo papel do processo (PROCESS_ROLE=web ou bot).
+"""
+import os
+
+# Tamanho padrão do pool por papel do processo: cada worker web usa no máximo
+# uma conexão por thread; o bot usa uma por thread do pool de banco
+DEFAULT_POOL_SIZES = {
+    'web': int(os.getenv('WEB_THREADS', '4')) + 1,
+    'bot': int(os.getenv('BOT_DB_THREADS', '8')),
+}
+
+
+def connection_settings():
+    """Conexões persistentes com verificação de saúde, ou pool em processo"""
+    if os.getenv('DB_POOL', 'False').lower() == 'true':
+        role = os.getenv('PROCESS_ROLE', 'web')
+        return {
+            "ENGINE": "guardiao.db_pool",
+            # Com pool, o fim do request devolve a conexão ao pool
+            "CONN_MAX_AGE": 0,
+            "POOL": {
+                'MAX_SIZE': int(os.getenv(f'DB_POOL_SIZE_{role.upper()}', DEFAULT_POOL_SIZES.get(role, 5))),
+                'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+                'CHECK_IDLE_AFTER': float(os.getenv('DB_POOL_CHECK_IDLE_AFTER', '30')),
+                'MAX_IDLE_SECONDS': float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+            },
+        }
+    return {
+        "CONN_MAX_AGE": int(os.getenv('DB_CONN_MAX_AGE', '600')),
+        "CONN_HEALTH_CHECKS": True,
+    }
@@ -0,0 +1,153 @@
+"""
+Pool de conexões em processo, limitado e com métricas
+
+Usado pelo backend guardiao.db_pool: as conexões devolvidas pelo Django
+(fim de request, close_old_connections) voltam para o pool em vez de serem
+fechadas, e a próxima thread que precisar de conexão reaproveita uma já
+aberta. O tamanho máximo limita as conexões do processo no PostgreSQL.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """Nenhuma conexão liberada dentro do tempo de espera"""
+
+
+class ConnectionPool:
+    """Pool limitado de conexões DB-API com verificação de saúde"""
+
+    def __init__(self, factory, max_size=10, timeout=10.0, check_idle_after=30.0, max_idle_seconds=300.0):
+        self.factory = factory
+        self.max_size = max_size
+        self.timeout = timeout
+        # Conexões ociosas há mais tempo que isso são testadas antes do uso
+        self.check_idle_after = check_idle_after
+        # Conexões ociosas há mais tempo que isso são fechadas
+        self.max_idle_seconds = max_idle_seconds
+        self.pid = os.getpid()
+
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle = deque()  # (conexão, devolvida em)
+
+        self.stats = {
+            'checkouts': 0,
+            'created': 0,
+            'reused': 0,
+            'discarded': 0,
+            'waits': 0,
+            'wait_seconds_total': 0.0,
+            'wait_seconds_max': 0.0,
+            'timeouts': 0,
+            'in_use': 0,
+        }
+
+    def getconn(self):
+        """Retira uma conexão do pool (ou cria uma nova, até max_size)"""
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self.stats['timeouts'] += 1
+            raise PoolTimeout(f'Nenhuma conexão disponível em {self.timeout}s (máximo {self.max_size})')
+        waited = time.monotonic() - started
+
+        try:
+            conn = self._take_idle()
+            created = conn is None
+            if created:
+                conn = self.factory()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self.stats['checkouts'] += 1
+            self.stats['in_use'] += 1
+            self.stats['created' if created else 'reused'] += 1
+            if waited > 0.001:
+                self.stats['waits'] += 1
+                self.stats['wait_seconds_total'] += waited
+                self.stats['wait_seconds_max'] = max(self.stats['wait_seconds_max'], waited)
+        return conn
+
+    def _take_idle(self):
+        """Conexão ociosa saudável mais recente, descartando as quebradas"""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                conn, returned_at = self._idle.pop()
+
+            idle_for = time.monotonic() - returned_at
+            if conn.closed or idle_for > self.max_idle_seconds:
+                self._discard(conn)
+                continue
+            if idle_for > self.check_idle_after and not self._ping(conn):
+                self._discard(conn)
+                continue
+            return conn
+
+    def putconn(self, conn):
+        """Devolve uma conexão ao pool"""
+        try:
+            if conn.closed or not self._reset(conn):
+                self._discard(conn)
+            else:
+                with self._lock:
+                    self._idle.append((conn, time.monotonic()))
+        finally:
+            with self._lock:
+                self.stats['in_use'] -= 1
+            self._slots.release()
+
+    def _reset(self, conn):
+        """Desfaz transação pendente; False se a conexão não puder ser reaproveitada"""
+        try:
+            if conn.get_transaction_status() != 0:  # TRANSACTION_STATUS_IDLE
+                conn.rollback()
+            return conn.get_transaction_status() == 0
+        except Exception:
+            return False
+
+    def _ping(self, conn):
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if not conn.autocommit:
+                conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        with self._lock:
+            self.stats['discarded'] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def closeall(self):
+        """Fecha todas as conexões ociosas"""
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn, _ in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def snapshot(self):
+        """Métricas atuais do pool"""
+        with self._lock:
+            data = dict(self.stats)
+            data['idle'] = len(self._idle)
+        data['max_size'] = self.max_size
+        data['wait_seconds_avg'] = (
+            data['wait_seconds_total'] / data['waits'] if data['waits'] else 0.0
+        )
+        return data
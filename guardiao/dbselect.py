@@ -0,0 +1,126 @@
+"""
+Seleção rápida do banco de dados na importação das settings
+
+A escolha entre PostgreSQL e SQLite é feita por configuração explícita
+(DB_ENGINE) ou, no modo automático, por uma única sonda TCP com timeout
+curto. Uma sonda bem-sucedida pode ser guardada em um arquivo com validade
+(DB_SELECT_CACHE_TTL), evitando repetir a sonda a cada comando. Falhas nunca
+são guardadas: se o PostgreSQL estiver fora do ar por alguns segundos, o
+próximo processo testa de novo em vez de também cair no SQLite. O
+diagnóstico completo de rede fica no comando opt-in `manage.py db_diagnose`.
+"""
+import json
+import os
+import socket
+import time
+
+DEFAULT_HOST = 'postgresql'  # Hostname da VLAN da Discloud
+DEFAULT_PORT = '5432'
+
+# Hosts alternativos testados apenas pelo diagnóstico
+ALTERNATIVE_HOSTS = [
+    'postgresql.discloud.app',
+    'postgresql.discloud.com',
+    'postgresql',
+    'localhost',
+    '127.0.0.1',
+]
+
+# Resultado da última seleção, exibido pelo db_diagnose
+selection = {}
+
+
+def postgresql_config():
+    """Configuração do PostgreSQL a partir das variáveis de ambiente"""
+    return {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.getenv('DB_NAME', 'guardiaodatabase'),
+        "USER": os.getenv('DB_USER', 'guardiao'),
+        "PASSWORD": os.getenv('DB_PASSWORD', 'PasswordGuardiaoAdmin2025!'),
+        "HOST": os.getenv('DB_HOST', DEFAULT_HOST),
+        "PORT": os.getenv('DB_PORT', DEFAULT_PORT),
+        "OPTIONS": {
+            'connect_timeout': 5,
+        },
+    }
+
+
+def sqlite_config(base_dir):
+    """Configuração do SQLite local"""
+    return {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": base_dir / "db.sqlite3",
+    }
+
+
+def probe(host, port, timeout):
+    """Uma única tentativa de conexão TCP"""
+    try:
+        with socket.create_connection((host, int(port)), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def _read_cache(path, key, ttl):
+    try:
+        with open(path, 'r') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if cached.get('key') != key or time.time() - cached.get('checked_at', 0) > ttl:
+        return None
+    return cached.get('reachable')
+
+
+def _write_cache(path, key, reachable):
+    tmp_path = f'{path}.tmp'
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump({'key': key, 'reachable': reachable, 'checked_at': time.time()}, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def select_database(base_dir):
+    """
+    Retorna a configuração do banco padrão.
+
+    DB_ENGINE=postgresql ou sqlite força a escolha sem nenhuma sonda;
+    DB_ENGINE=auto (padrão) testa o PostgreSQL uma vez.
+    """
+    engine = os.getenv('DB_ENGINE', 'auto').lower()
+    host = os.getenv('DB_HOST', DEFAULT_HOST)
+    port = os.getenv('DB_PORT', DEFAULT_PORT)
+
+    if engine in ('postgresql', 'postgres'):
+        selection.update(engine='postgresql', reason='DB_ENGINE')
+        return postgresql_config()
+    if engine == 'sqlite':
+        selection.update(engine='sqlite', reason='DB_ENGINE')
+        return sqlite_config(base_dir)
+
+    ttl = float(os.getenv('DB_SELECT_CACHE_TTL', '300'))
+    cache_path = os.getenv('DB_SELECT_CACHE', str(base_dir / '.db_select.json'))
+    key = f'{host}:{port}'
+
+    reachable = _read_cache(cache_path, key, ttl) if ttl > 0 else None
+    if reachable:
+        reason = 'cache'
+    else:
+        started = time.perf_counter()
+        reachable = probe(host, port, float(os.getenv('DB_PROBE_TIMEOUT', '0.5')))
+        reason = f'sonda ({(time.perf_counter() - started) * 1000:.0f} ms)'
+        # Só o sucesso é guardado (uma falha deixaria processos no SQLite por todo o TTL)
+        if ttl > 0 and reachable:
+            _write_cache(cache_path, key, reachable)
+
+    if reachable:
+        selection.update(engine='postgresql', reason=reason, host=key)
+        return postgresql_config()
+
+    selection.update(engine='sqlite', reason=reason, host=key)
+    print(f"🔄 PostgreSQL ({key}) indisponível, usando SQLite")
+    return sqlite_config(base_dir)
@@ -0,0 +1,42 @@
+"""
+Configuração do Gunicorn para o modo de produção do start_server.py
+
+Todos os valores podem ser ajustados por variáveis de ambiente.
+Recarregamento sem queda: envie SIGHUP ao start_server.py (repassado ao
+processo mestre do Gunicorn), que troca os workers de forma gradual. Cada
+worker novo importa o código do disco, por isso o preload fica desligado por
+padrão: com WEB_PRELOAD=True os workers são clonados do mestre, que já tem o
+código antigo carregado, e um deploy de código exige reinício completo.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+
+# Workers pré-forkados com threads (I/O do Discord e do banco liberam o GIL)
+workers = int(os.getenv('WEB_WORKERS', max(2, min(4, multiprocessing.cpu_count()))))
+threads = int(os.getenv('WEB_THREADS', '4'))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+# Carregar o Django uma vez no mestre economiza memória e acelera o boot dos
+# workers, mas o SIGHUP deixa de recarregar o código (veja acima)
+preload_app = os.getenv('WEB_PRELOAD', 'False').lower() == 'true'
+
+timeout = int(os.getenv('WEB_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('WEB_KEEPALIVE', '5'))
+
+# Recicla workers periodicamente para conter vazamentos de memória
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.getenv('WEB_MAX_REQUESTS_JITTER', '200'))
+
+accesslog = os.getenv('WEB_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('WEB_LOG_LEVEL', 'info')
+proc_name = 'guardiao-web'
+
+
+def post_fork(server, worker):
+    """Cada worker abre as próprias conexões com o banco"""
+    from django.db import connections
+    connections.close_all()
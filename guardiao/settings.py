@@ -40,13 +40,14 @@ CSRF_TRUSTED_ORIGINS = [
     'http://127.0.0.1:8080',
 ]
 
-# Debug Django configuration
-print("=== DJANGO CONFIGURATION DEBUG ===")
-print(f"SECRET_KEY: {'SET' if os.getenv('SECRET_KEY') else 'NOT SET'}")
-print(f"DEBUG: {DEBUG}")
-print(f"ALLOWED_HOSTS: {ALLOWED_HOSTS}")
-print(f"CSRF_TRUSTED_ORIGINS: {CSRF_TRUSTED_ORIGINS}")
-print("===================================")
+# Debug Django configuration (opt-in)
+if os.getenv('SETTINGS_DEBUG', 'False').lower() == 'true':
+    print("=== DJANGO CONFIGURATION DEBUG ===")
+    print(f"SECRET_KEY: {'SET' if os.getenv('SECRET_KEY') else 'NOT SET'}")
+    print(f"DEBUG: {DEBUG}")
+    print(f"ALLOWED_HOSTS: {ALLOWED_HOSTS}")
+    print(f"CSRF_TRUSTED_ORIGINS: {CSRF_TRUSTED_ORIGINS}")
+    print("===================================")
 
 
 # Application definition
@@ -68,10 +69,12 @@ MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "core.compression.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.identity.GuardianIdentityMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -99,165 +102,22 @@ WSGI_APPLICATION = "guardiao.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-# Debug database configuration
-print("=== DATABASE CONFIGURATION DEBUG ===")
-print(f"DB_NAME: {os.getenv('DB_NAME', 'guardiaodatabase')}")
-print(f"DB_USER: {os.getenv('DB_USER', 'guardiao')}")
-print(f"DB_PASSWORD: {'*' * len(os.getenv('DB_PASSWORD', 'PasswordGuardiaoAdmin2025!'))}")
-print(f"DB_HOST: {os.getenv('DB_HOST', 'postgresql')}")
-print(f"DB_PORT: {os.getenv('DB_PORT', '5432')}")
-print("=====================================")
-
-# Try to connect to PostgreSQL with retry mechanism
-import time
-import socket
-
-def test_postgresql_connection(max_retries=3, delay=1):
-    """Test PostgreSQL connection with retry mechanism"""
-    for attempt in range(max_retries):
-        try:
-            print(f"🔄 Attempting PostgreSQL connection (attempt {attempt + 1}/{max_retries})...")
-            
-            # First test if host is reachable
-            host = os.getenv('DB_HOST', 'postgresql')  # Use postgresql for Discloud VLAN
-            port = int(os.getenv('DB_PORT', '5432'))
-            
-            # Try alternative hostnames/IPs for Discloud VLAN
-            alternative_hosts = [
-                host,  # Original hostname (postgresql)
-                'postgresql.discloud.app',  # Alternative hostname
-                'postgresql.discloud.com',  # Another alternative
-                'postgresql',  # Direct hostname
-                'localhost',  # Local connection
-                '127.0.0.1',  # Local IP
-            ]
-            
-            # Debug: Check if PostgreSQL process is running
-            print("🔍 Checking PostgreSQL process...")
-            import subprocess
-            try:
-                result = subprocess.run(['ps', 'aux'], capture_output=True, text=True, timeout=5)
-                if 'postgres' in result.stdout.lower():
-                    print("✅ PostgreSQL process found!")
-                else:
-                    print("❌ PostgreSQL process not found")
-            except Exception as e:
-                print(f"❌ Error checking processes: {e}")
-            
-            # Debug: Check network interfaces
-            print("🔍 Checking network interfaces...")
-            try:
-                result = subprocess.run(['ip', 'addr'], capture_output=True, text=True, timeout=5)
-                print("Network interfaces:")
-                for line in result.stdout.split('\n'):
-                    if 'inet' in line and '127.0.0.1' not in line:
-                        print(f"  {line.strip()}")
-            except Exception as e:
-                print(f"❌ Error checking network: {e}")
-            
-            # Debug: Try to resolve hostname
-            print("🔍 Trying to resolve hostname 'postgresql'...")
-            try:
-                import socket
-                ip = socket.gethostbyname('postgresql')
-                print(f"✅ Hostname 'postgresql' resolves to: {ip}")
-            except Exception as e:
-                print(f"❌ Cannot resolve 'postgresql': {e}")
-            
-            # Debug: Check /etc/hosts
-            print("🔍 Checking /etc/hosts...")
-            try:
-                with open('/etc/hosts', 'r') as f:
-                    hosts_content = f.read()
-                    if 'postgresql' in hosts_content:
-                        print("✅ Found 'postgresql' in /etc/hosts:")
-                        for line in hosts_content.split('\n'):
-                            if 'postgresql' in line:
-                                print(f"  {line.strip()}")
-                    else:
-                        print("❌ 'postgresql' not found in /etc/hosts")
-            except Exception as e:
-                print(f"❌ Error reading /etc/hosts: {e}")
-            
-            # Test each alternative host
-            working_host = None
-            for test_host in alternative_hosts:
-                try:
-                    print(f"🔍 Testing host: {test_host}:{port}")
-                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                    sock.settimeout(2)  # Reduced timeout
-                    result = sock.connect_ex((test_host, port))
-                    sock.close()
-                    
-                    if result == 0:
-                        print(f"✅ Host {test_host}:{port} is reachable!")
-                        working_host = test_host
-                        break
-                    else:
-                        print(f"❌ Host {test_host}:{port} not reachable")
-                except Exception as e:
-                    print(f"❌ Error testing {test_host}:{port}: {e}")
-            
-            if not working_host:
-                print(f"❌ No PostgreSQL hosts reachable (attempt {attempt + 1})")
-                if attempt < max_retries - 1:
-                    print(f"⏳ Waiting {delay} seconds before retry...")
-                    time.sleep(delay)
-                    continue
-                else:
-                    return False
-            
-            # Test PostgreSQL connection with working host
-            import psycopg2
-            conn = psycopg2.connect(
-                host=working_host,
-                port=port,
-                user=os.getenv('DB_USER', 'guardiao'),
-                password=os.getenv('DB_PASSWORD', 'PasswordGuardiaoAdmin2025!'),
-                database=os.getenv('DB_NAME', 'guardiaodatabase'),
-                connect_timeout=5  # Reduced timeout
-            )
-            conn.close()
-            print(f"✅ PostgreSQL connection successful with host: {working_host}")
-            
-            # Update the working host for Django
-            os.environ['DB_HOST'] = working_host
-            return True
-            
-        except Exception as e:
-            print(f"❌ PostgreSQL connection failed (attempt {attempt + 1}): {e}")
-            if attempt < max_retries - 1:
-                print(f"⏳ Waiting {delay} seconds before retry...")
-                time.sleep(delay)
-            else:
-                return False
-    
-    return False
-
-# Test PostgreSQL connection
-if test_postgresql_connection():
-    print("🎯 Using PostgreSQL database")
-    DATABASES = {
-        "default": {
-            "ENGINE": "django.db.backends.postgresql",
-            "NAME": os.getenv('DB_NAME', 'guardiaodatabase'),
-            "USER": os.getenv('DB_USER', 'guardiao'),
-            "PASSWORD": os.getenv('DB_PASSWORD', 'PasswordGuardiaoAdmin2025!'),
-            "HOST": os.getenv('DB_HOST', 'postgresql'),
-            "PORT": os.getenv('DB_PORT', '5432'),
-            "OPTIONS": {
-                'connect_timeout': 5,  # Reduced timeout
-            }
-        }
-    }
-else:
-    print("🔄 PostgreSQL not available, falling back to SQLite...")
-    DATABASES = {
-        "default": {
-            "ENGINE": "django.db.backends.sqlite3",
-            "NAME": BASE_DIR / "db.sqlite3",
-        }
-    }
+# Database selection (guardiao/dbselect.py)
+# DB_ENGINE=postgresql|sqlite skips probing; DB_ENGINE=auto (default) probes
+# DB_HOST:DB_PORT once and caches a successful probe for DB_SELECT_CACHE_TTL
+# seconds (failures are never cached).
+# Network diagnostics: "manage.py db_diagnose".
+# PostgreSQL connections are persistent (DB_CONN_MAX_AGE, with health checks).
+# DB_POOL=true switches to the guardiao.db_pool backend, sized per PROCESS_ROLE
+# (web/bot); see guardiao/db_pool/config.py.
+from guardiao.dbselect import select_database
+from guardiao.db_pool.config import connection_settings
+
+DATABASES = {
+    "default": select_database(BASE_DIR),
+}
+if DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    DATABASES["default"].update(connection_settings())
 
 
 # Password validation
@@ -312,7 +172,12 @@ MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
 # WhiteNoise configuration
-STATICFILES_STORAGE = 'whitenoise.storage.StaticFilesStorage'
+# collectstatic minifies JS/CSS (when rjsmin/rcssmin are installed), adds
+# content hashes to the file names and writes .gz/.br variants; WhiteNoise
+# serves the hashed files with far-future immutable caching
+# (core/storage.py, `manage.py build_static`).
+STATICFILES_STORAGE = 'core.storage.GuardiaoStaticFilesStorage'
+STATIC_MINIFY = os.getenv('STATIC_MINIFY', 'True').lower() == 'true'
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -324,16 +189,36 @@ DISCORD_BOT_TOKEN = os.getenv('DISCORD_BOT_TOKEN')
 DISCORD_CLIENT_ID = os.getenv('DISCORD_CLIENT_ID')
 DISCORD_CLIENT_SECRET = os.getenv('DISCORD_CLIENT_SECRET')
 
+# Discord OAuth HTTP client (core/discord_oauth.py)
+# DISCORD_API_BASE can point to `manage.py oauth_stub` for local testing.
+# Timeouts are (connect, read) seconds per attempt; the token POST is only
+# retried on 429. At most DISCORD_OAUTH_CONCURRENCY callbacks per process wait
+# on Discord at once (default: half of the gunicorn threads, so a login burst
+# always leaves threads free for other pages); callbacks that cannot get a
+# slot within DISCORD_OAUTH_QUEUE_WAIT seconds are told to try again.
+DISCORD_API_BASE = os.getenv('DISCORD_API_BASE', 'https://discord.com/api').rstrip('/')
+DISCORD_HTTP_TIMEOUT = (
+    float(os.getenv('DISCORD_HTTP_CONNECT_TIMEOUT', '3')),
+    float(os.getenv('DISCORD_HTTP_READ_TIMEOUT', '5')),
+)
+DISCORD_HTTP_RETRIES = int(os.getenv('DISCORD_HTTP_RETRIES', '2'))
+DISCORD_HTTP_POOL_SIZE = int(os.getenv('DISCORD_HTTP_POOL_SIZE', '10'))
+DISCORD_OAUTH_CONCURRENCY = int(os.getenv(
+    'DISCORD_OAUTH_CONCURRENCY', str(max(1, int(os.getenv('WEB_THREADS', '4')) // 2))
+))
+DISCORD_OAUTH_QUEUE_WAIT = float(os.getenv('DISCORD_OAUTH_QUEUE_WAIT', '2'))
+
 # Site Configuration
 SITE_URL = os.getenv('SITE_URL', 'http://localhost:8080')
 
 # Debug Discord configuration
-print("=== DISCORD CONFIGURATION DEBUG ===")
-print(f"DISCORD_BOT_TOKEN: {'SET' if DISCORD_BOT_TOKEN else 'NOT SET'}")
-print(f"DISCORD_CLIENT_ID: {'SET' if DISCORD_CLIENT_ID else 'NOT SET'}")
-print(f"DISCORD_CLIENT_SECRET: {'SET' if DISCORD_CLIENT_SECRET else 'NOT SET'}")
-print(f"SITE_URL: {SITE_URL}")
-print("====================================")
+if os.getenv('SETTINGS_DEBUG', 'False').lower() == 'true':
+    print("=== DISCORD CONFIGURATION DEBUG ===")
+    print(f"DISCORD_BOT_TOKEN: {'SET' if DISCORD_BOT_TOKEN else 'NOT SET'}")
+    print(f"DISCORD_CLIENT_ID: {'SET' if DISCORD_CLIENT_ID else 'NOT SET'}")
+    print(f"DISCORD_CLIENT_SECRET: {'SET' if DISCORD_CLIENT_SECRET else 'NOT SET'}")
+    print(f"SITE_URL: {SITE_URL}")
+    print("====================================")
 
 # CORS Configuration
 CORS_ALLOW_ALL_ORIGINS = True  # Apenas para desenvolvimento
@@ -350,8 +235,141 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'EXCEPTION_HANDLER': 'core.error_handlers.custom_exception_handler',
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# JSON rendering (core/renderers.py)
+# Uses orjson when it is installed; set FAST_JSON=False to force the
+# standard library encoder.
+FAST_JSON = os.getenv('FAST_JSON', 'True').lower() == 'true'
+
+# Response compression (core/compression.py)
+# HTML/JSON responses at least COMPRESSION_MIN_SIZE bytes long are sent with
+# brotli or gzip; pages that carry a CSRF token always use gzip, which gets
+# Django's BREACH padding.
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '5'))
+
+# Cache
+# Throttling state and cached query results must be shared by every worker
+# process, so production should set REDIS_URL (needs the redis package).
+# Without it each process keeps its own in-memory cache (fine for
+# development and single-process runs).
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'guardiao',
+        }
+    }
+
+# Polling endpoints (core/throttling.py)
+# Rate limits: at most "capacity" requests per capacity / refill_per_second
+# seconds (sliding window), per session guardian and per IP. Intervals are
+# the X-Poll-Interval hints (seconds) sent while the queue has work
+# ("active") or is empty ("idle"); they are doubled when the load average
+# per CPU exceeds POLL_OVERLOAD_LOAD.
+POLL_THROTTLE_RATES = {
+    'guardian': {
+        'capacity': int(os.getenv('POLL_GUARDIAN_BURST', '20')),
+        'refill_per_second': float(os.getenv('POLL_GUARDIAN_RATE', '0.5')),
+    },
+    'ip': {
+        'capacity': int(os.getenv('POLL_IP_BURST', '60')),
+        'refill_per_second': float(os.getenv('POLL_IP_RATE', '2')),
+    },
+}
+POLL_INTERVALS = {
+    'reports': {'active': 5, 'idle': 30},
+    'guardian': {'active': 60, 'idle': 180},
+}
+POLL_INTERVAL_MAX = int(os.getenv('POLL_INTERVAL_MAX', '300'))
+POLL_OVERLOAD_LOAD = float(os.getenv('POLL_OVERLOAD_LOAD', '1.5'))
+POLL_QUEUE_STATE_TTL = 5
+# ETag/304 on polling endpoints (core/versioning.py). The version counters
+# live in the cache, so this is only safe when every process (web workers
+# and the bot) shares it.
+POLL_ETAGS = os.getenv('POLL_ETAGS', 'True' if os.getenv('REDIS_URL') else 'False').lower() == 'true'
+POLL_ETAG_TIME_BUCKET = int(os.getenv('POLL_ETAG_TIME_BUCKET', '30'))
+
+# Sessions
+# cached_db reads sessions from the cache and only falls back to the
+# database on a miss; writes still go to the database. It needs a cache
+# shared by every worker (REDIS_URL): with per-process LocMem a logout or
+# session write in one worker would not be seen by the others.
+SESSION_ENGINE = os.getenv(
+    'SESSION_ENGINE',
+    'django.contrib.sessions.backends.cached_db' if os.getenv('REDIS_URL') else 'django.contrib.sessions.backends.db'
+)
+
+# Logged-in guardian resolved once per request (core/identity.py). With
+# GUARDIAN_IDENTITY_CACHE it is also cached for GUARDIAN_IDENTITY_TTL seconds
+# and invalidated through version counters in the cache, so like POLL_ETAGS
+# it is only on by default when every process (web workers and the bot)
+# shares the cache.
+GUARDIAN_IDENTITY_CACHE = os.getenv('GUARDIAN_IDENTITY_CACHE', 'True' if os.getenv('REDIS_URL') else 'False').lower() == 'true'
+GUARDIAN_IDENTITY_TTL = int(os.getenv('GUARDIAN_IDENTITY_TTL', '60'))
+
+# Training content (core/training_catalog.py)
+# Each process keeps the training sections/exercises in memory and reloads
+# them when an admin edits the content (version in the cache) or after
+# TRAINING_CATALOG_TTL seconds. Template fragments of the training pages are
+# cached for TRAINING_FRAGMENT_CACHE_TIMEOUT seconds (0 disables them).
+TRAINING_CATALOG_TTL = int(os.getenv('TRAINING_CATALOG_TTL', '300'))
+TRAINING_FRAGMENT_CACHE_TIMEOUT = int(os.getenv('TRAINING_FRAGMENT_CACHE_TIMEOUT', '3600'))
+
+# Data retention (core/retention.py)
+# Rows are deleted in primary-key batches with a pause between batches so
+# cleanup never holds long locks on hot tables.
+RETENTION_BATCH_SIZE = int(os.getenv('RETENTION_BATCH_SIZE', '500'))
+RETENTION_BATCH_SLEEP = float(os.getenv('RETENTION_BATCH_SLEEP', '0.2'))
+RETENTION_ARCHIVE = os.getenv('RETENTION_ARCHIVE', 'False').lower() == 'true'
+RETENTION_POLICIES = {
+    'reports': {
+        'days': int(os.getenv('RETENTION_REPORTS_DAYS', '30')),
+        'archive': RETENTION_ARCHIVE,
+    },
+    'voting_sessions': {
+        'days': int(os.getenv('RETENTION_SESSIONS_DAYS', '7')),
+        'archive': RETENTION_ARCHIVE,
+    },
+    'report_queue': {
+        'days': int(os.getenv('RETENTION_QUEUE_DAYS', '7')),
+        'archive': RETENTION_ARCHIVE,
+    },
+    'message_blobs': {
+        'days': int(os.getenv('RETENTION_BLOBS_DAYS', '1')),
+        'archive': RETENTION_ARCHIVE,
+    },
+    'duty_intervals': {
+        'days': int(os.getenv('RETENTION_DUTY_DAYS', '90')),
+        'archive': RETENTION_ARCHIVE,
+    },
+}
+
+# Message table partitioning (PostgreSQL only, core/partitioning.py)
+# Run "manage.py message_partitions convert" once to switch the table over.
+# Keep the partition retention longer than RETENTION_REPORTS_DAYS; partitions
+# holding messages of reports that are not completed/closed are never dropped.
+MESSAGE_PARTITIONING = os.getenv('MESSAGE_PARTITIONING', 'False').lower() == 'true'
+MESSAGE_PARTITION_MONTHS_AHEAD = int(os.getenv('MESSAGE_PARTITION_MONTHS_AHEAD', '3'))
+MESSAGE_PARTITION_RETENTION_MONTHS = int(os.getenv('MESSAGE_PARTITION_RETENTION_MONTHS', '6'))
+
 # Logging Configuration
 LOGGING = {
     'version': 1,
@@ -0,0 +1,101 @@
+"""
+Supervisão de processos do start_server.py
+
+ProcessSupervisor mantém um processo filho rodando, reiniciando-o com
+backoff exponencial quando ele termina, e só inicia o processo depois que
+a condição de prontidão (ex.: servidor web aceitando conexões) é atendida.
+"""
+import socket
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+def wait_for_port(host, port, timeout=60.0, path=None, interval=0.5):
+    """
+    Aguarda a porta aceitar conexões (e, se `path` for informado, responder
+    HTTP sem erro 5xx). Retorna True quando pronto.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=interval):
+                pass
+            if path is None:
+                return True
+            try:
+                with urllib.request.urlopen(f'http://{host}:{port}{path}', timeout=5) as response:
+                    return response.status < 500
+            except urllib.error.HTTPError as e:
+                if e.code < 500:
+                    return True
+        except OSError:
+            pass
+        time.sleep(interval)
+    return False
+
+
+class ProcessSupervisor:
+    """Mantém um processo filho vivo com reinício e backoff"""
+
+    def __init__(self, name, command, ready_check=None, min_backoff=1.0, max_backoff=60.0, stable_after=60.0):
+        self.name = name
+        self.command = command
+        self.ready_check = ready_check
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        # Tempo de execução após o qual o backoff volta ao mínimo
+        self.stable_after = stable_after
+        self.process = None
+        self.restarts = 0
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Inicia a supervisão em uma thread"""
+        self._thread = threading.Thread(target=self._run, name=f'supervisor-{self.name}', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        if self.ready_check:
+            print(f"⏳ {self.name}: aguardando prontidão...")
+            while not self._stopping.is_set() and not self.ready_check():
+                self._stopping.wait(1)
+
+        backoff = self.min_backoff
+        while not self._stopping.is_set():
+            started = time.monotonic()
+            try:
+                self.process = subprocess.Popen(self.command)
+                print(f"✅ {self.name} iniciado (pid {self.process.pid})")
+                exit_code = self.process.wait()
+            except Exception as e:
+                print(f"❌ Erro ao iniciar {self.name}: {e}")
+                exit_code = None
+
+            if self._stopping.is_set():
+                break
+
+            if time.monotonic() - started >= self.stable_after:
+                backoff = self.min_backoff
+
+            self.restarts += 1
+            print(f"⚠️ {self.name} terminou (código {exit_code}); reiniciando em {backoff:.1f}s")
+            self._stopping.wait(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def stop(self, timeout=10):
+        """Interrompe a supervisão e termina o processo"""
+        self._stopping.set()
+        process = self.process
+        if process and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if self._thread:
+            self._thread.join(timeout=timeout)
@@ -9,6 +9,8 @@ import asyncio
 
 # Configurar Django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'guardiao.settings')
+# Dimensiona o pool de conexões para o processo do bot
+os.environ.setdefault('PROCESS_ROLE', 'bot')
 
 try:
     print("⚙️ Configurando Django para o bot...")
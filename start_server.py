@@ -5,9 +5,10 @@ Script para iniciar o servidor Django e bot Discord na Discloud
 import os
 import sys
 import django
+import signal
 import subprocess
-import time
 from django.core.management import execute_from_command_line
+from guardiao.supervisor import ProcessSupervisor, wait_for_port
 
 print("=" * 60)
 print("🚀 SISTEMA GUARDIÃO - INICIANDO")
@@ -26,66 +27,107 @@ except Exception as e:
     traceback.print_exc()
     sys.exit(1)
 
-# Executar migrações primeiro
+# Migrações e arquivos estáticos (pulados quando nada mudou)
 try:
-    print("📊 Executando migrações do banco de dados...")
-    execute_from_command_line(['start_server.py', 'migrate', '--verbosity=2'])
-    print("✅ Migrações executadas com sucesso")
+    print("📊 Verificando migrações e arquivos estáticos...")
+    from core.boot import BootManager
+    boot_result = BootManager().run()
+    print(
+        f"✅ Inicialização concluída em {boot_result['seconds']}s "
+        f"(migrate: {'executado' if boot_result['migrated'] else 'sem mudanças'}, "
+        f"collectstatic: {'executado' if boot_result['collected_static'] else 'sem mudanças'})"
+    )
 except Exception as e:
-    print(f"❌ Erro ao executar migrações: {e}")
+    print(f"❌ Erro na inicialização: {e}")
     import traceback
     traceback.print_exc()
     sys.exit(1)
 
-# Coletar arquivos estáticos
-try:
-    print("📁 Coletando arquivos estáticos...")
-    execute_from_command_line(['start_server.py', 'collectstatic', '--clear', '--noinput', '--verbosity=2'])
-    print("✅ Arquivos estáticos coletados com sucesso")
-except Exception as e:
-    print(f"❌ Erro ao coletar arquivos estáticos: {e}")
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
+PORT = int(os.getenv('PORT', '8080'))
+BOT_COMMAND = [sys.executable, 'run_bot.py']
+
+
+def web_is_ready():
+    """O bot só inicia quando o site já responde"""
+    return wait_for_port('127.0.0.1', PORT, timeout=5, path='/')
+
+
+def get_server_mode():
+    """Modo do servidor: --dev/--prod na linha de comando ou SERVER_MODE"""
+    if '--dev' in sys.argv:
+        return 'dev'
+    if '--prod' in sys.argv:
+        return 'production'
+
+    default_mode = 'dev' if os.getenv('DEBUG', 'False').lower() == 'true' else 'production'
+    mode = os.getenv('SERVER_MODE', default_mode).lower()
+
+    if mode == 'production':
+        try:
+            import gunicorn  # noqa: F401
+        except ImportError:
+            print("⚠️ Gunicorn não instalado - usando modo de desenvolvimento")
+            return 'dev'
+    return mode
+
+
+def run_production():
+    """Gunicorn com workers pré-forkados e bot supervisionado"""
+    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'guardiao', 'gunicorn.conf.py')
+    print(f"🌐 Iniciando Gunicorn na porta {PORT} (modo produção)...")
+    print("=" * 60)
+    web_process = subprocess.Popen([
+        sys.executable, '-m', 'gunicorn', 'guardiao.wsgi:application', '-c', config_path
+    ])
+
+    bot_supervisor = ProcessSupervisor('Bot Discord', BOT_COMMAND, ready_check=web_is_ready).start()
+
+    def shutdown(signum, frame):
+        print("\n🛑 Encerrando Sistema Guardião...")
+        bot_supervisor.stop()
+        if web_process.poll() is None:
+            web_process.send_signal(signal.SIGTERM)
+
+    def reload(signum, frame):
+        # Gunicorn troca os workers gradualmente, sem derrubar conexões
+        # (código novo só é carregado com WEB_PRELOAD desligado)
+        print("🔄 Recarregando workers do Gunicorn...")
+        web_process.send_signal(signal.SIGHUP)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGHUP, reload)
+
+    exit_code = web_process.wait()
+    bot_supervisor.stop()
+    sys.exit(exit_code)
+
+
+def run_dev():
+    """runserver do Django (uso local) com bot supervisionado"""
+    bot_supervisor = ProcessSupervisor('Bot Discord', BOT_COMMAND, ready_check=web_is_ready).start()
 
-def run_discord_bot():
-    """Executa o bot Discord em subprocess"""
     try:
-        print("🤖 Iniciando bot Discord...")
-        # Aguardar um pouco para o Django inicializar
-        time.sleep(5)
-        
-        # Executar bot Discord usando script separado
-        bot_process = subprocess.Popen([sys.executable, 'run_bot.py'])
-        
-        print("✅ Bot Discord iniciado em subprocess")
-        return bot_process
+        print(f"🌐 Iniciando servidor Django na porta {PORT} (modo desenvolvimento)...")
+        print("=" * 60)
+        execute_from_command_line(['start_server.py', 'runserver', f'0.0.0.0:{PORT}', '--noreload'])
+    except KeyboardInterrupt:
+        print("\n🛑 Sistema Guardião interrompido pelo usuário")
+        bot_supervisor.stop()
+        sys.exit(0)
     except Exception as e:
-        print(f"❌ Erro ao iniciar bot Discord: {e}")
+        print(f"❌ Erro ao iniciar servidor Django: {e}")
         import traceback
         traceback.print_exc()
-        return None
+        bot_supervisor.stop()
+        sys.exit(1)
+    bot_supervisor.stop()
+
 
-# Iniciar bot Discord em subprocess primeiro
 print("🚀 Iniciando Sistema Guardião completo...")
 print("=" * 60)
 
-bot_process = run_discord_bot()
-
-# Executar servidor Django na thread principal
-try:
-    print("🌐 Iniciando servidor Django na porta 8080...")
-    print("=" * 60)
-    execute_from_command_line(['start_server.py', 'runserver', '0.0.0.0:8080'])
-except KeyboardInterrupt:
-    print("\n🛑 Sistema Guardião interrompido pelo usuário")
-    if bot_process:
-        bot_process.terminate()
-    sys.exit(0)
-except Exception as e:
-    print(f"❌ Erro ao iniciar servidor Django: {e}")
-    import traceback
-    traceback.print_exc()
-    if bot_process:
-        bot_process.terminate()
-    sys.exit(1)
+if get_server_mode() == 'production':
+    run_production()
+else:
+    run_dev()